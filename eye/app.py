@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 # this project is licensed under the WTFPLv2, see COPYING.txt for details
 
-import argparse
+from __future__ import print_function
+
 import glob
 import logging
 import os
@@ -16,6 +17,9 @@ from .three import execfile
 from .qt import Slot
 from . import pathutils
 from . import connector
+from . import profiling
+from . import scriptcache
+from .launcher import buildArgumentParser
 
 
 __all__ = ('App', 'qApp', 'main')
@@ -33,6 +37,9 @@ class App(QApplication):
 
 		self.args = None
 
+		self.remoteChecked = False
+		"""Whether the launcher already tried to send the files to a running instance, see :any:`eye.launcher`"""
+
 		self.lastWindow = None
 		self.focusChanged.connect(self._appFocusChanged)
 
@@ -71,10 +78,17 @@ class App(QApplication):
 
 		The script will be run with the variables returned by :any:`scriptDict`.
 		Exceptions thrown  by the script are catched and logged.
+		Unless the ``--no-script-cache`` option was passed, the compiled script is cached, see
+		:any:`eye.scriptcache`.
 		"""
 		self.logger.debug('execing script %s', path)
 		try:
-			execfile(path, self.scriptDict())
+			with profiling.span('script', path):
+				if self.args is not None and self.args.no_script_cache:
+					execfile(path, self.scriptDict())
+				else:
+					code = scriptcache.loadCode(path)
+					exec(code, self.scriptDict())  # pylint: disable=exec-used
 		except Exception:
 			self.logger.error('cannot execute startup script %r', path, exc_info=True)
 
@@ -88,24 +102,33 @@ class App(QApplication):
 		self.parseArguments()
 		self.initLogging()
 
+		if self.args.profile_startup or self.args.profile_startup_trace:
+			profiling.enable()
+
 		if self.args.remote and self.processRemote():
 			return 0
 
 		if not self.args.no_config:
 			self.runStartScripts()
 
-		win = self.initUi()
-		win.show()
+		with profiling.span('ui', 'window creation'):
+			win = self.initUi()
+			win.show()
 		self.openCommandLineFiles()
+
+		if profiling.isEnabled():
+			self.reportStartupProfile()
+
 		return self.exec_()
 
+	def reportStartupProfile(self):
+		profiling.disable()
+		print(profiling.report(), file=sys.stderr)
+		if self.args.profile_startup_trace:
+			profiling.writeChromeTrace(self.args.profile_startup_trace)
+
 	def parseArguments(self):
-		parser = argparse.ArgumentParser()
-		parser.add_argument('files', metavar='FILE', nargs='*')
-		parser.add_argument('--debug', action='store_true', default=False)
-		parser.add_argument('--debug-only', action='append', default=[])
-		parser.add_argument('--no-config', action='store_true', default=False)
-		parser.add_argument('--remote', action='store_true', default=False)
+		parser = buildArgumentParser()
 
 		argv = self.arguments()[1:]
 		self.args = parser.parse_args(argv)
@@ -123,17 +146,14 @@ class App(QApplication):
 
 	def processRemote(self):
 		from .helpers import remote_control
+		from .helpers.remote_client import sendOpenFiles
 
-		try:
-			remote_control.sendRequest('ping')
-		except ValueError:
-			remote_control.createServer()
-			return False
+		# the D-Bus round trip is not done twice if the launcher did it
+		if not self.remoteChecked and sendOpenFiles([os.path.abspath(path) for path in self.args.files]):
+			return True
 
-		for path in self.args.files:
-			path = os.path.abspath(path)
-			remote_control.sendRequest('open', path)
-		return True
+		remote_control.createServer()
+		return False
 
 	def openCommandLineFiles(self):
 		if not self.args.files:
@@ -152,7 +172,8 @@ class App(QApplication):
 				loc = (row - 1, col - 1)
 			elif row:
 				loc = (row - 1,)
-			sendIntent(win, 'openEditor', path=path, loc=loc, reason='commandline')
+			with profiling.span('open', path):
+				sendIntent(win, 'openEditor', path=path, loc=loc, reason='commandline')
 
 	@Slot('QWidget*', 'QWidget*')
 	def _appFocusChanged(self, old, new):
@@ -171,8 +192,12 @@ def setupLogging():
 	root.handlers[0].setLevel(logging.WARNING)
 
 
-def main():
-	"""Run eye app"""
+def main(remoteChecked=False):
+	"""Run eye app
+
+	:param remoteChecked: whether the files were already sent to a running instance without success, see
+	                      :any:`eye.launcher`
+	"""
 
 	# if the default excepthook is used, PyQt 5.5 *aborts* the app when an unhandled exception occurs
 	# see http://pyqt.sourceforge.net/Docs/PyQt5/incompatibilities.html
@@ -184,6 +209,7 @@ def main():
 	setupLogging()
 
 	app = App(sys.argv)
+	app.remoteChecked = remoteChecked
 	return app.run()
 
 
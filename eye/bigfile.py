@@ -0,0 +1,171 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Big file policy
+
+Some editor features are too slow on big files, or files with very long lines (for example a minified
+JavaScript file consisting of a single 1 MB line). When a file bigger than the size threshold, or having
+a line longer than the line length threshold, is opened, the editor switches to "big file mode" and
+these features are degraded. See :any:`eye.widgets.editor.Editor.setBigFileThresholds`.
+
+Features register themselves as "big-file-sensitive" with :any:`registerFeature`. They can then check
+:any:`isDegraded` before doing expensive work on an editor, and/or provide callbacks to be called when an
+editor enters or leaves big file mode.
+
+Whether a registered feature is degraded can be configured with :any:`setSensitive`, for example to
+keep syntax coloring even on big files::
+
+	>>> import eye.bigfile
+	>>> eye.bigfile.setSensitive('lexer', False)
+
+The features registered by EYE are:
+
+- ``lexer``: automatic syntax coloring (and thus lexer folding), see :any:`eye.helpers.lexer`
+- ``marker_folding``: see :any:`eye.helpers.folding.MarkerFolder`
+- ``search_highlight``: highlighting of all search matches in the editor
+- ``minimap``: painting of indicators in the minimap, see :any:`eye.helpers.minimap`
+- ``ycm``: feeding the file to ycmd, see :any:`eye.helpers.ycm.feed`
+- ``trim_whitespace``: trailing whitespace removal when saving
+- ``wrap``: line wrapping
+- ``undo``: undo history, not degraded by default
+
+An editor in big file mode has "[big]" appended to its title and the degraded features listed in its
+tooltip.
+"""
+
+from collections import OrderedDict
+from logging import getLogger
+
+
+__all__ = (
+	'registerFeature', 'unregisterFeature', 'setSensitive', 'isSensitive', 'isDegraded',
+	'degradedFeatures', 'applyPolicy', 'hasLongLine',
+)
+
+
+LOGGER = getLogger(__name__)
+
+SIZE_THRESHOLD = 16 << 20
+LINE_LENGTH_THRESHOLD = 1 << 16
+
+
+class Feature(object):
+	def __init__(self, name, description, degrade=None, restore=None, sensitive=True):
+		self.name = name
+		self.description = description
+		self.degrade = degrade
+		self.restore = restore
+		self.sensitive = sensitive
+
+
+FEATURES = OrderedDict()
+
+
+def registerFeature(name, description, degrade=None, restore=None, sensitive=True):
+	"""Register a big-file-sensitive feature
+
+	:param name: identifier of the feature
+	:type name: str
+	:param description: short human-readable description, shown in the editor tooltip
+	:type description: str
+	:param degrade: if not None, called with an editor widget when it enters big file mode
+	:param restore: if not None, called with an editor widget when it leaves big file mode
+	:param sensitive: whether the feature is degraded in big file mode by default
+	"""
+	FEATURES[name] = Feature(name, description, degrade, restore, sensitive)
+
+
+def unregisterFeature(name):
+	"""Unregister a feature registered with :any:`registerFeature`"""
+	FEATURES.pop(name, None)
+
+
+def setSensitive(name, sensitive=True):
+	"""Set whether feature `name` should be degraded in big file mode
+
+	The change only applies to editors entering big file mode later.
+	"""
+	FEATURES[name].sensitive = sensitive
+
+
+def isSensitive(name):
+	"""Return True if feature `name` is registered and degraded in big file mode"""
+	feature = FEATURES.get(name)
+	return feature is not None and feature.sensitive
+
+
+def isDegraded(editor, name):
+	"""Return True if feature `name` should not run on `editor`
+
+	:param editor: editor widget
+	:type editor: eye.widgets.editor.Editor
+	:param name: identifier of the feature
+	:type name: str
+	"""
+	bigfile = getattr(editor, 'bigfile', None)
+	if not bigfile or not bigfile.active:
+		return False
+	return name in bigfile.degraded
+
+
+def degradedFeatures(editor):
+	"""Return the list of features degraded on `editor`
+
+	:rtype: list of :any:`Feature`
+	"""
+	bigfile = getattr(editor, 'bigfile', None)
+	if not bigfile or not bigfile.active:
+		return []
+	return [FEATURES[name] for name in bigfile.degraded if name in FEATURES]
+
+
+def _call(cb, editor, name):
+	try:
+		cb(editor)
+	except Exception:
+		LOGGER.error('error when switching big file mode of feature %r', name, exc_info=True)
+
+
+def applyPolicy(editor, active):
+	"""Make `editor` enter (if `active` is True) or leave big file mode
+
+	The `degrade` (or `restore`) callbacks of sensitive features are called.
+	This function is called by :any:`eye.widgets.editor.Editor.setBigFileMode` and shouldn't be called
+	directly.
+	"""
+	bigfile = editor.bigfile
+	if bool(bigfile.active) == bool(active):
+		return
+
+	if active:
+		bigfile.degraded = [name for name, feature in FEATURES.items() if feature.sensitive]
+		bigfile.active = True
+		for name in bigfile.degraded:
+			feature = FEATURES[name]
+			if feature.degrade:
+				_call(feature.degrade, editor, name)
+	else:
+		degraded = bigfile.degraded
+		bigfile.degraded = []
+		bigfile.active = False
+		for name in degraded:
+			feature = FEATURES.get(name)
+			if feature and feature.restore:
+				_call(feature.restore, editor, name)
+
+
+def hasLongLine(data, threshold):
+	"""Return True if `data` has a line longer than `threshold`
+
+	`data` can be a `bytes` or `str`, lines are separated by "\\n". The check runs in time proportional to
+	``len(data) / threshold`` Python operations, the scanning is done by `rfind`.
+	"""
+	newline = b'\n' if isinstance(data, bytes) else '\n'
+	pos = 0
+	size = len(data)
+	while size - pos > threshold:
+		# all lines ending in the window are shorter than threshold
+		nl = data.rfind(newline, pos, pos + threshold + 1)
+		if nl < 0:
+			return True
+		pos = nl + 1
+	return False
@@ -0,0 +1,176 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Encoding detection and decoding of files
+
+When a file is opened, its encoding is not only taken from the editor configuration (for example the
+``charset`` of an editorconfig file, see :any:`eye.widgets.editor.Editor.setEncoding`): the beginning of
+the file is sniffed to choose among candidate encodings, see :any:`iterEncodings`.
+
+- a byte order mark (BOM) gives the encoding, and the BOM is written again when saving
+- else, the configured encoding is tried first, then the encodings of the fallback chain (see
+  :any:`FALLBACK_ENCODINGS` and :any:`eye.widgets.editor.Editor.setFallbackEncodings`)
+- ASCII data is valid in all ASCII-compatible encodings, so it's not decoded at all
+
+Only the first :any:`SNIFF_SIZE` bytes are sniffed, the file is then decoded incrementally with a
+:any:`StreamDecoder`, which can be fed the chunks of a file loaded progressively. If the rest of the file
+is not valid in the chosen encoding, the decoder raises `UnicodeDecodeError` and the next candidate is
+tried.
+
+The editor text is UTF-8, so UTF-8 files are validated but not decoded: the bytes of the file are passed
+to the editor as they are.
+"""
+
+import codecs
+
+from .three import isascii
+
+
+__all__ = (
+	'FALLBACK_ENCODINGS', 'detectBom', 'isAsciiCompatible', 'iterEncodings', 'StreamDecoder',
+)
+
+
+FALLBACK_ENCODINGS = ('utf-8', 'latin-1')
+
+"""Default encodings tried when the configured encoding can't decode a file
+
+latin-1 can decode any data, so the chain never fails as long as it's last.
+"""
+
+SNIFF_SIZE = 1 << 16
+
+"""Number of bytes at the beginning of a file examined to choose an encoding"""
+
+VALIDATE_CHUNK_SIZE = 1 << 20
+
+# UTF-32 first, because the UTF-32-LE BOM starts with the UTF-16-LE BOM
+BOMS = (
+	(codecs.BOM_UTF32_LE, 'utf-32-le'),
+	(codecs.BOM_UTF32_BE, 'utf-32-be'),
+	(codecs.BOM_UTF8, 'utf-8'),
+	(codecs.BOM_UTF16_LE, 'utf-16-le'),
+	(codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+ASCII = bytes(range(128))
+
+_ASCII_COMPATIBLE = {}
+
+
+def codecName(encoding):
+	"""Return the normalized name of `encoding`, for example "utf-8" for "UTF8" """
+	return codecs.lookup(encoding).name
+
+
+def isAsciiCompatible(encoding):
+	"""Return True if ASCII bytes represent the same characters in `encoding` as in ASCII"""
+	name = codecName(encoding)
+	if name not in _ASCII_COMPATIBLE:
+		try:
+			compatible = ASCII.decode(name) == ASCII.decode('ascii')
+		except (UnicodeDecodeError, LookupError):
+			compatible = False
+		_ASCII_COMPATIBLE[name] = compatible
+	return _ASCII_COMPATIBLE[name]
+
+
+def detectBom(data):
+	"""Return the encoding indicated by the byte order mark at the start of `data`
+
+	:returns: a tuple `(encoding, bomLength)`, or `(None, 0)` if `data` doesn't start with a BOM
+	"""
+	for bom, encoding in BOMS:
+		if data[:len(bom)] == bom:
+			return encoding, len(bom)
+	return None, 0
+
+
+def _canDecode(data, encoding, final):
+	decoder = StreamDecoder(encoding)
+	try:
+		decoder.decode(data, final)
+	except UnicodeDecodeError:
+		return False
+	return True
+
+
+def iterEncodings(data, declared, fallbacks=FALLBACK_ENCODINGS):
+	"""Iterate on the candidate encodings for a file starting with `data`
+
+	If `data` starts with a BOM, the encoding of the BOM is the only candidate. Else, candidates are
+	`declared` then `fallbacks`, and only those which can decode `data` are yielded.
+	Only the first :any:`SNIFF_SIZE` bytes of `data` are examined, callers should try the next candidate
+	if the rest of the file can't be decoded.
+
+	:param data: beginning of the file, or whole file
+	:param declared: encoding configured for the file, can be None
+	:param fallbacks: encodings to try if `declared` can't decode the file
+	:returns: an iterator of `(encoding, bomLength)` tuples
+	"""
+	encoding, bomLength = detectBom(data)
+	if encoding is not None:
+		yield encoding, bomLength
+		return
+
+	final = len(data) <= SNIFF_SIZE
+	sample = bytes(data[:SNIFF_SIZE])
+	ascii = isascii(sample)
+
+	seen = set()
+	for encoding in ([declared] if declared else []) + list(fallbacks):
+		name = codecName(encoding)
+		if name in seen:
+			continue
+		seen.add(name)
+
+		if ascii and isAsciiCompatible(name):
+			yield encoding, 0
+		elif _canDecode(sample, name, final):
+			yield encoding, 0
+
+
+class StreamDecoder(object):
+	"""Incremental decoder returning UTF-8 data
+
+	Data is passed by chunks to :any:`decode`, a multi-byte character can be split across chunks.
+	The BOM (if any) is dropped. When the data is already UTF-8, or is ASCII and the encoding is
+	ASCII-compatible, it's only validated and returned as is.
+
+	:param encoding: encoding of the data
+	:param bomLength: length of the BOM at the start of the data
+	"""
+
+	def __init__(self, encoding, bomLength=0):
+		self.encoding = encoding
+		self.skip = bomLength
+		self.decoder = codecs.getincrementaldecoder(encoding)()
+		self.utf8 = codecName(encoding) == 'utf-8'
+		self.asciiCompatible = isAsciiCompatible(encoding)
+
+	def _hasPending(self):
+		return bool(self.decoder.getstate()[0])
+
+	def decode(self, data, final=False):
+		"""Decode a chunk of data
+
+		:param data: next chunk
+		:type data: bytes
+		:param final: whether it's the last chunk
+		:returns: the decoded text in UTF-8
+		:rtype: bytes
+		:raises UnicodeDecodeError: if `data` is not valid for the encoding
+		"""
+		if self.skip:
+			data = data[self.skip:]
+			self.skip = 0
+
+		if self.asciiCompatible and isascii(data) and not self._hasPending():
+			return data
+		elif self.utf8:
+			view = memoryview(data)
+			for start in range(0, len(view), VALIDATE_CHUNK_SIZE):
+				self.decoder.decode(view[start:start + VALIDATE_CHUNK_SIZE])
+			self.decoder.decode(b'', final)
+			return data
+		else:
+			return self.decoder.decode(data, final).encode('utf-8')
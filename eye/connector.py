@@ -48,12 +48,22 @@ Module contents
 ---------------
 """
 
+from collections import OrderedDict
 import inspect
+import itertools
+import logging
 from logging import getLogger
+from operator import attrgetter
+import sys
+from timeit import default_timer
 import weakref
 
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import Qt, QObject, QTimer, QElapsedTimer
 from PyQt5.QtWidgets import QWidget
+try:
+	from PyQt5 import sip
+except ImportError:
+	import sip
 
 from .qt import Signal, Slot
 from .three import bytes, str
@@ -64,11 +74,29 @@ __all__ = ('registerSignal', 'registerEventFilter', 'disabled',
            'registerSetup', 'registerTeardown',
            'deleteCreatedBy',
            'defaultEditorConfig', 'defaultWindowConfig', 'defaultLexerConfig',
-           'categoryObjects', 'CategoryMixin')
+           'categoryObjects', 'CategoryMixin',
+           'enableProfiling', 'disableProfiling', 'resetProfiling',
+           'profilingStats', 'profilingTable')
 
 
 LOGGER = getLogger(__name__)
 
+# number of workers of the pools used by listeners registered with an executor
+POOL_WORKERS = 4
+
+# default maximum number of running tasks per listener registered with an executor
+MAX_IN_FLIGHT = 2
+
+
+def _plainArguments(sender, *args):
+	# default snapshot of listeners run in a worker: the signal arguments, if they aren't Qt objects
+	for arg in args:
+		if isinstance(arg, (tuple, list)):
+			_plainArguments(sender, *arg)
+		elif isinstance(arg, sip.simplewrapper):
+			raise TypeError('cannot pass Qt object %r to a worker, a snapshot function is needed' % arg)
+	return args
+
 
 def to_stringlist(obj):
 	if isinstance(obj, (str, bytes)):
@@ -78,6 +106,9 @@ def to_stringlist(obj):
 
 
 class ListenerMixin(object):
+	def kind(self):
+		return type(self).__name__
+
 	def unregister(self):
 		objects = CONNECTOR.objectsMatching(self.categories)
 		for obj in objects:
@@ -91,6 +122,15 @@ class SignalListener(QObject, ListenerMixin):
 		self.categories = categories
 		self.signal = signal
 		self.caller = None
+		self.coalesceMs = None
+		self.coalesceMode = 'last'
+		self.executor = None
+		self.snapshot = None
+		self.onResult = None
+		self.maxInFlight = MAX_IN_FLIGHT
+
+	def kind(self):
+		return 'signal %s' % self.signal
 
 	@Slot(int)
 	@Slot(str)
@@ -111,6 +151,17 @@ class SignalListener(QObject, ListenerMixin):
 
 		with exceptionLogging(reraise=False, logger=LOGGER):
 			sender = kwargs.get('sender', self.sender())
+			if self.coalesceMs is not None:
+				COALESCER.push(self, sender, args)
+			else:
+				self.call(sender, *args)
+
+	def call(self, sender, *args):
+		if self.executor is not None:
+			EXECUTOR.submit(self, sender, args)
+		elif PROFILER.enabled:
+			PROFILER.call(self, sender, *args)
+		else:
 			self.cb(sender, *args)
 
 	def doConnect(self, obj):
@@ -118,6 +169,8 @@ class SignalListener(QObject, ListenerMixin):
 
 	def doDisconnect(self, obj):
 		getattr(obj, self.signal).disconnect(self.map)
+		COALESCER.discard(self, obj)
+		EXECUTOR.discard(self, obj)
 
 
 class ConnectListener(ListenerMixin):
@@ -130,10 +183,16 @@ class ConnectListener(ListenerMixin):
 	def map(self, obj):
 		if getattr(self.cb, 'enabled', True):
 			with exceptionLogging(reraise=False, logger=LOGGER):
-				self.cb(obj)
+				if PROFILER.enabled:
+					PROFILER.call(self, obj)
+				else:
+					self.cb(obj)
 
 
 class SetupListener(ConnectListener):
+	def kind(self):
+		return 'setup'
+
 	def doConnect(self, obj):
 		self.map(obj)
 
@@ -142,6 +201,9 @@ class SetupListener(ConnectListener):
 
 
 class TearListener(ConnectListener):
+	def kind(self):
+		return 'teardown'
+
 	def doConnect(self, obj):
 		pass
 
@@ -157,18 +219,309 @@ class EventFilter(QObject, ListenerMixin):
 		self.eventTypes = eventTypes
 		self.caller = None
 
-	def eventFilter(self, obj, ev):
+	def kind(self):
+		return 'event filter'
+
+	def filter(self, obj, ev):
 		ret = False
-		if getattr(self.cb, 'enabled', True) and  ev.type() in self.eventTypes:
+		if getattr(self.cb, 'enabled', True):
 			with exceptionLogging(reraise=False, logger=LOGGER):
-				ret = bool(self.cb(obj, ev))
+				if PROFILER.enabled:
+					ret = bool(PROFILER.call(self, obj, ev))
+				else:
+					ret = bool(self.cb(obj, ev))
 		return ret
 
 	def doConnect(self, obj):
-		obj.installEventFilter(self)
+		EventDispatcher.forObject(obj).add(self)
 
 	def doDisconnect(self, obj):
-		obj.removeEventFilter(self)
+		dispatcher = EventDispatcher.forObject(obj, create=False)
+		if dispatcher is not None:
+			dispatcher.remove(self)
+
+
+class EventDispatcher(QObject):
+	"""Event filter dispatching events of an object to its :any:`EventFilter` listeners
+
+	A single dispatcher is installed on each object having event filter listeners, instead of one Qt
+	event filter per listener. Listeners are indexed by event type, so events of other types are
+	returned to Qt after a dict lookup.
+	"""
+
+	def __init__(self, parent):
+		super(EventDispatcher, self).__init__(parent)
+
+		# event type -> listeners, last connected first, as Qt does with event filters
+		self.table = {}
+
+	@classmethod
+	def forObject(cls, obj, create=True):
+		dispatcher = getattr(obj, '_eventDispatcher', None)
+		if dispatcher is None and create:
+			dispatcher = obj._eventDispatcher = cls(obj)
+			obj.installEventFilter(dispatcher)
+		return dispatcher
+
+	def add(self, lis):
+		for evtype in lis.eventTypes:
+			listeners = self.table.setdefault(evtype, [])
+			if lis in listeners:
+				listeners.remove(lis)
+			listeners.insert(0, lis)
+
+	def remove(self, lis):
+		for evtype in lis.eventTypes:
+			listeners = self.table.get(evtype)
+			if listeners and lis in listeners:
+				listeners.remove(lis)
+				if not listeners:
+					del self.table[evtype]
+
+		if not self.table:
+			obj = self.parent()
+			obj.removeEventFilter(self)
+			del obj._eventDispatcher
+			self.setParent(None)
+
+	def eventFilter(self, obj, ev):
+		listeners = self.table.get(ev.type())
+		if not listeners:
+			return False
+
+		# iterate on list copy in case a listener unregisters
+		for lis in list(listeners):
+			if lis.filter(obj, ev):
+				return True
+		return False
+
+
+class ListenerStats(object):
+	def __init__(self, lis):
+		self.name = getattr(lis.cb, '__name__', repr(lis.cb))
+		self.kind = lis.kind()
+		self.categories = sorted(lis.categories)
+		self.caller = lis.caller
+		self.count = 0
+		self.total = 0.
+		self.max = 0.
+
+
+class ListenerProfiler(object):
+	"""Collect timing statistics of listeners callbacks
+
+	When disabled, listeners call their callback directly and no statistics are collected.
+	See :any:`enableProfiling`.
+	"""
+
+	def __init__(self):
+		self.enabled = False
+		self.threshold = None
+		self.stats = {}
+
+	def call(self, lis, *args):
+		start = default_timer()
+		try:
+			return lis.cb(*args)
+		finally:
+			elapsed = default_timer() - start
+
+			try:
+				stats = self.stats[lis]
+			except KeyError:
+				stats = self.stats[lis] = ListenerStats(lis)
+			stats.count += 1
+			stats.total += elapsed
+			stats.max = max(stats.max, elapsed)
+
+			if self.threshold is not None and elapsed >= self.threshold:
+				LOGGER.warning('slow handler %r (%s, from file %r) took %.1f ms',
+				               stats.name, stats.kind, stats.caller, elapsed * 1000)
+
+
+class SignalCoalescer(QObject):
+	"""Coalesce bursts of signals for listeners registered with a coalescing window
+
+	For each listener and sender, signals are accumulated until no signal was emitted for the
+	listener coalescing window, then the listener callback is called once.
+	All pending bursts share a single timer, which is set for the nearest deadline.
+	"""
+
+	def __init__(self, parent=None):
+		super(SignalCoalescer, self).__init__(parent)
+
+		# (listener, sender) -> [deadline, args]
+		self.pending = {}
+
+		self.clock = QElapsedTimer()
+		self.clock.start()
+		self.nextDeadline = None
+
+		self.timer = QTimer(self)
+		self.timer.setSingleShot(True)
+		self.timer.timeout.connect(self.flush)
+
+	def push(self, lis, sender, args):
+		deadline = self.clock.elapsed() + lis.coalesceMs
+
+		key = (lis, sender)
+		entry = self.pending.get(key)
+		if entry is None:
+			entry = self.pending[key] = [deadline, []]
+		entry[0] = deadline
+
+		if lis.coalesceMode == 'collect':
+			entry[1].append(args)
+		else:
+			entry[1] = args
+
+		self._schedule(deadline)
+
+	def discard(self, lis, sender):
+		self.pending.pop((lis, sender), None)
+
+	def _schedule(self, deadline):
+		if self.nextDeadline is not None and self.nextDeadline <= deadline and self.timer.isActive():
+			return
+		self.nextDeadline = deadline
+		self.timer.start(max(0, deadline - self.clock.elapsed()))
+
+	@Slot()
+	def flush(self):
+		self.nextDeadline = None
+		now = self.clock.elapsed()
+
+		due = [key for key, entry in self.pending.items() if entry[0] <= now]
+		for key in due:
+			_, args = self.pending.pop(key)
+			lis, sender = key
+			if sip.isdeleted(sender) or not getattr(lis.cb, 'enabled', True):
+				continue
+
+			with exceptionLogging(reraise=False, logger=LOGGER):
+				if lis.coalesceMode == 'collect':
+					lis.call(sender, args)
+				else:
+					lis.call(sender, *args)
+
+		if self.pending:
+			self._schedule(min(entry[0] for entry in self.pending.values()))
+
+
+class SignalExecutor(QObject):
+	"""Run listeners callbacks in a worker pool and deliver their results in the GUI thread
+
+	Only the latest task for a listener and a sender is relevant: when a new task is submitted, the
+	previous one is cancelled if it has not started yet, and its result is discarded if it has.
+	When a listener has too many tasks in flight, new tasks wait for a free slot, only the latest task of
+	each sender is kept waiting.
+	"""
+
+	taskDone = Signal(object, object, int, object)
+
+	def __init__(self, parent=None):
+		super(SignalExecutor, self).__init__(parent)
+
+		self.pools = {}
+		self.generationCounter = itertools.count()
+
+		# (listener, sender) -> generation of the latest submitted task
+		self.generations = {}
+		# (listener, sender) -> future of the latest started task
+		self.futures = {}
+		# listener -> number of started tasks not yet finished
+		self.inFlight = {}
+		# listener -> OrderedDict of sender -> (generation, args) waiting for a free slot
+		self.waiting = {}
+
+		self.taskDone.connect(self._onTaskDone, Qt.QueuedConnection)
+
+	def pool(self, kind):
+		try:
+			return self.pools[kind]
+		except KeyError:
+			pass
+
+		from concurrent import futures
+
+		if kind == 'thread':
+			pool = futures.ThreadPoolExecutor(max_workers=POOL_WORKERS)
+		else:
+			pool = futures.ProcessPoolExecutor(max_workers=POOL_WORKERS)
+		self.pools[kind] = pool
+		return pool
+
+	def submit(self, lis, sender, args):
+		snapshot = lis.snapshot or _plainArguments
+		args = tuple(snapshot(sender, *args))
+
+		key = (lis, sender)
+		gen = next(self.generationCounter)
+		self.generations[key] = gen
+
+		old = self.futures.get(key)
+		if old is not None:
+			old.cancel()
+
+		if self.inFlight.get(lis, 0) >= lis.maxInFlight:
+			self.waiting.setdefault(lis, OrderedDict())[sender] = (gen, args)
+			return
+
+		self._start(lis, sender, gen, args)
+
+	def discard(self, lis, sender):
+		key = (lis, sender)
+		self.generations.pop(key, None)
+		future = self.futures.pop(key, None)
+		if future is not None:
+			future.cancel()
+		self.waiting.get(lis, {}).pop(sender, None)
+
+	def _start(self, lis, sender, gen, args):
+		future = self.pool(lis.executor).submit(lis.cb, *args)
+		self.futures[(lis, sender)] = future
+		self.inFlight[lis] = self.inFlight.get(lis, 0) + 1
+
+		# called in the worker thread (or in this thread if already done)
+		future.add_done_callback(lambda fut: self.taskDone.emit(lis, sender, gen, fut))
+
+	@Slot(object, object, int, object)
+	def _onTaskDone(self, lis, sender, gen, future):
+		key = (lis, sender)
+		self.inFlight[lis] -= 1
+		if self.futures.get(key) is future:
+			del self.futures[key]
+
+		if self.generations.get(key) == gen:
+			del self.generations[key]
+			self._deliver(lis, sender, future)
+
+		self._startWaiting(lis)
+
+	def _deliver(self, lis, sender, future):
+		if future.cancelled():
+			return
+
+		exc = future.exception()
+		if exc is not None:
+			LOGGER.error('an exception occured in %r (from file %r)', lis.cb, lis.caller,
+			             exc_info=(type(exc), exc, getattr(exc, '__traceback__', None)))
+			return
+
+		if lis.onResult is None or sip.isdeleted(sender):
+			return
+
+		with exceptionLogging(reraise=False, logger=LOGGER):
+			lis.onResult(sender, future.result())
+
+	def _startWaiting(self, lis):
+		waiting = self.waiting.get(lis)
+		while waiting and self.inFlight[lis] < lis.maxInFlight:
+			sender, (gen, args) = waiting.popitem(last=False)
+			if sip.isdeleted(sender):
+				self.generations.pop((lis, sender), None)
+				continue
+			self._start(lis, sender, gen, args)
 
 
 class EventConnector(QObject):
@@ -180,23 +533,41 @@ class EventConnector(QObject):
 		self.allObjects = weakref.WeakSet()
 		self.allListeners = []
 
+		# category -> WeakSet of objects having that category
+		self.objectsByCategory = {}
+
+		# category -> listeners requiring that category, in registration order
+		self.listenersByCategory = {}
+		# listeners without any category, in registration order
+		self.uncategorizedListeners = []
+		self.listenerCounter = itertools.count()
+
 	def doConnect(self, obj, lis, cats=None):
-		LOGGER.debug('connecting %r to %r (from file %r) in %r categories', obj, lis.cb, inspect.getfile(lis.cb), cats)
+		if LOGGER.isEnabledFor(logging.DEBUG):
+			LOGGER.debug('connecting %r to %r (from file %r) in %r categories', obj, lis.cb, inspect.getfile(lis.cb), cats)
 		with exceptionLogging(reraise=False, logger=LOGGER):
 			lis.doConnect(obj)
 
 	def doDisconnect(self, obj, lis, cats=None):
-		LOGGER.debug('disconnecting %r to %r (from file %r) in %r categories', obj, lis.cb, inspect.getfile(lis.cb), cats)
+		if LOGGER.isEnabledFor(logging.DEBUG):
+			LOGGER.debug('disconnecting %r to %r (from file %r) in %r categories', obj, lis.cb, inspect.getfile(lis.cb), cats)
 		with exceptionLogging(reraise=False, logger=LOGGER):
 			lis.doDisconnect(obj)
 
+	def _indexListener(self, lis):
+		if lis.categories:
+			for cat in lis.categories:
+				self.listenersByCategory.setdefault(cat, []).append(lis)
+		else:
+			self.uncategorizedListeners.append(lis)
+
 	def addListener(self, categories, lis):
+		lis.order = next(self.listenerCounter)
 		self.allListeners.append(lis)
+		self._indexListener(lis)
 
-		# iterate on list copy to avoid concurrent access
-		for obj in list(self.allObjects):
-			if categories <= obj.categories():
-				self.doConnect(obj, lis, categories)
+		for obj in self.objectsMatching(categories):
+			self.doConnect(obj, lis, categories)
 
 	def addObject(self, obj):
 		self.allObjects.add(obj)
@@ -205,30 +576,60 @@ class EventConnector(QObject):
 		if not oc:
 			return
 
-		for lis in self.allListeners:
+		candidates = set(self.uncategorizedListeners)
+		for cat in oc:
+			candidates.update(self.listenersByCategory.get(cat, ()))
+
+		for lis in sorted(candidates, key=attrgetter('order')):
 			if lis.categories <= oc:
 				self.doConnect(obj, lis, lis.categories)
 
 	def addCategory(self, obj, cat):
+		try:
+			objects = self.objectsByCategory[cat]
+		except KeyError:
+			objects = self.objectsByCategory[cat] = weakref.WeakSet()
+		objects.add(obj)
+
 		oc = obj.categories()
 
-		for lis in self.allListeners:
-			if lis.categories:
-				if cat in lis.categories and lis.categories <= oc:
-					self.doConnect(obj, lis, cat)
-			elif len(obj.categories()) == 1:
+		# iterate on list copy in case a listener registers new listeners
+		candidates = list(self.listenersByCategory.get(cat, ()))
+		if len(oc) == 1 and self.uncategorizedListeners:
+			# category-less listeners are connected when an object gets its first category
+			candidates.extend(self.uncategorizedListeners)
+			candidates.sort(key=attrgetter('order'))
+
+		for lis in candidates:
+			if lis.categories <= oc:
 				self.doConnect(obj, lis, cat)
 		self.categoryAdded.emit(obj, cat)
 
 	def removeCategory(self, obj, cat):
-		for lis in self.allListeners:
-			if cat in lis.categories:
-				self.doDisconnect(obj, lis, cat)
+		objects = self.objectsByCategory.get(cat)
+		if objects is not None:
+			objects.discard(obj)
+
+		for lis in list(self.listenersByCategory.get(cat, ())):
+			self.doDisconnect(obj, lis, cat)
 		self.categoryRemoved.emit(obj, cat)
 
 	def objectsMatching(self, categories):
 		categories = frozenset(to_stringlist(categories))
-		return [obj for obj in self.allObjects if categories <= obj.categories()]
+		if not categories:
+			return list(self.allObjects)
+
+		# intersect the indexed sets, starting from the smallest one
+		sets = []
+		for cat in categories:
+			objects = self.objectsByCategory.get(cat)
+			if not objects:
+				return []
+			sets.append(objects)
+		sets.sort(key=len)
+
+		smallest, others = sets[0], sets[1:]
+		return [obj for obj in list(smallest) if all(obj in other for other in others)]
 
 	def deleteCreatedBy(self, caller):
 		"""Unregister listeners registered in file `caller`."""
@@ -240,6 +641,11 @@ class EventConnector(QObject):
 				newListeners.append(lis)
 		self.allListeners = newListeners
 
+		self.listenersByCategory = {}
+		self.uncategorizedListeners = []
+		for lis in newListeners:
+			self._indexListener(lis)
+
 
 class CategoryMixin(object):
 	"""Mixin class to support object categories.
@@ -271,6 +677,14 @@ class CategoryMixin(object):
 		CONNECTOR.removeCategory(self, c)
 
 
+def callerFile(depth):
+	"""Return the file of the function `depth` frames above the caller of this function
+
+	Unlike `inspect.stack()`, this does not load the source context of every frame of the stack.
+	"""
+	return sys._getframe(depth + 1).f_code.co_filename
+
+
 def peekSet(s):
 	return next(iter(s))
 
@@ -312,7 +726,60 @@ def deleteCreatedBy(caller):
 	CONNECTOR.deleteCreatedBy(caller)
 
 
-def registerSignal(categories, signal, stackoffset=0):
+def enableProfiling(threshold=None):
+	"""Start collecting timing statistics of listeners
+
+	When enabled, each call of a listener callback (as registered with :any:`registerSignal`,
+	:any:`registerSetup`, :any:`registerEventFilter`, etc.) is timed. Statistics can be retrieved with
+	:any:`profilingStats` or :any:`profilingTable`.
+
+	:param threshold: if not None, calls taking longer than `threshold` seconds are logged as warnings
+	:type threshold: float
+	"""
+	PROFILER.threshold = threshold
+	PROFILER.enabled = True
+
+
+def disableProfiling():
+	"""Stop collecting timing statistics of listeners
+
+	Statistics collected so far are kept, see :any:`resetProfiling`.
+	"""
+	PROFILER.enabled = False
+
+
+def resetProfiling():
+	"""Clear the listeners timing statistics collected so far"""
+	PROFILER.stats = {}
+
+
+def profilingStats():
+	"""Return listeners timing statistics
+
+	Each returned element has attributes `name` (name of the callback), `kind` (type of listener),
+	`categories`, `caller` (script which registered the listener), `count` (number of calls), `total` and
+	`max` (time spent in the callback, in seconds).
+
+	:returns: statistics, sorted by decreasing total time
+	:rtype: list
+	"""
+	return sorted(PROFILER.stats.values(), key=attrgetter('total'), reverse=True)
+
+
+def profilingTable():
+	"""Return listeners timing statistics formatted as a text table
+
+	:rtype: str
+	"""
+	lines = ['%8s %10s %10s  %-30s %-20s %s' % ('calls', 'total ms', 'max ms', 'handler', 'kind', 'file')]
+	for stats in profilingStats():
+		lines.append('%8d %10.1f %10.1f  %-30s %-20s %s' % (
+			stats.count, stats.total * 1000, stats.max * 1000, stats.name, stats.kind, stats.caller))
+	return '\n'.join(lines)
+
+
+def registerSignal(categories, signal, stackoffset=0, coalesce_ms=None, mode='last',
+                   executor=None, snapshot=None, on_result=None, max_in_flight=MAX_IN_FLIGHT):
 	"""Decorate a function that should be run when a signal is emitted.
 
 	When the `signal` of all existing and future objects matching all specified `categories`
@@ -321,28 +788,81 @@ def registerSignal(categories, signal, stackoffset=0):
 	When called, the decorated function will received the target object as first argument, then
 	the signal arguments as next arguments.
 
+	If `coalesce_ms` is set, bursts of signals emitted by the same object are coalesced: the decorated
+	function is called only once no signal was emitted by that object for `coalesce_ms` milliseconds.
+	With `mode` ``'last'``, the function receives the arguments of the last signal of the burst. With
+	`mode` ``'collect'``, the function receives the target object and a list of the arguments tuples
+	of all signals of the burst.
+
+	If `executor` is set, the decorated function is not run in the GUI thread but in a shared pool of
+	threads (``'thread'``) or processes (``'process'``). It must then not access any widget: it does not
+	receive the target object, only the signal arguments, or the values returned by `snapshot` if it is set.
+	`snapshot` is called in the GUI thread with the target object and the signal arguments, and should
+	return a tuple of immutable values, for example the text of an editor. Without `snapshot`, signal
+	arguments which are Qt objects (like widgets) are refused: the call is logged as an error and skipped.
+	The value returned by the decorated function is passed to `on_result`, which is called in the GUI thread
+	with the target object and that value.
+	When a signal is emitted again by the same object, the previous task is cancelled, or its result
+	ignored if it had already started. At most `max_in_flight` tasks run at the same time for the
+	decorated function, others wait for a free slot.
+	With ``'process'``, the decorated function and its arguments must be picklable, so the function should
+	be defined in an importable module, not in a configuration script.
+
 	:param categories: the categories to match
 	:type categories: list or str
+	:param coalesce_ms: if not None, coalescing window in milliseconds
+	:type coalesce_ms: int
+	:param mode: ``'last'`` or ``'collect'``, how coalesced signals arguments are passed
+	:param executor: None, ``'thread'`` or ``'process'``, where to run the decorated function
+	:param snapshot: if not None, function returning the arguments to pass to the decorated function
+	:param on_result: if not None, function receiving the value returned by the decorated function
+	:param max_in_flight: maximum number of running tasks for the decorated function
+	:type max_in_flight: int
 
 	Example::
 
 		@registerSignal('editor', 'fileSaved')
 		def foo(editor_obj, path):
 			print('file %s has been saved', path)
+
+		@registerSignal('editor', 'textChanged', coalesce_ms=500)
+		def bar(editor_obj):
+			print('editor content changed in the last 500ms')
+
+		def showLength(editor_obj, length):
+			editor_obj.window().setWindowTitle('%d chars' % length)
+
+		@registerSignal('editor', 'textChanged', executor='thread',
+		                snapshot=lambda editor_obj: (editor_obj.text(),), on_result=showLength)
+		def countChars(text):
+			return len(text)
 	"""
 
+	if mode not in ('last', 'collect'):
+		raise ValueError('unknown coalescing mode %r' % mode)
+	if executor not in (None, 'thread', 'process'):
+		raise ValueError('unknown executor %r' % executor)
+
 	categories = frozenset(to_stringlist(categories))
 	doctext = ('This handler is registered for categories ``%s`` on signal ``%s``.'
 				   % (list(categories), signal))
+	if coalesce_ms is not None:
+		doctext += ' Signals are coalesced in a %d ms window.' % coalesce_ms
 
 	if BUILDING_DOCS:
 		return lambda x: _addDoc(x, doctext)
 
 	def deco(func):
-		caller = inspect.stack()[1 + stackoffset][1]
+		caller = callerFile(1 + stackoffset)
 
 		lis = SignalListener(func, categories, signal, CONNECTOR)
 		lis.caller = caller
+		lis.coalesceMs = coalesce_ms
+		lis.coalesceMode = mode
+		lis.executor = executor
+		lis.snapshot = snapshot
+		lis.onResult = on_result
+		lis.maxInFlight = max_in_flight
 		CONNECTOR.addListener(categories, lis)
 
 		_addDoc(func, doctext)
@@ -378,7 +898,7 @@ def registerSetup(categories, stackoffset=0):
 		return lambda x: _addDoc(x, doctext)
 
 	def deco(func):
-		caller = inspect.stack()[1 + stackoffset][1]
+		caller = callerFile(1 + stackoffset)
 
 		lis = SetupListener(func, categories)
 		lis.caller = caller
@@ -399,7 +919,7 @@ def registerTeardown(categories, stackoffset=0):
 		return lambda x: _addDoc(x, doctext)
 
 	def deco(func):
-		caller = inspect.stack()[1 + stackoffset][1]
+		caller = callerFile(1 + stackoffset)
 
 		lis = TearListener(func, categories)
 		lis.caller = caller
@@ -454,7 +974,7 @@ def registerEventFilter(categories, eventTypes, stackoffset=0):
 		return lambda x: _addDoc(x, doctext)
 
 	def deco(func):
-		caller = inspect.stack()[1 + stackoffset][1]
+		caller = callerFile(1 + stackoffset)
 
 		lis = EventFilter(func, categories, eventTypes, CONNECTOR)
 		lis.caller = caller
@@ -517,4 +1037,10 @@ defaultLexerConfig = registerSignal(['editor'], 'lexerChanged')
 This decorator is intended for functions to configure lexers.
 """
 
+PROFILER = ListenerProfiler()
+
 CONNECTOR = EventConnector()
+
+COALESCER = SignalCoalescer(CONNECTOR)
+
+EXECUTOR = SignalExecutor(CONNECTOR)
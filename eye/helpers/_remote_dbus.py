@@ -0,0 +1,67 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""D-Bus server part of :any:`eye.helpers.remote_control`
+
+This module is imported only when a remote control server is created, to avoid loading QtDBus when
+remote control is not used.
+"""
+
+import logging
+
+from PyQt5.QtCore import QObject, Q_CLASSINFO
+from PyQt5.QtDBus import QDBusConnection, QDBusVariant
+
+from ..three import str
+from ..connector import CategoryMixin
+from ..qt import Slot
+from .intent import sendIntent
+from .remote_client import SERVICE
+
+
+__all__ = ('SimpleHandler', 'registerServer')
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SimpleHandler(QObject, CategoryMixin):
+	Q_CLASSINFO('D-Bus Interface', 're.indigo.eye')
+
+	def __init__(self, **kwargs):
+		super(SimpleHandler, self).__init__(**kwargs)
+		self.addCategory('remote_control')
+
+	@Slot(str, result=QDBusVariant)
+	@Slot(str, QDBusVariant, result=QDBusVariant)
+	@Slot(str, str, result=QDBusVariant)
+	@Slot(str, QDBusVariant, QDBusVariant, result=QDBusVariant)
+	@Slot(str, str, str, result=QDBusVariant)
+	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, result=QDBusVariant)
+	@Slot(str, str, str, str, result=QDBusVariant)
+	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, result=QDBusVariant)
+	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, result=QDBusVariant)
+	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant,
+	      result=QDBusVariant)
+	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant,
+	      result=QDBusVariant)
+	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant,
+	      QDBusVariant, result=QDBusVariant)
+	def request(self, request_type, *args):
+		args = tuple(arg.variant() if isinstance(arg, QDBusVariant) else arg for arg in args)
+
+		LOGGER.debug('received request %r%r', request_type, args)
+		result = sendIntent(self, 'remoteRequest', request_type=request_type, args=args)
+		if result is None:
+			result = False
+
+		LOGGER.debug('replying %r to request %r%r', result, request_type, args)
+		return QDBusVariant(result)
+
+
+def registerServer():
+	root = SimpleHandler()
+
+	bus = QDBusConnection.sessionBus()
+	bus.registerService(SERVICE)
+	bus.registerObject('/', root, QDBusConnection.ExportAllContents)
+	return bus, root
@@ -1,11 +1,16 @@
 # this project is licensed under the WTFPLv2, see COPYING.txt for details
 
+from logging import getLogger
+
 from .. import connector
 from ..app import qApp
 from ..widgets.helpers import parentTabWidget
 
-__all__ = ('findEditor', 'openEditor', 'listEditors',
-           'newEditorOpen', 'newEditorShare', 'newEditorTryShare')
+__all__ = ('findEditor', 'findViewer', 'openEditor', 'listEditors', 'saveModifiedEditors',
+           'newEditorOpen', 'newEditorShare', 'newEditorTryShare', 'currentWindow')
+
+
+LOGGER = getLogger(__name__)
 
 
 def findEditor(path):
@@ -22,7 +27,27 @@ def findEditor(path):
 			return ed
 
 
-def _getWindow():
+def findViewer(path):
+	"""Get a viewer widget which has `path` opened
+
+	Like :any:`findEditor`, but searches in :any:`eye.widgets.viewer.FileViewer` widgets, with category
+	`"viewer"`.
+
+	:returns: an existing viewer or None if no widget matches.
+	:rtype: eye.widgets.viewer.FileViewer
+	"""
+	for ed in connector.categoryObjects('viewer'):
+		if ed.path == path:
+			return ed
+
+
+def currentWindow():
+	"""Return the window which had focus last, or any window if none had focus yet
+
+	Returns None if no window was created yet, for example when startup scripts are run.
+
+	:rtype: eye.widgets.window.Window
+	"""
 	win = qApp().lastWindow
 	if win is None:
 		for win in connector.categoryObjects('window'):
@@ -35,12 +60,22 @@ def createEditorWidget():
 	return Window.EditorClass()
 
 
+def createViewerWidget():
+	from ..widgets.window import Window
+	return Window.ViewerClass()
+
+
 def _createEditor(path):
-	win = _getWindow()
+	from ..widgets.viewer import shouldUseViewer
+
+	win = currentWindow()
 	cur = win.currentBuffer()
 	tabs = parentTabWidget(cur)
 
-	ed = createEditorWidget()
+	if shouldUseViewer(path):
+		ed = createViewerWidget()
+	else:
+		ed = createEditorWidget()
 	ed.openFile(path)
 	tabs.addWidget(ed)
 
@@ -53,6 +88,9 @@ def openEditor(path, loc=None):
 	If an editor widget already has `path` open, give it focus. Else, create a new editor (in a new
 	tab of the currently focused tab widget).
 
+	Files bigger than :any:`eye.widgets.viewer.SIZE_THRESHOLD` are opened in a read-only
+	:any:`eye.widgets.viewer.FileViewer` instead of an editor.
+
 	:param path: path of the file to open in an editor widget
 	:type path: str
 	:param loc: optional line and column where to focus
@@ -61,7 +99,7 @@ def openEditor(path, loc=None):
 	:rtype: :any:`eye.widgets.editor.Editor`
 	"""
 
-	ed = findEditor(path)
+	ed = findEditor(path) or findViewer(path)
 	if not ed:
 		ed = _createEditor(path)
 
@@ -77,19 +115,62 @@ def listEditors():
 	"""List all editor widgets
 
 	Uses category `"editor"`.
+
+	:rtype: iter[eye.widgets.editor.Editor]
 	"""
 	for ed in connector.categoryObjects('editor'):
-		yield ed.path
+		yield ed
+
+
+def saveModifiedEditors(callback=None):
+	"""Save all modified editor widgets concurrently
+
+	Files are written in worker threads (see :any:`eye.widgets.editor.Editor.startSave`), a bounded number
+	at a time. Editors without a path are skipped, as are editors sharing a path with another editor.
+	Failures are logged, and reported to `callback` once all files are written.
+
+	Uses category `"editor"`.
+
+	:param callback: if not None, called when all files are written, with a dict mapping each path to
+	                 None if it was saved successfully, or an error message
+	:returns: the list of paths being saved
+	"""
+	editors = {}
+	for ed in connector.categoryObjects('editor'):
+		if ed.path and ed.isModified():
+			editors.setdefault(ed.path, ed)
+
+	results = {}
+
+	def onSaved(ed, path, error):
+		results[path] = None if error is None else str(error)
+		if len(results) < len(editors):
+			return
+
+		failed = sorted(path for path in results if results[path] is not None)
+		if failed:
+			LOGGER.error('%d files could not be saved: %s', len(failed), ', '.join(failed))
+		if callback is not None:
+			callback(results)
+
+	if not editors and callback is not None:
+		callback(results)
+
+	for path, ed in list(editors.items()):
+		if not ed.startSave(callback=onSaved):
+			onSaved(ed, path, 'cannot save while file is loading')
+
+	return list(editors)
 
 
 def currentBuffer():
 	"""Get currently focused editor"""
-	win = _getWindow()
+	win = currentWindow()
 	return win.currentBuffer()
 
 
 def _defaultTabs():
-	win = _getWindow()
+	win = currentWindow()
 	cur = win.currentBuffer()
 	return parentTabWidget(cur)
 
@@ -1,16 +1,15 @@
 # this project is licensed under the WTFPLv2, see COPYING.txt for details
 
-from contextlib import contextmanager
-import re
+from collections import OrderedDict
 
-from PyQt5.QtCore import QObject, QTimer, QElapsedTimer
+from PyQt5.QtWidgets import QLabel
 
 from ..connector import registerSignal, CategoryMixin
-from ..widgets.editor import HasWeakEditorMixin, SciModification
+from ..widgets.editor import SearchHighlighter
 from ..widgets import minibuffer
-from ..three import range
-from ..qt import Signal, Slot
+from ..qt import Slot
 from .. import structs
+from .. import textsearch
 from . import buffers
 
 
@@ -18,6 +17,11 @@ __all__ = ('openSearchLine', 'searchForward', 'searchBackward',
            'SearchObject', 'SearchProps', 'performSearch')
 
 
+MAX_CACHED_RESULTS = 8
+
+"""Number of previous searches whose matches are kept by a :any:`SearchObject`, while the text is unchanged"""
+
+
 class SearchProps(structs.PropDict):
 	def __init__(self, **kwargs):
 		super(SearchProps, self).__init__()
@@ -28,122 +32,119 @@ class SearchProps(structs.PropDict):
 		self.update(**kwargs)
 
 
-def props_to_re(props):
-	re_flags = 0
-	if not props.caseSensitive:
-		re_flags |= re.I
+def props_to_pattern(props):
+	return textsearch.compileSearch(props.expr, props.isRe, props.caseSensitive, props.whole)
 
-	if props.isRe:
-		return re.compile(props.expr, re_flags)
-	else:
-		re_text = re.escape(props.expr)
-		if props.whole:
-			re_text = r'\b%s\b' % re_text
-		return re.compile(re_text, re_flags)
 
+def _propsKey(props):
+	return (props.expr, props.isRe, props.caseSensitive, props.whole)
 
-class SearchObject(QObject, HasWeakEditorMixin, CategoryMixin):
-	started = Signal()
-	found = Signal(int, int)
-	finished = Signal(int)
 
-	def __init__(self, editor=None, indicatorName=None, props=None, **kwargs):
-		super(SearchObject, self).__init__(**kwargs)
-		self.editor = editor
-		self.props = props
+def _hasBorder(text):
+	# whether a proper prefix of text is also a suffix, then matches of text can overlap
+	return any(text[:n] == text[-n:] for n in range(1, len(text)))
 
-		self.indicator = editor.indicators.get(indicatorName)
-		if not self.indicator:
-			self.indicator = editor.createIndicator(indicatorName, 0)
 
-		self.timer = QTimer(self)
-		self.timer.timeout.connect(self._searchBatch)
+def _canRefine(old, new):
+	"""Return True if matches of search `new` can only start where matches of search `old` start
 
-		self.start_line = 0
-		self.reobj = None
+	It's the case when `new` is literal text extending `old`, and matches of `old` can't overlap, so all
+	the offsets where `old` matches are known from its results.
+	"""
+	if old.isRe or new.isRe or old.whole or new.whole or old.caseSensitive != new.caseSensitive:
+		return False
+	elif not new.expr.startswith(old.expr):
+		return False
+	return not _hasBorder(old.expr if old.caseSensitive else old.expr.lower())
 
-		self.editor.sciModified.connect(self.onModify)
 
-		self.addCategory('search_object')
+class SearchObject(SearchHighlighter, CategoryMixin):
+	"""Highlight matches of a search in an editor, see :any:`eye.widgets.editor.SearchHighlighter`
 
-	@contextmanager
-	def safeBatch(self):
-		try:
-			yield
-		except:
-			self.timer.stop()
-			self.finished.emit(0)
-			raise
+	A search object can be reused for successive searches, for example while the search text is typed.
+	The matches of the last searches are kept until the text is modified, so when the search text is
+	extended, only the offsets where the previous text matched are tested, and when it's shortened again,
+	the previous matches are reused as is.
+	"""
 
-	def searchAllPy(self, needOne=False):
-		if not self.props.expr:
-			return
+	def __init__(self, editor=None, indicatorName=None, props=None, **kwargs):
+		indicator = editor.indicators.get(indicatorName)
+		if not indicator:
+			indicator = editor.createIndicator(indicatorName, 0)
 
-		self.reobj = props_to_re(self.props)
-		self.start_line = 0
+		super(SearchObject, self).__init__(editor=editor, indicator=indicator, **kwargs)
+		self.props = props
+
+		# (props, match starts) of the last searches, by _propsKey
+		self.results = OrderedDict()
+		self.countChanged.connect(self._keepResults)
+		editor.textChanged.connect(self._dropResults)
 
-		self.started.emit()
+		self.addCategory('search_object')
+
+	@Slot(int)
+	def _keepResults(self, count):
+		if count < 0:
+			return
 
-		with self.safeBatch():
-			self.indicator.clear()
-			self.timer.start()
-			if needOne:
-				self._searchBatch(needOne=True)
+		key = _propsKey(self.props)
+		self.results.pop(key, None)
+		self.results[key] = (SearchProps(**self.props), self.matchStarts)
+		while len(self.results) > MAX_CACHED_RESULTS:
+			self.results.popitem(last=False)
 
 	@Slot()
-	def _searchBatch(self, needOne=False):
-		with self.safeBatch():
-			start_time = QElapsedTimer()
-			start_time.start()
+	def _dropResults(self):
+		self.results.clear()
 
-			for self.start_line in range(self.start_line, self.editor.lines()):
-				if not needOne and start_time.hasExpired(10):
-					return
+	def _startSearch(self):
+		pattern = props_to_pattern(self.props)
 
-				matched = self.searchInLine(self.start_line)
-				if matched:
-					needOne = False
+		cached = self.results.get(_propsKey(self.props))
+		if cached is not None:
+			self.start(pattern, cached[1], exact=True)
+			return
 
-			self.timer.stop()
-			self.finished.emit(0)
+		candidates = None
+		for props, starts in self.results.values():
+			if _canRefine(props, self.props) and (candidates is None or len(starts) < len(candidates)):
+				candidates = starts
+		self.start(pattern, candidates)
 
-	def searchInLine(self, lineno, erase_indicator=False):
-		if erase_indicator:
-			self.indicator.removeAt(lineno, 0, lineno + 1, 0)
-
-		matched = False
-		linetext = self.editor.text(lineno)
-		for mtc in self.reobj.finditer(linetext):
-			offset_start = self.editor.positionFromLineIndex(lineno, mtc.start())
-			offset_end = self.editor.positionFromLineIndex(lineno, mtc.end())
-			self.indicator.putAtOffset(offset_start, offset_end)
-			self.found.emit(offset_start, offset_end)
-			matched = True
-		return matched
+	def searchAllPy(self, needOne=False, start=None):
+		"""Highlight all matches, visible lines first
 
-	def searchAll(self):
-		self.indicator.clear()
+		:param needOne: if True, search synchronously until a match after `start` is found
+		:param start: offset where to look for a match, defaults to the cursor
+		"""
+		if not self.props.expr:
+			self.clear()
+			return
 
-		end = self.editor.bytesLength()
-		self.editor.setTargetRange(0, end)
+		self._startSearch()
+		if needOne:
+			if start is None:
+				start = self.editor.cursorOffset()
+			self.searchNearest(start)
 
-		self.started.emit()
-		while True:
-			if self.editor.searchInTarget(self.pops.expr) < 0:
-				break
+	def searchInLines(self, first, last, erase_indicator=False):
+		"""Search lines from `first` (inclusive) to `last` (exclusive), return True if there was a match"""
+		return self.searchLines(first, last) > 0
 
-			self.indicator.putAtOffset(self.editor.targetStart(), self.editor.targetEnd())
-			self.found.emit(self.editor.targetStart(), self.editor.targetEnd())
-			self.editor.setTargetRange(self.editor.targetEnd(), end)
-		self.finished.emit()
+	def searchInLine(self, lineno, erase_indicator=False):
+		return self.searchInLines(lineno, lineno + 1, erase_indicator)
 
-	@Slot(SciModification)
-	def onModify(self, modif):
-		if modif.modificationType & (self.editor.SC_MOD_INSERTTEXT | self.editor.SC_MOD_DELETETEXT):
-			line_start, _ = self.editor.lineIndexFromPosition(modif.position)
-			line_end, _ = self.editor.lineIndexFromPosition(modif.position + modif.length)
-			for line in range(line_start, line_end + 1):
-				self.searchInLine(line, erase_indicator=True)
+	def searchAll(self):
+		"""Search the whole editor synchronously"""
+		if not self.props.expr:
+			self.clear()
+			return
+
+		self._startSearch()
+		self.timer.stop()
+		for first, last in self.searched.gaps(0, self.editor.lines()):
+			self.searchLines(first, last)
+		self.finished.emit(self.matchCount())
 
 	def getRanges(self):
 		return list(self.indicator.iterRanges())
@@ -175,6 +176,8 @@ class SearchObject(QObject, HasWeakEditorMixin, CategoryMixin):
 		self.editor.setSelection(endl, endc, startl, startc)
 
 	def seekSelect(self, start=0, forward=True, wrap=True):
+		# the lines around start may not be searched yet
+		self.searchNearest(start, forward)
 		if forward:
 			self._seekForward(start, wrap)
 		else:
@@ -202,10 +205,42 @@ def onSearchTextEdited(ls, text):
 	if not hasattr(editor, 'incSearchStart'):
 		editor.incSearchStart = editor.cursorOffset()
 	editor.searchObj.seekSelect(editor.incSearchStart)
+	_updateMatchCount(editor.searchObj)
+
+
+def _matchCountLabel(window):
+	label = getattr(window, 'searchMatchCount', None)
+	if label is None:
+		label = window.searchMatchCount = QLabel()
+		window.statusBar().addPermanentWidget(label)
+	return label
+
+
+def _updateMatchCount(searchObj):
+	if not getattr(showMatchCount, 'enabled', True):
+		return
+
+	editor = searchObj.editor
+	window = editor.window()
+	if not hasattr(window, 'statusBar'):
+		return
+
+	status = searchObj.matchStatus(editor._selectionOffsets()[0])
+	_matchCountLabel(window).setText('' if status is None else '%d of %d' % status)
+
+
+@registerSignal('search_object', 'countChanged')
+def showMatchCount(searchObj, count):
+	"""Show "N of M" in the status bar of the window, N being the match at the selection"""
+	_updateMatchCount(searchObj)
 
 
 def performSearch(editor, props, needOne=False):
-	editor.searchObj = SearchObject(editor=editor, indicatorName='search', props=props)
+	# reuse the search object, to refine the previous results and not leak connections
+	if getattr(editor, 'searchObj', None) is None:
+		editor.searchObj = SearchObject(editor=editor, indicatorName='search', props=props, parent=editor)
+
+	editor.searchObj.props = props
 	editor.searchObj.searchAllPy(needOne=needOne)
 
 
@@ -213,6 +248,7 @@ def performSearchSeek(editor, props):
 	performSearch(editor, props, needOne=True)
 	editor.searchObj.seekSelect(editor.cursorOffset())
 	editor.incSearchStart = editor.cursorOffset()
+	_updateMatchCount(editor.searchObj)
 
 
 @registerSignal('linesearch', 'textEntered')
@@ -233,6 +269,7 @@ def _searchNext(editor, forward):
 
 	editor.searchObj.seekSelect(editor.cursorOffset(), forward=forward)
 	editor.incSearchStart = editor.cursorOffset()
+	_updateMatchCount(editor.searchObj)
 
 
 def searchForward(editor):
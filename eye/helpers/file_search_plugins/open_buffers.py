@@ -0,0 +1,214 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Search plugin searching in the open editors
+
+Unlike grep-like plugins, which search files on disk, this plugin searches the text of the open editors
+(see :any:`eye.helpers.buffers.listEditors`), including their unsaved modifications.
+
+When a search starts, the text of each editor is copied, and the copies are searched in a pool of worker
+threads, so the editors can be modified meanwhile. Results are emitted as they're found, editor by editor,
+and the search can be interrupted. Like grep, each matching line is reported once.
+
+The pattern is a regular expression in Python syntax, see :doc:`eye.textsearch`.
+"""
+
+from logging import getLogger
+import os
+import re
+import threading
+
+from PyQt5.QtCore import Qt
+
+from .base import registerPlugin, SearchPlugin
+from ...qt import Signal, Slot
+from ... import textsearch
+from .. import buffers
+
+
+__all__ = ('OpenBuffersSearch',)
+
+
+LOGGER = getLogger(__name__)
+
+SCAN_WORKERS = 4
+
+"""Maximum number of editors searched at once"""
+
+SCAN_CHUNK_SIZE = 1 << 18
+
+"""Approximate number of bytes searched at once, between checks for interruption"""
+
+RESULTS_BATCH_SIZE = 256
+
+"""Maximum number of results passed at once from a worker thread"""
+
+
+def _lineResult(data, path, lineno, lineStart, start):
+	lineEnd = data.find(b'\n', start)
+	if lineEnd < 0:
+		lineEnd = len(data)
+
+	return {
+		'path': path,
+		'line': lineno,
+		'col': len(data[lineStart:start].decode('utf-8', 'replace')) + 1,
+		'snippet': data[lineStart:lineEnd].decode('utf-8', 'replace').rstrip('\r'),
+	}
+
+
+def _scanBuffer(pattern, path, data, cancelled, sendResults):
+	# search by chunks of whole lines, counting lines incrementally
+	lineno = 1
+	counted = 0
+	lastLine = 0
+	results = []
+
+	pos = 0
+	while pos < len(data):
+		if cancelled.is_set():
+			return
+
+		end = data.find(b'\n', pos + SCAN_CHUNK_SIZE) + 1 or len(data)
+		for start, _ in pattern.finditer(data, pos, end):
+			lineno += data.count(b'\n', counted, start)
+			counted = start
+			if lineno == lastLine:
+				continue
+			lastLine = lineno
+
+			lineStart = data.rfind(b'\n', 0, start) + 1
+			results.append(_lineResult(data, path, lineno, lineStart, start))
+			if len(results) >= RESULTS_BATCH_SIZE:
+				sendResults(results)
+				results = []
+		pos = end
+
+	if results:
+		sendResults(results)
+
+
+@registerPlugin
+class OpenBuffersSearch(SearchPlugin):
+	"""Search plugin searching in the open editors, with their unsaved modifications
+
+	The `path` passed to :any:`search` is only used to shorten paths of the results, all the editors are
+	searched. Editors without a path are skipped, as their results couldn't be opened.
+	"""
+
+	id = 'open-buffers'
+
+	_resultsReady = Signal(object)
+	_bufferDone = Signal(object)
+
+	pool = None
+
+	def __init__(self, **kwargs):
+		super(OpenBuffersSearch, self).__init__(**kwargs)
+		self.root = None
+		self.cancelled = None
+		self.futures = []
+		self.remaining = 0
+
+		self._resultsReady.connect(self._onResults, Qt.QueuedConnection)
+		self._bufferDone.connect(self._onBufferDone, Qt.QueuedConnection)
+
+	def __del__(self):
+		self.interrupt()
+
+	@classmethod
+	def isAvailable(cls, path):
+		return True
+
+	@classmethod
+	def searchRootPath(cls, path):
+		path = path or '.'
+		if os.path.isfile(path):
+			path = os.path.dirname(path)
+		return path
+
+	@classmethod
+	def _getPool(cls):
+		if cls.pool is None:
+			from concurrent import futures
+
+			cls.pool = futures.ThreadPoolExecutor(max_workers=SCAN_WORKERS)
+		return cls.pool
+
+	def _snapshots(self):
+		seen = set()
+		for editor in buffers.listEditors():
+			if not editor.path or editor.path in seen:
+				continue
+			seen.add(editor.path)
+			yield editor.path, editor.bytesView().tobytes()
+
+	def search(self, path, pattern, caseSensitive=True):
+		self.interrupt()
+
+		self.root = path
+		self.started.emit()
+		try:
+			pattern = textsearch.compileSearch(pattern, isRe=True, caseSensitive=caseSensitive)
+		except re.error:
+			LOGGER.info('invalid regex %r', pattern, exc_info=True)
+			self.finished.emit(1)
+			return
+
+		cancelled = self.cancelled = threading.Event()
+		snapshots = list(self._snapshots())
+		self.remaining = len(snapshots)
+		if not snapshots:
+			self.cancelled = None
+			self.finished.emit(0)
+			return
+
+		pool = self._getPool()
+		for bufpath, data in snapshots:
+			# the signals are emitted in the worker threads, with the cancel event to discard stale results
+			sendResults = lambda results: self._resultsReady.emit((cancelled, results))
+			future = pool.submit(_scanBuffer, pattern, bufpath, data, cancelled, sendResults)
+			future.add_done_callback(lambda fut: self._bufferDone.emit((cancelled, fut)))
+			self.futures.append(future)
+
+	def _shortPath(self, path):
+		if self.root and path.startswith(os.path.join(self.root, '')):
+			return os.path.relpath(path, self.root)
+		return path
+
+	@Slot(object)
+	def _onResults(self, job):
+		cancelled, results = job
+		for res in results:
+			if cancelled is not self.cancelled:
+				# interrupted, possibly by a receiver of found
+				return
+			res['shortpath'] = self._shortPath(res['path'])
+			self.found.emit(res)
+
+	@Slot(object)
+	def _onBufferDone(self, job):
+		cancelled, future = job
+		if cancelled is not self.cancelled:
+			return
+
+		if not future.cancelled() and future.exception() is not None:
+			LOGGER.error('error while searching buffer', exc_info=future.exception())
+
+		self.remaining -= 1
+		if not self.remaining:
+			self.cancelled = None
+			self.futures = []
+			self.finished.emit(0)
+
+	@Slot()
+	def interrupt(self):
+		"""Interrupt the running search, results not emitted yet are dropped"""
+		if self.cancelled is None:
+			return
+
+		self.cancelled.set()
+		self.cancelled = None
+		for future in self.futures:
+			future.cancel()
+		self.futures = []
+		self.finished.emit(1)
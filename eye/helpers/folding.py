@@ -17,6 +17,7 @@ from PyQt5.Qsci import QsciScintilla
 import re
 
 from ..connector import disabled, defaultLexerConfig, defaultEditorConfig
+from .. import bigfile
 from ..widgets.editor import HasWeakEditorMixin
 from ..qt import Slot
 
@@ -99,11 +100,41 @@ class MarkerFolder(QObject, HasWeakEditorMixin):
 
 		# TODO smarter refold: check if insert/delete contains pattern or changes folding
 
+	def dispose(self):
+		"""Stop refolding the editor"""
+		self.timer.stop()
+		self.linesToRefold.clear()
+		if self.editor:
+			self.editor.sciModified.disconnect(self.onModification)
+
 
 @defaultEditorConfig
 @defaultLexerConfig
 @disabled
 def setMarkerFolder(editor, *args):
-	"""Enable folding based on markers for an editor widget"""
+	"""Enable folding based on markers for an editor widget
+
+	Marker folding is disabled in big file mode, see :doc:`eye.bigfile`.
+	"""
 	editor.setLexerProperty(b'fold', b'0')
+	if bigfile.isDegraded(editor, 'marker_folding'):
+		return
+
+	if isinstance(getattr(editor, 'folding', None), MarkerFolder):
+		editor.folding.dispose()
 	editor.folding = MarkerFolder(editor=editor)
+
+
+def _degradeMarkerFolder(editor):
+	folder = getattr(editor, 'folding', None)
+	if isinstance(folder, MarkerFolder):
+		folder.dispose()
+		editor.folding = None
+
+
+def _restoreMarkerFolder(editor):
+	if setMarkerFolder.enabled:
+		setMarkerFolder(editor)
+
+
+bigfile.registerFeature('marker_folding', 'marker folding', _degradeMarkerFolder, _restoreMarkerFolder)
@@ -0,0 +1,313 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Follow mode for growing files, like ``tail -f``
+
+When an editor follows its file, and the file grows on disk, only the new bytes are read and appended to
+the editor, instead of reloading the whole file. The file is considered to have grown if it's still the
+same file (same inode) and its first bytes are unchanged (same checksum). Otherwise, for example if the
+log file was rotated or truncated, the editor is reloaded (see :any:`eye.widgets.editor.Editor.reloadFile`).
+If the editor has unsaved modifications, nothing is changed and
+:any:`eye.widgets.editor.Editor.fileModifiedExternally` is emitted, like when the editor doesn't follow its
+file.
+
+Change notifications come from :any:`eye.helpers.file_monitor.MONITOR`, bursts of notifications are
+coalesced so the file is read at most every :any:`FOLLOW_INTERVAL_MS`.
+
+Optionally, the editor scrolls to the new content if the cursor was at the end, and the oldest lines are
+removed from the editor to keep a bounded history.
+
+Simple usage::
+
+	>>> import eye.helpers.follow
+	>>> eye.helpers.follow.startFollowing(editor, maxLines=100000)
+
+Or, to follow all ``*.log`` files automatically:
+
+	>>> eye.helpers.follow.followLogFiles.enabled = True
+"""
+
+from contextlib import contextmanager
+from logging import getLogger
+import os
+import zlib
+
+from PyQt5.QtCore import QObject, QTimer
+
+from ..charset import StreamDecoder
+from ..connector import registerSignal, disabled
+from ..widgets.editor import HasWeakEditorMixin, SciModification
+from ..qt import Signal, Slot
+from .file_monitor import MONITOR
+
+
+__all__ = ('FileFollower', 'startFollowing', 'stopFollowing', 'isFollowing', 'followLogFiles')
+
+
+LOGGER = getLogger(__name__)
+
+FOLLOW_INTERVAL_MS = 200
+
+"""Minimum interval between reads of a followed file"""
+
+PREFIX_CHECK_SIZE = 4096
+
+"""Number of bytes at the beginning of the file checked to detect it was rewritten"""
+
+READ_CHUNK_SIZE = 4 << 20
+
+"""Maximum number of bytes appended at once, if more were written, they are appended at next iteration"""
+
+
+class FileFollower(QObject, HasWeakEditorMixin):
+	"""Append new content of a growing file to an editor
+
+	Instances should be created with :any:`startFollowing`.
+	"""
+
+	appended = Signal(int)
+
+	"""appended(int)
+
+	Emitted when bytes were read from the file and appended to the editor, with the number of bytes read.
+	"""
+
+	def __init__(self, editor, autoScroll=True, maxLines=None, maxBytes=None, **kwargs):
+		super(FileFollower, self).__init__(**kwargs)
+		self.editor = editor
+		self.path = editor.path
+
+		self.autoScroll = autoScroll
+		"""Whether to scroll to the new content when the cursor is at the end of the editor"""
+
+		self.maxLines = maxLines
+		"""If not None, the oldest lines are removed from the editor to keep at most this number of lines"""
+
+		self.maxBytes = maxBytes
+		"""If not None, the oldest lines are removed from the editor to keep at most this number of bytes"""
+
+		self.timer = QTimer(self)
+		self.timer.setSingleShot(True)
+		self.timer.setInterval(FOLLOW_INTERVAL_MS)
+		self.timer.timeout.connect(self._update)
+
+		self._resetState()
+
+		self.watcher = MONITOR.monitorFile(self.path)
+		self.watcher.modified.connect(self._onModified)
+
+		# connection of the editor to its file monitor, which this object replaces while following
+		self.editorMonitor = getattr(editor, 'fileMonitor', None)
+		if self.editorMonitor is not None:
+			self.editorMonitor.modified.disconnect(editor.fileModifiedExternally)
+
+		editor.fileAboutToBeOpened.connect(self._onEditorOpening)
+
+	def _resetState(self):
+		st = os.stat(self.path)
+		self.fileId = (st.st_dev, st.st_ino)
+		self.offset = st.st_size
+		self.prefixLength, self.prefixSum = self._readPrefix(min(st.st_size, PREFIX_CHECK_SIZE))
+
+		editor = self.editor
+		self.decoder = StreamDecoder(editor.saving.encoding)
+		self.newline = editor._newlineString().encode('utf-8')
+		# the final newline of the file is not in the editor, see Editor.setUseFinalNewline
+		self.pending = b''
+		if editor.saving.final_newline and self.offset >= len(self.newline):
+			with open(self.path, 'rb') as fd:
+				fd.seek(self.offset - len(self.newline))
+				if fd.read(len(self.newline)) == self.newline:
+					self.pending = self.newline
+
+	def _readPrefix(self, length):
+		with open(self.path, 'rb') as fd:
+			data = fd.read(length)
+		return len(data), zlib.adler32(data)
+
+	def stop(self):
+		"""Stop following the file"""
+		self.timer.stop()
+		self.watcher.modified.disconnect(self._onModified)
+
+		editor = self.editor
+		editor.fileAboutToBeOpened.disconnect(self._onEditorOpening)
+		if self.editorMonitor is not None and self.editorMonitor is getattr(editor, 'fileMonitor', None):
+			self.editorMonitor.modified.connect(editor.fileModifiedExternally)
+		self.editorMonitor = None
+
+	@Slot(str)
+	def _onEditorOpening(self, path):
+		stopFollowing(self.editor)
+
+	@Slot()
+	def _onModified(self):
+		if not self.timer.isActive():
+			self.timer.start()
+
+	@Slot()
+	def _update(self):
+		editor = self.editor
+		if editor.isModified() or editor.isLoading():
+			LOGGER.debug('not following %r because editor is modified or loading', self.path)
+			editor.fileModifiedExternally.emit()
+			return
+
+		try:
+			st = os.stat(self.path)
+			grown = self._hasGrown(st)
+		except (IOError, OSError):
+			LOGGER.info('cannot follow %r', self.path, exc_info=True)
+			editor.fileModifiedExternally.emit()
+			return
+
+		if not grown:
+			LOGGER.debug('%r was rewritten, reloading it', self.path)
+			editor.reloadFile()
+			self._resetState()
+			with self._silentEdit():
+				self._trimHead()
+			return
+
+		if st.st_size == self.offset:
+			return
+
+		end = min(st.st_size, self.offset + READ_CHUNK_SIZE)
+		with open(self.path, 'rb') as fd:
+			fd.seek(self.offset)
+			data = fd.read(end - self.offset)
+		self.offset += len(data)
+		self._append(data)
+		self.appended.emit(len(data))
+
+		if self.offset < st.st_size:
+			self.timer.start(0)
+
+	def _hasGrown(self, st):
+		if (st.st_dev, st.st_ino) != self.fileId or st.st_size < self.offset:
+			return False
+
+		length, checksum = self._readPrefix(self.prefixLength)
+		if (length, checksum) != (self.prefixLength, self.prefixSum):
+			return False
+
+		if self.prefixLength < PREFIX_CHECK_SIZE and self.offset > self.prefixLength:
+			self.prefixLength, self.prefixSum = self._readPrefix(min(self.offset, PREFIX_CHECK_SIZE))
+		return True
+
+	def _append(self, data):
+		editor = self.editor
+		chunk = self.pending + self.decoder.decode(data)
+		if editor.saving.final_newline and chunk.endswith(self.newline):
+			self.pending = self.newline
+			chunk = chunk[:-len(self.newline)]
+		else:
+			self.pending = b''
+
+		atEnd = editor.cursorOffset() == editor.bytesLength()
+
+		with self._silentEdit():
+			self._appendText(chunk)
+			self._trimHead()
+
+		if self.autoScroll and atEnd:
+			editor.SendScintilla(editor.SCI_DOCUMENTEND)
+
+	@contextmanager
+	def _silentEdit(self):
+		# edit the editor as if it was loaded from the file: even if read-only, without undo and unmodified
+		editor = self.editor
+		readOnly = editor.isReadOnly()
+		collectUndo = editor.SendScintilla(editor.SCI_GETUNDOCOLLECTION)
+		editor.setReadOnly(False)
+		editor.SendScintilla(editor.SCI_SETUNDOCOLLECTION, False)
+		try:
+			yield
+		finally:
+			editor.SendScintilla(editor.SCI_SETUNDOCOLLECTION, collectUndo)
+			editor.setReadOnly(readOnly)
+		editor.setModified(False)
+
+	def _appendText(self, chunk):
+		# QScintilla handles insertion notifications in time proportional to the insertion offset, which
+		# is slow at the end of a big document, so the notification is masked and the signals are sent here
+		editor = self.editor
+		position = editor.bytesLength()
+		line = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, position)
+		lines = editor.lines()
+
+		mask = editor.SendScintilla(editor.SCI_GETMODEVENTMASK)
+		editor.SendScintilla(editor.SCI_SETMODEVENTMASK, 0)
+		try:
+			editor.SendScintilla(editor.SCI_APPENDTEXT, len(chunk), chunk)
+		finally:
+			editor.SendScintilla(editor.SCI_SETMODEVENTMASK, mask)
+
+		linesAdded = editor.lines() - lines
+		if mask & editor.SC_MOD_INSERTTEXT:
+			editor.sciModified.emit(SciModification(
+				position, editor.SC_MOD_INSERTTEXT | editor.SC_PERFORMED_USER, chunk, len(chunk),
+				linesAdded, line, 0, 0, 0, 0
+			))
+		editor.textChanged.emit()
+		if linesAdded:
+			editor.linesChanged.emit()
+
+	def _trimHead(self):
+		editor = self.editor
+		end = 0
+
+		if self.maxLines is not None and editor.lines() > self.maxLines:
+			end = editor.SendScintilla(editor.SCI_POSITIONFROMLINE, editor.lines() - self.maxLines)
+
+		if self.maxBytes is not None and editor.bytesLength() - end > self.maxBytes:
+			line = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, editor.bytesLength() - self.maxBytes)
+			end = editor.SendScintilla(editor.SCI_POSITIONFROMLINE, line + 1)
+
+		if end > 0:
+			editor.SendScintilla(editor.SCI_DELETERANGE, 0, end)
+
+
+def startFollowing(editor, autoScroll=True, maxLines=None, maxBytes=None):
+	"""Make `editor` follow its file as it grows
+
+	While following, :any:`eye.widgets.editor.Editor.fileModifiedExternally` is only emitted if the file
+	was rewritten instead of appended to, or if the editor has unsaved modifications.
+
+	:param autoScroll: scroll to the new content if the cursor is at the end of the editor
+	:param maxLines: if not None, remove the oldest lines to keep at most `maxLines` lines
+	:param maxBytes: if not None, remove the oldest lines to keep at most `maxBytes` bytes
+	:rtype: FileFollower
+	"""
+	stopFollowing(editor)
+
+	follower = FileFollower(editor, autoScroll, maxLines, maxBytes, parent=editor)
+	editor.follower = follower
+	with follower._silentEdit():
+		follower._trimHead()
+	return follower
+
+
+def stopFollowing(editor):
+	"""Stop following the file of `editor`, if it was followed"""
+	follower = getattr(editor, 'follower', None)
+	if follower is None:
+		return
+
+	follower.stop()
+	follower.setParent(None)
+	editor.follower = None
+
+
+def isFollowing(editor):
+	"""Return True if `editor` follows its file"""
+	return getattr(editor, 'follower', None) is not None
+
+
+@registerSignal('editor', 'fileOpened')
+@disabled
+def followLogFiles(editor, path):
+	"""Follow files with the ``.log`` extension when they are opened"""
+	if path.endswith('.log'):
+		startFollowing(editor)
+	else:
+		stopFollowing(editor)
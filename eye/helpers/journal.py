@@ -0,0 +1,548 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Crash-recovery journal of unsaved modifications
+
+When enabled, the insertions and deletions done in a modified editor are recorded in a journal file, in
+the cache directory. If EYE (or X) crashes, the unsaved modifications can be recovered at next startup
+by replaying the journal on the file as it is on disk, see :any:`recoverJournals`.
+
+Only the modifications are written, so the amount of data written is proportional to what is typed (or
+pasted, etc.), not to the size of the file. Modifications are buffered, and appended to the journal file
+by a background thread at most every :any:`FLUSH_INTERVAL_MS`.
+
+The journal is deleted when the editor isn't modified anymore (the file was saved or reloaded, or the
+modifications were undone) or when the file is closed. If the editor is modified again during an
+asynchronous save, the journal is rewritten with the saved file as base and the modifications done
+since the save started.
+
+A journal starts from the content of the file on disk, identified by its SHA-1 hash and the length of
+the editor text. It's only replayed if the file on disk still matches.
+
+Journal files start with the bytes ``EYEJ\\x01``, then a header (a 4-byte length and a JSON object), then
+records: a 9-byte header (type, position and length) followed, for insertions, by the inserted bytes.
+
+Example configuration::
+
+	import eye.helpers.journal
+	eye.helpers.journal.setEnabled(True)
+	# offer to recover modifications lost in a crash, once the window is created
+	eye.helpers.journal.recoverJournals()
+"""
+
+import errno
+import hashlib
+from itertools import count
+import json
+from logging import getLogger
+import os
+import struct
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWidgets import QMessageBox
+
+from ..connector import registerSignal, disabled
+from ..pathutils import getCachePath
+from ..qt import Slot
+from ..utils import exceptionLogging
+from ..widgets.editor import HasWeakEditorMixin
+from ..widgets.helpers import parentTabWidget
+from . import buffers
+
+
+__all__ = ('Journal', 'JournalFile', 'setEnabled', 'listOrphanJournals', 'replayJournal',
+           'recoverJournals')
+
+
+LOGGER = getLogger(__name__)
+
+FLUSH_INTERVAL_MS = 1000
+
+"""Maximum time modifications are buffered before being written to the journal file"""
+
+MAGIC = b'EYEJ\x01'
+
+RECORD = struct.Struct('<BII')
+
+INSERT = 1
+DELETE = 2
+
+JOURNAL_EXT = '.eyej'
+
+COUNTER = count()
+
+
+def getJournalDir():
+	return getCachePath('journal')
+
+
+def _newJournalPath():
+	name = '%d-%d%s' % (os.getpid(), next(COUNTER), JOURNAL_EXT)
+	return os.path.join(getJournalDir(), name)
+
+
+def fileHash(path):
+	"""Return the SHA-1 hex digest of file at `path`, or None if it doesn't exist"""
+	if not path:
+		return None
+
+	digest = hashlib.sha1()
+	try:
+		with open(path, 'rb') as fd:
+			for chunk in iter(lambda: fd.read(1 << 20), b''):
+				digest.update(chunk)
+	except (IOError, OSError) as exc:
+		if exc.errno == errno.ENOENT:
+			return None
+		raise
+	return digest.hexdigest()
+
+
+## writing, in the background thread
+def _writeJournal(journalPath, path, baseLength, data):
+	header = json.dumps({
+		'path': path,
+		'sha1': fileHash(path),
+		'length': baseLength,
+		'time': time.time(),
+	}).encode('utf-8')
+
+	tmp = journalPath + '.tmp'
+	with open(tmp, 'wb') as fd:
+		fd.write(MAGIC)
+		fd.write(struct.pack('<I', len(header)))
+		fd.write(header)
+		fd.write(data)
+	os.rename(tmp, journalPath)
+
+
+def _appendJournal(journalPath, data):
+	with open(journalPath, 'ab') as fd:
+		fd.write(data)
+
+
+def _removeJournal(journalPath):
+	try:
+		os.remove(journalPath)
+	except OSError as exc:
+		if exc.errno != errno.ENOENT:
+			raise
+
+
+class Writer(object):
+	"""Background thread writing journal files, jobs are run in order"""
+
+	def __init__(self):
+		self.pool = None
+
+	def _run(self, func, *args):
+		with exceptionLogging(reraise=False, logger=LOGGER):
+			func(*args)
+
+	def submit(self, func, *args):
+		if self.pool is None:
+			from concurrent import futures
+
+			self.pool = futures.ThreadPoolExecutor(max_workers=1)
+
+		return self.pool.submit(self._run, func, *args)
+
+	def wait(self):
+		"""Block until all submitted jobs are done"""
+		if self.pool is not None:
+			self.submit(lambda: None).result()
+
+
+WRITER = Writer()
+
+
+## recording, in the GUI thread
+class Journal(QObject, HasWeakEditorMixin):
+	"""Journal of the modifications of an editor since its file was last saved
+
+	Instances are created by the plugin when an editor is modified, and shouldn't be created directly.
+	"""
+
+	def __init__(self, editor, **kwargs):
+		super(Journal, self).__init__(**kwargs)
+		self.editor = editor
+
+		self.journalPath = None
+		"""Path of the journal file, None if the editor wasn't modified"""
+
+		self.pending = []
+		# records since the start of the current save, None if not saving
+		self.sinceSave = None
+		self.saveLength = 0
+
+		self.timer = QTimer(self)
+		self.timer.setSingleShot(True)
+		self.timer.setInterval(FLUSH_INTERVAL_MS)
+		self.timer.timeout.connect(self.flush)
+
+	def record(self, modif):
+		"""Record a modification of the editor
+
+		:type modif: eye.widgets.editor.SciModification
+		"""
+		editor = self.editor
+		if modif.modificationType & editor.SC_MOD_INSERTTEXT:
+			data = modif.text
+			if data is None or len(data) != modif.length:
+				# text was truncated at a NUL byte
+				start = modif.position
+				data = editor.bytesView()[start:start + modif.length].tobytes()
+			rec = RECORD.pack(INSERT, modif.position, len(data)) + data
+			baseLength = editor.bytesLength() - len(data)
+		elif modif.modificationType & editor.SC_MOD_DELETETEXT:
+			rec = RECORD.pack(DELETE, modif.position, modif.length)
+			baseLength = editor.bytesLength() + modif.length
+		else:
+			return
+
+		if self.journalPath is None:
+			self.journalPath = _newJournalPath()
+			WRITER.submit(_writeJournal, self.journalPath, editor.path, baseLength, b'')
+
+		self.pending.append(rec)
+		if self.sinceSave is not None:
+			self.sinceSave.append(rec)
+		if not self.timer.isActive():
+			self.timer.start()
+
+	@Slot()
+	def flush(self):
+		"""Send buffered modifications to the background thread"""
+		self.timer.stop()
+		if self.pending:
+			data = b''.join(self.pending)
+			self.pending = []
+			WRITER.submit(_appendJournal, self.journalPath, data)
+
+	def reset(self):
+		"""Delete the journal, the editor content is the same as the file"""
+		self.timer.stop()
+		self.pending = []
+		self.sinceSave = None
+		if self.journalPath is not None:
+			WRITER.submit(_removeJournal, self.journalPath)
+			self.journalPath = None
+
+	def saveStarted(self):
+		self.sinceSave = []
+		self.saveLength = self.editor.bytesLength()
+
+	def saveFinished(self, path):
+		sinceSave, self.sinceSave = self.sinceSave, None
+		if self.journalPath is None or sinceSave is None:
+			return
+
+		# the editor was modified during the save, the saved file becomes the base
+		self.timer.stop()
+		self.pending = []
+		old = self.journalPath
+		self.journalPath = _newJournalPath()
+		WRITER.submit(_writeJournal, self.journalPath, path, self.saveLength, b''.join(sinceSave))
+		WRITER.submit(_removeJournal, old)
+
+	def saveFailed(self):
+		self.sinceSave = None
+
+
+# journals by Scintilla document, so editors sharing a document have a single journal
+JOURNALS = {}
+
+
+def _docKey(editor):
+	return editor.SendScintilla(editor.SCI_GETDOCPOINTER)
+
+
+def _getJournal(editor, create=False):
+	key = _docKey(editor)
+	journal = JOURNALS.get(key)
+	if journal is None:
+		if not create:
+			return None
+		journal = JOURNALS[key] = Journal(editor)
+	elif journal.editor is None:
+		journal.editor = editor
+
+	if journal.editor is not editor:
+		# the modification is notified by all editors sharing the document
+		return None
+	return journal
+
+
+@registerSignal('editor', 'sciModified')
+@disabled
+def recordModification(editor, modif):
+	"""Record insertions and deletions done in modified editors in their journal"""
+	if not modif.modificationType & (editor.SC_MOD_INSERTTEXT | editor.SC_MOD_DELETETEXT):
+		return
+	if editor.isLoading() or not editor.isModified():
+		return
+
+	journal = _getJournal(editor, create=True)
+	if journal is not None:
+		journal.record(modif)
+
+
+@registerSignal('editor', 'modificationChanged')
+@disabled
+def resetOnUnmodified(editor, *args):
+	"""Delete the journal of an editor when it's not modified anymore"""
+	if editor.isModified():
+		return
+
+	journal = _getJournal(editor)
+	if journal is not None:
+		journal.reset()
+
+
+@registerSignal('editor', 'fileAboutToBeSaved')
+@disabled
+def onSaveStarted(editor, path):
+	journal = _getJournal(editor)
+	if journal is not None:
+		journal.saveStarted()
+
+
+@registerSignal('editor', 'fileSaved')
+@registerSignal('editor', 'fileSavedAs')
+@disabled
+def onSaveFinished(editor, path):
+	journal = _getJournal(editor)
+	if journal is not None:
+		journal.saveFinished(path)
+
+
+@registerSignal('editor', 'fileSaveFailed')
+@disabled
+def onSaveFailed(editor, path, error):
+	journal = _getJournal(editor)
+	if journal is not None:
+		journal.saveFailed()
+
+
+@registerSignal('editor', 'fileClosed')
+@disabled
+def dropOnClose(editor, path):
+	"""Delete the journal of an editor when it's closed
+
+	The journal is kept if other editors share the document of `editor`.
+	"""
+	key = _docKey(editor)
+	journal = JOURNALS.get(key)
+	if journal is None:
+		return
+
+	# closed editors are removed from their tab, other editors sharing the document are still in a window
+	others = [other for other in buffers.listEditors() if other is not editor and not other.isWindow()]
+	if any(_docKey(other) == key for other in others):
+		if journal.editor is editor:
+			# the next editor notifying a modification records it
+			journal.editor = None
+		return
+
+	journal.reset()
+	del JOURNALS[key]
+
+
+def setEnabled(enabled=True):
+	"""Enable or disable recording modifications in journals"""
+	for handler in (recordModification, resetOnUnmodified, onSaveStarted, onSaveFinished, onSaveFailed,
+	                dropOnClose):
+		handler.enabled = enabled
+
+
+## recovery
+class JournalFile(object):
+	"""Journal file left by a previous instance of EYE"""
+
+	def __init__(self, journalPath):
+		self.journalPath = journalPath
+
+		with open(journalPath, 'rb') as fd:
+			if fd.read(len(MAGIC)) != MAGIC:
+				raise ValueError('%r is not a journal file' % journalPath)
+			size, = struct.unpack('<I', fd.read(4))
+			header = json.loads(fd.read(size).decode('utf-8'))
+			self.dataOffset = fd.tell()
+
+		self.path = header['path']
+		"""Path of the journaled file, empty for an untitled editor"""
+
+		self.sha1 = header['sha1']
+		self.length = header['length']
+		self.time = header['time']
+
+	def isBaseUnchanged(self):
+		"""Return True if the journaled file is unchanged on disk since the journal started"""
+		return fileHash(self.path) == self.sha1
+
+	def iterRecords(self):
+		"""Iterate on the records of the journal
+
+		Yield `(INSERT, position, bytes)` and `(DELETE, position, length)` tuples. A record truncated by a
+		crash ends the iteration.
+		"""
+		with open(self.journalPath, 'rb') as fd:
+			fd.seek(self.dataOffset)
+			while True:
+				head = fd.read(RECORD.size)
+				if len(head) < RECORD.size:
+					break
+
+				kind, position, length = RECORD.unpack(head)
+				if kind == INSERT:
+					data = fd.read(length)
+					if len(data) < length:
+						break
+					yield kind, position, data
+				elif kind == DELETE:
+					yield kind, position, length
+				else:
+					LOGGER.warning('invalid record in %r, ignoring the rest', self.journalPath)
+					break
+
+	def remove(self):
+		_removeJournal(self.journalPath)
+
+
+def _isAlive(pid):
+	try:
+		os.kill(pid, 0)
+	except OSError as exc:
+		return exc.errno == errno.EPERM
+	return True
+
+
+def listOrphanJournals():
+	"""Return the journal files left by instances of EYE which aren't running anymore
+
+	:rtype: list of :any:`JournalFile`
+	"""
+	journals = []
+	directory = getJournalDir()
+	for name in os.listdir(directory):
+		if not name.endswith(JOURNAL_EXT):
+			continue
+
+		try:
+			pid = int(name.split('-', 1)[0])
+		except ValueError:
+			continue
+		if pid == os.getpid() or _isAlive(pid):
+			continue
+
+		try:
+			journals.append(JournalFile(os.path.join(directory, name)))
+		except (IOError, OSError, ValueError, KeyError, struct.error):
+			LOGGER.warning('cannot read journal %r', name, exc_info=True)
+
+	journals.sort(key=lambda journal: journal.time)
+	return journals
+
+
+def replayJournal(editor, journal):
+	"""Apply the modifications recorded in `journal` to `editor`
+
+	`editor` should contain the base content of the journal, i.e. the journaled file as it is on disk.
+	The modifications are applied in a single undo action.
+
+	:type journal: JournalFile
+	:returns: True if the modifications could be applied
+	"""
+	if editor.bytesLength() != journal.length:
+		LOGGER.warning('content of %r does not match journal %r', journal.path, journal.journalPath)
+		return False
+
+	applied = 0
+	with editor.undoGroup():
+		for kind, position, arg in journal.iterRecords():
+			if kind == INSERT and position <= editor.bytesLength():
+				editor.SendScintilla(editor.SCI_INSERTTEXT, position, arg)
+			elif kind == DELETE and position + arg <= editor.bytesLength():
+				editor.SendScintilla(editor.SCI_DELETERANGE, position, arg)
+			else:
+				LOGGER.warning('record out of bounds in %r, ignoring the rest', journal.journalPath)
+				break
+			applied += 1
+
+	LOGGER.info('replayed %d modifications of %r', applied, journal.path)
+	return True
+
+
+def _recover(journal):
+	created = False
+	if journal.path:
+		editor = buffers.findEditor(journal.path)
+		if editor is None:
+			editor = buffers.newEditorOpen(journal.path)
+			created = True
+	else:
+		editor = buffers.currentWindow().bufferNew()
+		created = True
+
+	def replay():
+		if replayJournal(editor, journal):
+			journal.remove()
+			return True
+		elif created:
+			parentTabWidget(editor).closeTab(editor)
+			editor.deleteLater()
+		return False
+
+	if editor.isLoading():
+		def onOpened(path):
+			editor.fileOpened.disconnect(onOpened)
+			replay()
+
+		editor.fileOpened.connect(onOpened)
+	elif not replay():
+		return None
+	return editor
+
+
+def recoverJournals(parent=None):
+	"""Offer to recover modifications recorded in journals by instances of EYE which crashed
+
+	A dialog lists the files with unsaved modifications, and asks whether to recover them, discard them,
+	or ignore them until next time. Journals whose file was modified on disk since are not replayed.
+
+	Recovered files are opened in a window, so if no window exists yet, for example when called from a
+	startup script, the dialog is deferred until the event loop runs, after the main window is created.
+
+	:returns: the editors where modifications were recovered, or an empty list if the dialog was deferred
+	"""
+	if buffers.currentWindow() is None:
+		QTimer.singleShot(0, lambda: recoverJournals(parent))
+		return []
+
+	journals = listOrphanJournals()
+	if not journals:
+		return []
+
+	names = '\n'.join(journal.path or '<untitled>' for journal in journals)
+	answer = QMessageBox.question(
+		parent, 'Unsaved modifications',
+		'EYE did not exit properly. Unsaved modifications of these files can be recovered:\n%s' % names,
+		QMessageBox.Yes | QMessageBox.Discard | QMessageBox.Ignore
+	)
+	if answer == QMessageBox.Discard:
+		for journal in journals:
+			journal.remove()
+		return []
+	elif answer != QMessageBox.Yes:
+		return []
+
+	editors = []
+	for journal in journals:
+		if not journal.isBaseUnchanged():
+			LOGGER.warning('%r was modified since journal %r was written, not recovering it',
+			               journal.path, journal.journalPath)
+			continue
+		editor = _recover(journal)
+		if editor is not None:
+			editors.append(editor)
+	return editors
@@ -12,6 +12,7 @@ Simple usage:
 
 from ..connector import registerSignal, disabled
 from .. import lexers
+from .. import bigfile
 
 import os
 
@@ -24,8 +25,9 @@ def autoLexer(editor, path=None):
 	"""Enables syntax coloring for an editor
 
 	The correct lexer is determined using file extension. See :any:`eye.lexers.extensionToLexer`.
+	No lexer is set in big file mode, see :doc:`eye.bigfile`.
 	"""
-	if editor.lexer():
+	if editor.lexer() or bigfile.isDegraded(editor, 'lexer'):
 		return
 
 	ext = os.path.splitext(editor.path)[1]
@@ -37,3 +39,16 @@ def autoLexer(editor, path=None):
 
 def setEnabled(enabled=True):
 	autoLexer.enabled = enabled
+
+
+def _degradeLexer(editor):
+	if editor.lexer():
+		editor.setLexer(None)
+
+
+def _restoreLexer(editor):
+	if autoLexer.enabled and editor.path:
+		autoLexer(editor, editor.path)
+
+
+bigfile.registerFeature('lexer', 'syntax coloring', _degradeLexer, _restoreLexer)
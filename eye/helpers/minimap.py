@@ -5,6 +5,7 @@ from PyQt5.QtGui import QBrush, QPen, QPainter, QPolygon, QIcon
 from PyQt5.QtWidgets import QFrame, QSizePolicy, QWidget, QHBoxLayout
 
 from ..connector import CategoryMixin, registerSignal, disabled
+from .. import bigfile
 from ..widgets.editor import Editor, SciModification
 from ..widgets.window import Window
 from ..widgets.helpers import acceptIf
@@ -36,7 +37,9 @@ class MiniMap(QFrame, CategoryMixin):
 
 	@Slot(SciModification)
 	def editorModification(self, mod):
-		update_mask = self.editor.SC_MOD_CHANGEINDICATOR | self.editor.SC_MOD_CHANGEMARKER
+		update_mask = self.editor.SC_MOD_CHANGEMARKER
+		if not bigfile.isDegraded(self.editor, 'minimap'):
+			update_mask |= self.editor.SC_MOD_CHANGEINDICATOR
 
 		if mod.modificationType & update_mask:
 			self.update()
@@ -77,6 +80,10 @@ class MiniMap(QFrame, CategoryMixin):
 			for line in marker.listAll():
 				mpainter.draw(painter, line, total, self)
 
+		if bigfile.isDegraded(self.editor, 'minimap'):
+			# iterating over all indicator ranges is too slow
+			return
+
 		for name in self.editor.indicators:
 			mpainter = self.indicatorStyles.get(name)
 			if mpainter is None:
@@ -139,6 +146,9 @@ def scrollOnClick(minimap, line):
 def install():
 	Window.EditorClass = EditorReplacement
 
+
+bigfile.registerFeature('minimap', 'minimap indicators')
+
 ## styles
 
 class MiniMapStyle(object):
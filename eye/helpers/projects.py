@@ -226,7 +226,10 @@ def mergedOptionsForFile(project, filepath):
 
 def applyPreOptionsDict(editor, dct):
 	val = dct.get('charset')
-	if val is not None:
+	if val == 'utf-8-bom':
+		editor.setEncoding('utf-8')
+		editor.setUseBom(True)
+	elif val is not None:
 		try:
 			''.encode(val)
 		except LookupError:
@@ -0,0 +1,66 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Minimal client for :any:`eye.helpers.remote_control`
+
+This module only depends on QtCore and QtDBus, so it can be used to hand files over to a running EYE
+instance without creating an application or loading widgets modules.
+"""
+
+from logging import getLogger
+
+from PyQt5.QtDBus import QDBusConnection, QDBusMessage, QDBusVariant
+
+
+__all__ = ('callRequest', 'sendOpenFiles', 'SERVICE')
+
+
+LOGGER = getLogger(__name__)
+
+SERVICE = 're.indigo.eye'
+
+
+def callRequest(method_args):
+	"""Call a remote request on the running EYE instance
+
+	:param method_args: request type followed by the request arguments
+	:returns: the reply arguments
+	:rtype: list
+	:raises ValueError: if no instance replied or the request failed
+	"""
+	bus = QDBusConnection.sessionBus()
+	if not bus.isConnected():
+		raise ValueError('not connected to the session bus')
+
+	msg = QDBusMessage.createMethodCall(SERVICE, '/', SERVICE, 'request')
+	msg.setArguments(method_args)
+
+	reply = bus.call(msg)
+	if reply.type() == QDBusMessage.ErrorMessage:
+		raise ValueError(reply.errorMessage())
+	return list(reply.arguments())
+
+
+def sendOpenFiles(paths):
+	"""Ask the running EYE instance to open files
+
+	All paths are sent in a single ``openFiles`` request. If the instance does not handle that request,
+	one ``open`` request is sent per file.
+
+	:param paths: absolute paths of the files, with an optional ``:line:col`` suffix
+	:type paths: list of str
+	:returns: True if an instance received the files, False if no instance is running
+	"""
+	LOGGER.debug('sending %r to remote instance', paths)
+
+	try:
+		reply = callRequest(['openFiles', QDBusVariant(list(paths))])
+	except ValueError:
+		LOGGER.debug('no remote instance replied', exc_info=True)
+		return False
+
+	if reply and reply[0]:
+		return True
+
+	for path in paths:
+		callRequest(['open', path])
+	return True
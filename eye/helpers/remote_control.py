@@ -1,21 +1,22 @@
 # this project is licensed under the WTFPLv2, see COPYING.txt for details
 
+"""Remote control of EYE through D-Bus
+
+QtDBus is only imported when a server is created (:any:`createServer`) or a request is sent
+(:any:`sendRequest`). The client side is in :any:`eye.helpers.remote_client`. The D-Bus object handling the
+requests, of category "remote_control", is defined in the private `eye.helpers._remote_dbus` module.
+:any:`SimpleHandler` is kept in this module for compatibility.
+"""
+
 from functools import wraps
 import logging
 import os
 
-from PyQt5.QtCore import QObject, Q_CLASSINFO
-from PyQt5.QtDBus import QDBusConnection, QDBusVariant, QDBusMessage
-
-from ..three import str
-from ..connector import disabled, CategoryMixin
-from ..app import qApp
-from ..qt import Slot
 from .. import pathutils
 from .intent import registerIntentListener, sendIntent
 
 
-__all__ = ('registerRemoteRequest', 'onRequestOpen', 'SimpleHandler')
+__all__ = ('registerRemoteRequest', 'onRequestOpen', 'onRequestOpenFiles')
 
 
 LOGGER = logging.getLogger(__name__)
@@ -25,40 +26,6 @@ ROOT_OBJ = None
 BUS = None
 
 
-class SimpleHandler(QObject, CategoryMixin):
-	Q_CLASSINFO('D-Bus Interface', 're.indigo.eye')
-
-	def __init__(self, **kwargs):
-		super(SimpleHandler, self).__init__(**kwargs)
-		self.addCategory('remote_control')
-
-	@Slot(str, result=QDBusVariant)
-	@Slot(str, QDBusVariant, result=QDBusVariant)
-	@Slot(str, str, result=QDBusVariant)
-	@Slot(str, QDBusVariant, QDBusVariant, result=QDBusVariant)
-	@Slot(str, str, str, result=QDBusVariant)
-	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, result=QDBusVariant)
-	@Slot(str, str, str, str, result=QDBusVariant)
-	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, result=QDBusVariant)
-	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, result=QDBusVariant)
-	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant,
-	      result=QDBusVariant)
-	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant,
-	      result=QDBusVariant)
-	@Slot(str, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant, QDBusVariant,
-	      QDBusVariant, result=QDBusVariant)
-	def request(self, request_type, *args):
-		args = tuple(arg.variant() if isinstance(arg, QDBusVariant) else arg for arg in args)
-
-		LOGGER.debug('received request %r%r', request_type, args)
-		result = sendIntent(self, 'remoteRequest', request_type=request_type, args=args)
-		if result is None:
-			result = False
-
-		LOGGER.debug('replying %r to request %r%r', result, request_type, args)
-		return QDBusVariant(result)
-
-
 def registerRemoteRequest(request_type, stackoffset=0):
 	def decorator(func):
 		@registerIntentListener('remoteRequest', categories='remote_control', stackoffset=(1 + stackoffset))
@@ -77,30 +44,30 @@ def registerRemoteRequest(request_type, stackoffset=0):
 def createServer():
 	global BUS, ROOT_OBJ
 
-	ROOT_OBJ = SimpleHandler()
+	from ._remote_dbus import registerServer
+
+	BUS, ROOT_OBJ = registerServer()
+
+
+def SimpleHandler(*args, **kwargs):
+	"""Create the D-Bus object handling remote requests
+
+	Kept for compatibility, the class is now `eye.helpers._remote_dbus.SimpleHandler`, and QtDBus is only
+	imported when this function is called. Import the class from there to subclass it or check instances.
+	"""
+	from ._remote_dbus import SimpleHandler as cls
 
-	BUS = QDBusConnection.sessionBus()
-	BUS.registerService('re.indigo.eye')
-	BUS.registerObject('/', ROOT_OBJ, QDBusConnection.ExportAllContents)
+	return cls(*args, **kwargs)
 
 
 def sendRequest(req, *args):
-	global BUS
+	from .remote_client import callRequest
 
 	LOGGER.debug('sending request %r%r', req, args)
 
 	method_args = [req]
 	method_args.extend(args)
-
-	msg = QDBusMessage.createMethodCall('re.indigo.eye', '/', 're.indigo.eye', 'request')
-	msg.setArguments(method_args)
-
-	BUS = QDBusConnection.sessionBus()
-	reply = BUS.call(msg)
-
-	if reply.type() == QDBusMessage.ErrorMessage:
-		raise ValueError(reply.errorMessage())
-	return list(reply.arguments())
+	return callRequest(method_args)
 
 
 @registerRemoteRequest('ping')
@@ -110,7 +77,18 @@ def onRequestPing(args):
 
 @registerRemoteRequest('open')
 def onRequestOpen(args):
-	path, row, col = pathutils.parseFilename(args[0])
+	_openPath(args[0])
+
+
+@registerRemoteRequest('openFiles')
+def onRequestOpenFiles(args):
+	for name in args[0]:
+		_openPath(name)
+	return True
+
+
+def _openPath(name):
+	path, row, col = pathutils.parseFilename(name)
 	path = os.path.abspath(path)
 	if row is None:
 		loc = None
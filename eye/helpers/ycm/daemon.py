@@ -18,7 +18,6 @@ import time
 
 from six.moves.urllib.parse import urlunsplit
 from PyQt5.QtCore import QObject, QTimer, QProcess, QUrl
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
 
 from ...three import str, bytes
 from ...connector import CategoryMixin
@@ -93,6 +92,9 @@ class Ycm(QObject, CategoryMixin):
 		self.pingTimer = QTimer(self)
 		self.pingTimer.timeout.connect(self.ping)
 
+		# QtNetwork is imported only when a daemon is built
+		from PyQt5.QtNetwork import QNetworkAccessManager
+
 		self.network = QNetworkAccessManager()
 
 		qApp().aboutToQuit.connect(self.stop)
@@ -117,6 +119,8 @@ class Ycm(QObject, CategoryMixin):
 
 		:type reply: QNetworkReply
 		"""
+		from PyQt5.QtNetwork import QNetworkRequest
+
 		reply.content = bytes(reply.readAll())
 
 		if reply.error():
@@ -151,6 +155,8 @@ class Ycm(QObject, CategoryMixin):
 		return self._hmacDigest(b''.join(digests))
 
 	def _doGet(self, path):
+		from PyQt5.QtNetwork import QNetworkRequest
+
 		url = urlunsplit(('http', self.addr, path, '', ''))
 		sig = self._sign(b'GET', path.encode('utf-8'), b'')
 		headers = {
@@ -166,6 +172,8 @@ class Ycm(QObject, CategoryMixin):
 		return reply
 
 	def _doPost(self, path, **params):
+		from PyQt5.QtNetwork import QNetworkRequest
+
 		url = urlunsplit(('http', self.addr, path, '', ''))
 		body = json.dumps(params).encode('utf-8')
 		sig = self._sign(b'POST', path.encode('utf-8'), body)
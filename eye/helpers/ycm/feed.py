@@ -3,11 +3,9 @@
 import mimetypes
 import os
 
-from PyQt5.QtCore import QTimer
-
-from ...app import qApp
 from ...structs import PropDict
 from ...connector import registerSignal, disabled, categoryObjects
+from ... import bigfile
 from .daemon import getDaemon, isDaemonAvailable
 
 
@@ -58,7 +56,7 @@ def ycmFiletype(path):
 @registerSignal('editor', 'fileSavedAs')
 @disabled
 def feedOnLoad(editor, path):
-	if not isDaemonAvailable():
+	if not isDaemonAvailable() or bigfile.isDegraded(editor, 'ycm'):
 		return
 
 	editor.ycm = PropDict()
@@ -69,32 +67,19 @@ def feedOnLoad(editor, path):
 @registerSignal('editor', 'fileSaved')
 @disabled
 def feedOnSave(editor, path):
-	if not isDaemonAvailable():
+	if not isDaemonAvailable() or bigfile.isDegraded(editor, 'ycm'):
 		return
 
 	getDaemon().sendParse(path, editor.ycm.filetype, editor.text())
 
 
-def _timeoutFeed():
-	if not isDaemonAvailable():
-		return
-
-	editor = qApp().sender().parent()
-	getDaemon().sendParse(editor.path, editor.ycm.filetype, editor.text())
-
-
-@registerSignal('editor', 'textChanged')
+@registerSignal('editor', 'textChanged', coalesce_ms=FEED_ON_EDIT_PAUSE_MS)
 @disabled
 def feedOnChange(editor):
-	if not isDaemonAvailable() or not editor.path:
+	if not isDaemonAvailable() or not editor.path or bigfile.isDegraded(editor, 'ycm'):
 		return
 
-	if not hasattr(editor, 'ycmFeedTimer'):
-		editor.ycmFeedTimer = QTimer(editor)
-		editor.ycmFeedTimer.setSingleShot(True)
-		editor.ycmFeedTimer.timeout.connect(_timeoutFeed)
-	# reboot timer
-	editor.ycmFeedTimer.start(FEED_ON_EDIT_PAUSE_MS)
+	getDaemon().sendParse(editor.path, editor.ycm.filetype, editor.text())
 
 
 @registerSignal('ycm_control', 'ready')
@@ -103,3 +88,11 @@ def feedOnDaemonReady(ycm):
 	for editor in categoryObjects('editor'):
 		if editor.path:
 			feedOnLoad(editor, editor.path)
+
+
+def _restoreFeed(editor):
+	if feedOnLoad.enabled and editor.path:
+		feedOnLoad(editor, editor.path)
+
+
+bigfile.registerFeature('ycm', 'ycm completion', restore=_restoreFeed)
@@ -7,15 +7,51 @@ from logging import getLogger
 from .utils import exceptionLogging
 
 
-__all__ = ('writeBytesToFile', 'readBytesFromFile')
+__all__ = (
+	'writeBytesToFile', 'writeChunksToFile', 'readBytesFromFile',
+	'FSYNC_NONE', 'FSYNC_FILE', 'FSYNC_DIR',
+)
 
 LOGGER = getLogger(__name__)
 
+FSYNC_NONE = 'none'
 
-def writeBytesToFileDirect(filepath, data):
+"""Don't sync written files to disk, leave it to the OS"""
+
+FSYNC_FILE = 'file'
+
+"""Sync the content of written files to disk before they replace the original file"""
+
+FSYNC_DIR = 'file+dir'
+
+"""Like :any:`FSYNC_FILE`, and also sync the directory after the file was replaced"""
+
+
+def _writeChunks(f, chunks, fsync):
+	for chunk in chunks:
+		f.write(chunk)
+
+	if fsync != FSYNC_NONE:
+		f.flush()
+		os.fsync(f.fileno())
+
+
+def _syncDir(dir):
+	fd = os.open(dir or os.curdir, os.O_RDONLY)
+	try:
+		os.fsync(fd)
+	finally:
+		os.close(fd)
+
+
+def writeBytesToFileDirect(filepath, data, fsync=FSYNC_NONE):
+	return writeChunksToFileDirect(filepath, (data,), fsync)
+
+
+def writeChunksToFileDirect(filepath, chunks, fsync=FSYNC_NONE):
 	with exceptionLogging(logger=LOGGER):
 		with open(filepath, 'wb') as f:
-			f.write(data)
+			_writeChunks(f, chunks, fsync)
 			return True
 
 
@@ -36,9 +72,24 @@ def setPerm(path, perm):
 	os.chown(path, perm[1], perm[2])
 
 
-def writeBytesToFile(filepath, data):
+def writeBytesToFile(filepath, data, fsync=FSYNC_NONE):
+	return writeChunksToFile(filepath, (data,), fsync)
+
+
+def writeChunksToFile(filepath, chunks, fsync=FSYNC_NONE):
+	"""Write the concatenation of `chunks` in file `filepath`
+
+	`chunks` is an iterable of bytes-like objects (for example `bytes` or `memoryview`), which is consumed
+	while writing, so the whole content doesn't need to be in memory at once.
+	The content is written in a temporary file which then replaces `filepath`, so `filepath` is not left
+	half-written if an error occurs.
+
+	This function does not use Qt and can be called from any thread.
+
+	:param fsync: durability policy, one of :any:`FSYNC_NONE`, :any:`FSYNC_FILE` or :any:`FSYNC_DIR`
+	"""
 	if os.name == 'nt':
-		return writeBytesToFileDirect(filepath, data)
+		return writeChunksToFileDirect(filepath, chunks, fsync)
 
 	# TODO if file is created by another user, the owner info may be lost or chown may fail
 	# TODO write directly in those cases?
@@ -51,10 +102,17 @@ def writeBytesToFile(filepath, data):
 	with exceptionLogging(logger=LOGGER):
 		fd, tmpfile = tempfile.mkstemp(dir=dir)
 		os.close(fd)
-		setPerm(tmpfile, oldperm)
-		with open(tmpfile, 'wb') as f:
-			f.write(data)
-		os.rename(tmpfile, filepath)
+		try:
+			setPerm(tmpfile, oldperm)
+			with open(tmpfile, 'wb') as f:
+				_writeChunks(f, chunks, fsync)
+			os.rename(tmpfile, filepath)
+		except BaseException:
+			os.unlink(tmpfile)
+			raise
+
+		if fsync == FSYNC_DIR:
+			_syncDir(dir)
 		return True
 
 
@@ -62,3 +120,4 @@ def readBytesFromFile(filepath):
 	with exceptionLogging(logger=LOGGER):
 		with open(filepath, 'rb') as f:
 			return f.read()
+
@@ -0,0 +1,60 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Entry point of EYE
+
+When EYE is run with ``--remote`` and another EYE instance is running, the files to open are sent to it
+in a single request (see :any:`eye.helpers.remote_client`), without creating an application nor loading
+the Qt widgets modules. Else, the application is run normally (see :any:`eye.app.main`).
+
+This module should stay cheap to import.
+"""
+
+import argparse
+import os
+import sys
+
+
+__all__ = ('main', 'buildArgumentParser')
+
+
+def buildArgumentParser():
+	"""Return the parser for EYE command-line arguments"""
+	parser = argparse.ArgumentParser()
+	parser.add_argument('files', metavar='FILE', nargs='*')
+	parser.add_argument('--debug', action='store_true', default=False)
+	parser.add_argument('--debug-only', action='append', default=[])
+	parser.add_argument('--no-config', action='store_true', default=False)
+	parser.add_argument('--no-script-cache', action='store_true', default=False)
+	parser.add_argument('--remote', action='store_true', default=False)
+	parser.add_argument('--profile-startup', action='store_true', default=False)
+	parser.add_argument('--profile-startup-trace', metavar='FILE')
+	return parser
+
+
+def openInRunningInstance(argv):
+	"""Send files from command-line `argv` to a running instance
+
+	Returns True if an instance received the files.
+	"""
+	# Qt-specific options have not been removed yet, ignore them
+	args, _ = buildArgumentParser().parse_known_args(argv)
+
+	from .helpers.remote_client import sendOpenFiles
+
+	return sendOpenFiles([os.path.abspath(name) for name in args.files])
+
+
+def main():
+	"""Run eye, or hand files over to a running instance if ``--remote`` is passed"""
+	remote = '--remote' in sys.argv[1:]
+	if remote and openInRunningInstance(sys.argv[1:]):
+		return 0
+
+	from .app import main as appMain
+
+	# no instance is running, the app only needs to start the server
+	return appMain(remoteChecked=remote)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -3,18 +3,13 @@
 """Helpers for lexer use
 
 In EYE, builtin lexers from QScintilla are used. See :any:`PyQt5.Qsci.QsciLexer`.
+
+Lexer classes are only looked up when a lexer for an extension is requested.
 """
 
 import mimetypes
 
 from PyQt5.QtGui import QColor, QFont
-from PyQt5.Qsci import (
-	QsciLexerBash, QsciLexerBatch, QsciLexerCPP, QsciLexerCSharp, QsciLexerJava, QsciLexerJavaScript,
-	QsciLexerCSS, QsciLexerD, QsciLexerFortran, QsciLexerHTML, QsciLexerXML, QsciLexerLua,
-	QsciLexerMakefile, QsciLexerPascal, QsciLexerPerl, QsciLexerPO, QsciLexerPostScript,
-	QsciLexerPOV, QsciLexerProperties, QsciLexerPython, QsciLexerRuby, QsciLexerSQL, QsciLexerTCL,
-	QsciLexerTeX, QsciLexerYAML,
-)
 
 __all__ = ('extensionToLexer', 'mimeToLexer', 'applyStyles', 'stylesFromLexer')
 
@@ -47,48 +42,48 @@ def applyStyles(lexer, spec):
 
 
 _extensionLexer = {
-	'sh': QsciLexerBash,
-	'bash': QsciLexerBash,
-	'zsh': QsciLexerBash,
-	'bat': QsciLexerBatch,
-	'cmd': QsciLexerBatch,
-	'c': QsciLexerCPP,
-	'cc': QsciLexerCPP,
-	'cpp': QsciLexerCPP,
-	'cxx': QsciLexerCPP,
-	'h': QsciLexerCPP,
-	'hh': QsciLexerCPP,
-	'hpp': QsciLexerCPP,
-	'hxx': QsciLexerCPP,
-	'cs': QsciLexerCSharp,
-	'java': QsciLexerJava,
-	'js': QsciLexerJavaScript,
-	'json': QsciLexerJavaScript,
-	'css': QsciLexerCSS,
-	'd': QsciLexerD,
-	'f': QsciLexerFortran,
-	'html': QsciLexerHTML,
-	'htm': QsciLexerHTML,
-	'xml': QsciLexerXML,
-	'lua': QsciLexerLua,
-	'Makefile': QsciLexerMakefile,
-	'pas': QsciLexerPascal,
-	'pl': QsciLexerPerl,
-	'pm': QsciLexerPerl,
-	'po': QsciLexerPO,
-	'pot': QsciLexerPO,
-	'ps': QsciLexerPostScript,
-	'pov': QsciLexerPOV,
-	'inc': QsciLexerPOV,
-	'properties': QsciLexerProperties,
-	'ini': QsciLexerProperties,
-	'py': QsciLexerPython,
-	'rb': QsciLexerRuby,
-	'sql': QsciLexerSQL,
-	'tcl': QsciLexerTCL,
-	'tex': QsciLexerTeX,
-	'yaml': QsciLexerYAML,
-	'yml': QsciLexerYAML,
+	'sh': 'QsciLexerBash',
+	'bash': 'QsciLexerBash',
+	'zsh': 'QsciLexerBash',
+	'bat': 'QsciLexerBatch',
+	'cmd': 'QsciLexerBatch',
+	'c': 'QsciLexerCPP',
+	'cc': 'QsciLexerCPP',
+	'cpp': 'QsciLexerCPP',
+	'cxx': 'QsciLexerCPP',
+	'h': 'QsciLexerCPP',
+	'hh': 'QsciLexerCPP',
+	'hpp': 'QsciLexerCPP',
+	'hxx': 'QsciLexerCPP',
+	'cs': 'QsciLexerCSharp',
+	'java': 'QsciLexerJava',
+	'js': 'QsciLexerJavaScript',
+	'json': 'QsciLexerJavaScript',
+	'css': 'QsciLexerCSS',
+	'd': 'QsciLexerD',
+	'f': 'QsciLexerFortran',
+	'html': 'QsciLexerHTML',
+	'htm': 'QsciLexerHTML',
+	'xml': 'QsciLexerXML',
+	'lua': 'QsciLexerLua',
+	'Makefile': 'QsciLexerMakefile',
+	'pas': 'QsciLexerPascal',
+	'pl': 'QsciLexerPerl',
+	'pm': 'QsciLexerPerl',
+	'po': 'QsciLexerPO',
+	'pot': 'QsciLexerPO',
+	'ps': 'QsciLexerPostScript',
+	'pov': 'QsciLexerPOV',
+	'inc': 'QsciLexerPOV',
+	'properties': 'QsciLexerProperties',
+	'ini': 'QsciLexerProperties',
+	'py': 'QsciLexerPython',
+	'rb': 'QsciLexerRuby',
+	'sql': 'QsciLexerSQL',
+	'tcl': 'QsciLexerTCL',
+	'tex': 'QsciLexerTeX',
+	'yaml': 'QsciLexerYAML',
+	'yml': 'QsciLexerYAML',
 }
 
 
@@ -99,7 +94,26 @@ def extensionToLexer(ext):
 	"""
 	if ext and ext.startswith('.'):
 		ext = ext[1:]
-	return _extensionLexer.get(ext)
+
+	name = _extensionLexer.get(ext)
+	if name is None:
+		return None
+	return _lexerClass(name)
+
+
+_lexerClasses = {}
+
+
+def _lexerClass(name):
+	try:
+		return _lexerClasses[name]
+	except KeyError:
+		pass
+
+	from PyQt5 import Qsci
+
+	cls = _lexerClasses[name] = getattr(Qsci, name)
+	return cls
 
 
 def mimeToLexer(mime):
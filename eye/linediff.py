@@ -0,0 +1,178 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Line-level diff of byte buffers
+
+This module computes a small set of line replacements turning a byte buffer into another one. It is used
+by :any:`eye.widgets.editor.Editor.reloadFile` to only change the modified parts of the text, so markers,
+indicators and the rest of the document are untouched.
+
+The time spent depends on the size of the changes, not on the size of the buffers:
+
+- runs of identical content are skipped by comparing big slices, which is done in C, so identical
+  buffers are detected quickly
+- where the buffers differ, the following lines are compared by hash in a window, to find where they
+  match again (at least :any:`SYNC_LINES` identical lines). The window grows until a match is found.
+- if more than :any:`MAX_EXAMINED_LINES` lines were compared, the buffers are considered too different
+  and the rest of the differing region is replaced at once
+"""
+
+import re
+from itertools import islice
+
+
+__all__ = ('diffLines',)
+
+
+SYNC_LINES = 3
+
+"""Number of identical lines required to consider buffers match again after a difference"""
+
+WINDOW_LINES = 64
+
+"""Initial number of lines looked at to find where buffers match again"""
+
+MAX_EXAMINED_LINES = 50000
+
+"""Maximum number of lines compared before giving up on finding a small diff"""
+
+# maximum number of positions of a line tried as a match, to bound the time spent on repetitive lines
+MAX_CANDIDATES = 8
+
+LINE_RE = re.compile(br'[^\n]*\n|[^\n]+')
+
+
+def _matchLength(old, posA, new, posB, limit):
+	# length of the common prefix of old[posA:] and new[posB:], at most limit
+	# bytes.startswith is used because comparing memoryviews is much slower
+	if new.startswith(old[posA:posA + limit], posB):
+		return limit
+
+	# invariant: prefixes of length lo are equal, prefixes of length hi differ
+	lo, hi = 0, limit
+	while hi - lo > 1:
+		mid = (lo + hi) // 2
+		if new.startswith(old[posA + lo:posA + mid], posB + lo):
+			lo = mid
+		else:
+			hi = mid
+	return lo
+
+
+def _suffixLength(old, new, limit):
+	# length of the common suffix of old and new, at most limit
+	endA, endB = len(old), len(new)
+	if new.endswith(old[endA - limit:], 0, endB):
+		return limit
+
+	lo, hi = 0, limit
+	while hi - lo > 1:
+		mid = (lo + hi) // 2
+		if new.endswith(old[endA - mid:endA - lo], 0, endB - lo):
+			lo = mid
+		else:
+			hi = mid
+	return lo
+
+
+def _lines(buf, pos, end, count):
+	# list of up to count lines from pos, and the offset of the end of each
+	lines = []
+	ends = []
+	for mtc in islice(LINE_RE.finditer(buf, pos, end), count):
+		lines.append(mtc.group())
+		ends.append(mtc.end())
+	return lines, ends
+
+
+def _findSync(linesA, linesB):
+	# return (i, j) with minimal i + j such that linesA[i:] and linesB[j:] start with the same lines
+	indexB = {}
+	for j, line in enumerate(linesB):
+		indexB.setdefault(line, []).append(j)
+
+	best = None
+	for i, line in enumerate(linesA):
+		if best is not None and i >= sum(best):
+			break
+
+		for j in indexB.get(line, ())[:MAX_CANDIDATES]:
+			if best is not None and i + j >= sum(best):
+				break
+
+			n = min(SYNC_LINES, len(linesA) - i, len(linesB) - j)
+			if linesA[i:i + n] == linesB[j:j + n]:
+				best = (i, j)
+				break
+	return best
+
+
+def _resync(old, posA, endA, new, posB, endB, budget):
+	# return positions, at line starts, from which old and new match again, and the number of lines read
+	count = WINDOW_LINES
+	examined = 0
+	while examined < budget:
+		count = min(count, max(WINDOW_LINES, (budget - examined) // 2))
+		linesA, endsA = _lines(old, posA, endA, count)
+		linesB, endsB = _lines(new, posB, endB, count)
+		examined += len(linesA) + len(linesB)
+
+		sync = _findSync(linesA, linesB)
+		if sync is not None and sync != (0, 0):
+			i, j = sync
+			return (endsA[i - 1] if i else posA), (endsB[j - 1] if j else posB), examined
+
+		if len(linesA) < count and len(linesB) < count:
+			break
+		count *= 4
+	return endA, endB, examined
+
+
+def diffLines(old, new):
+	"""Compute the line replacements turning `old` into `new`
+
+	:param old: original content
+	:type old: bytes-like
+	:param new: new content
+	:type new: bytes
+	:returns: a list of `(start, end, replacement)` tuples, sorted by decreasing offsets, meaning bytes
+	          from `start` to `end` in `old` should be replaced with bytes `replacement`. Applying them in
+	          order doesn't shift the offsets of the following ones.
+	:rtype: list
+	"""
+	old = memoryview(old)
+
+	# stop before the common suffix, at a line start
+	suffix = _suffixLength(old, new, min(len(old), len(new)))
+	if suffix == len(old) == len(new):
+		return []
+	if suffix:
+		nl = new.find(b'\n', len(new) - suffix)
+		suffix = 0 if nl < 0 else len(new) - nl - 1
+	endA = len(old) - suffix
+	endB = len(new) - suffix
+
+	hunks = []
+	budget = MAX_EXAMINED_LINES
+	posA = posB = 0
+	while True:
+		length = _matchLength(old, posA, new, posB, min(endA - posA, endB - posB))
+		if posA + length == endA and posB + length == endB:
+			break
+
+		# back to a line start
+		nl = new.rfind(b'\n', posB, posB + length)
+		length = nl + 1 - posB if nl >= 0 else 0
+		posA += length
+		posB += length
+
+		if posA == endA or posB == endB or budget <= 0:
+			nextA, nextB = endA, endB
+		else:
+			nextA, nextB, examined = _resync(old, posA, endA, new, posB, endB, budget)
+			budget -= examined
+
+		hunks.append((posA, nextA, new[posB:nextB]))
+		posA, posB = nextA, nextB
+
+	hunks.reverse()
+	return hunks
@@ -10,7 +10,7 @@ import re
 
 __all__ = ('parseFilename', 'findAncestorContaining', 'findInAncestors',
            'getCommonPrefix', 'getRelativePathIn', 'isIn',
-           'getConfigPath', 'getConfigFilePath', 'dataPath')
+           'getConfigPath', 'getConfigFilePath', 'getCachePath', 'dataPath')
 
 
 def parseFilename(filepath):
@@ -145,6 +145,17 @@ def getConfigFilePath(*args):
 	return os.path.join(dir, file)
 
 
+def getCachePath(*args):
+	try:
+		import xdg.BaseDirectory
+		return xdg.BaseDirectory.save_cache_path('eyeditor', *args)
+	except ImportError:
+		path = os.path.join(os.path.expanduser('~/.cache/eyeditor'), *args)
+		if not os.path.isdir(path):
+			os.makedirs(os.path.normpath(path))
+		return path
+
+
 def dataPath(*args):
 	dest = os.path.join(os.path.dirname(__file__), '..', 'data', *args)
 	if os.path.exists(dest):
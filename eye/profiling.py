@@ -0,0 +1,194 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Startup profiling
+
+When EYE is run with the ``--profile-startup`` command-line option, the wall time spent in the various
+steps of the startup is recorded:
+
+- execution of each startup script
+- import of each `eye` module (modules imported before the command-line is parsed, like :any:`eye.app`,
+  are not recorded)
+- creation of the window
+- opening of each file passed on the command-line, with reading, decoding, setting text in the editor
+  and running the `fileOpened` handlers as sub-steps
+
+A report sorted by decreasing time is printed on stderr once startup is complete. With the
+``--profile-startup-trace FILE`` option, the recorded steps are also written to `FILE` in the Chrome
+trace event format, which can be loaded in ``chrome://tracing``.
+
+Code can record its own steps with :any:`span`, which costs almost nothing when profiling is disabled.
+"""
+
+from contextlib import contextmanager
+import json
+import os
+import sys
+from timeit import default_timer
+
+
+__all__ = ('span', 'enable', 'disable', 'isEnabled', 'report', 'writeChromeTrace')
+
+
+class NullContext(object):
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		pass
+
+
+NULL_CONTEXT = NullContext()
+
+
+class TimedLoader(object):
+	"""Loader wrapper recording the time spent executing a module"""
+
+	def __init__(self, loader, profiler):
+		self.loader = loader
+		self.profiler = profiler
+
+	def create_module(self, spec):
+		return self.loader.create_module(spec)
+
+	def exec_module(self, module):
+		with self.profiler.span('import', module.__name__):
+			self.loader.exec_module(module)
+
+	def __getattr__(self, name):
+		return getattr(self.loader, name)
+
+
+class ImportTimer(object):
+	"""Meta path finder wrapping loaders of `eye` modules with :any:`TimedLoader`"""
+
+	def __init__(self, profiler):
+		self.profiler = profiler
+
+	def find_spec(self, fullname, path, target=None):
+		if fullname != 'eye' and not fullname.startswith('eye.'):
+			return None
+
+		for finder in sys.meta_path:
+			if finder is self or not hasattr(finder, 'find_spec'):
+				continue
+			spec = finder.find_spec(fullname, path, target)
+			if spec is not None:
+				break
+		else:
+			return None
+
+		if hasattr(spec.loader, 'exec_module'):
+			spec.loader = TimedLoader(spec.loader, self.profiler)
+		return spec
+
+
+class StartupProfiler(object):
+	def __init__(self):
+		self.enabled = False
+		self.origin = default_timer()
+
+		# list of (category, name, start, duration)
+		self.events = []
+
+	def enable(self):
+		if self.enabled:
+			return
+		self.enabled = True
+
+		if sys.version_info.major >= 3:
+			sys.meta_path.insert(0, ImportTimer(self))
+
+	def disable(self):
+		self.enabled = False
+		sys.meta_path[:] = [finder for finder in sys.meta_path if not isinstance(finder, ImportTimer)]
+
+	def span(self, category, name):
+		if not self.enabled:
+			return NULL_CONTEXT
+		return self._span(category, name)
+
+	@contextmanager
+	def _span(self, category, name):
+		start = default_timer()
+		try:
+			yield
+		finally:
+			self.events.append((category, name, start - self.origin, default_timer() - start))
+
+	def report(self):
+		lines = ['%10s  %-8s %s' % ('ms', 'step', 'name')]
+		for category, name, _, duration in sorted(self.events, key=lambda ev: ev[3], reverse=True):
+			lines.append('%10.1f  %-8s %s' % (duration * 1000, category, name))
+		return '\n'.join(lines)
+
+	def chromeTrace(self):
+		pid = os.getpid()
+		return {
+			'traceEvents': [
+				{
+					'name': name,
+					'cat': category,
+					'ph': 'X',
+					'ts': start * 1e6,
+					'dur': duration * 1e6,
+					'pid': pid,
+					'tid': 0,
+				}
+				for category, name, start, duration in self.events
+			],
+			'displayTimeUnit': 'ms',
+		}
+
+
+PROFILER = StartupProfiler()
+
+
+def span(category, name):
+	"""Return a context manager recording the time spent in its block
+
+	If profiling is disabled, the context manager does nothing.
+
+	Example::
+
+		with span('open', 'parse %s' % path):
+			parse(path)
+
+	:param category: kind of step
+	:type category: str
+	:param name: name of the step in the report
+	:type name: str
+	"""
+	return PROFILER.span(category, name)
+
+
+def enable():
+	"""Start recording startup steps"""
+	PROFILER.enable()
+
+
+def disable():
+	"""Stop recording startup steps"""
+	PROFILER.disable()
+
+
+def isEnabled():
+	"""Return True if startup steps are being recorded"""
+	return PROFILER.enabled
+
+
+def report():
+	"""Return the recorded steps as a text table sorted by decreasing time
+
+	:rtype: str
+	"""
+	return PROFILER.report()
+
+
+def writeChromeTrace(path):
+	"""Write the recorded steps in a file in the Chrome trace event format
+
+	:param path: path of the file to write
+	:type path: str
+	"""
+	with open(path, 'w') as fd:
+		json.dump(PROFILER.chromeTrace(), fd)
@@ -0,0 +1,114 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Bytecode cache for startup scripts
+
+Compiling the startup scripts (see :any:`eye.app.App.runScript`) each time EYE is launched can take some
+time when the configuration is big. The compiled code objects are cached in the ``scripts`` subdirectory of
+the EYE cache directory (``~/.cache/eyeditor/scripts`` by default).
+
+A cache entry is used only if the path, modification time and size of the script, and the Python
+interpreter version match. Stale or corrupted entries are ignored and replaced.
+
+The cache can be disabled with the ``--no-script-cache`` command-line option.
+"""
+
+import hashlib
+from logging import getLogger
+import marshal
+import os
+import sys
+import tempfile
+
+from . import pathutils
+from . import profiling
+
+
+__all__ = ('loadCode', 'compileFile')
+
+
+LOGGER = getLogger(__name__)
+
+
+def _interpreterTag():
+	tag = getattr(sys.implementation, 'cache_tag', None) or sys.version
+	try:
+		from importlib.util import MAGIC_NUMBER
+	except ImportError:
+		return tag
+	return '%s-%s' % (tag, MAGIC_NUMBER.hex())
+
+
+INTERPRETER_TAG = _interpreterTag()
+
+
+def _cacheFile(path):
+	key = hashlib.sha1(path.encode('utf-8')).hexdigest()
+	return os.path.join(pathutils.getCachePath('scripts'), '%s.bin' % key)
+
+
+def _header(path, st):
+	return ('%s\0%s\0%d\0%d\n' % (INTERPRETER_TAG, path, st.st_mtime_ns, st.st_size)).encode('utf-8')
+
+
+def _readCache(cachefile, header):
+	try:
+		with open(cachefile, 'rb') as fd:
+			data = fd.read()
+	except (IOError, OSError):
+		return None
+
+	if not data.startswith(header):
+		return None
+
+	try:
+		return marshal.loads(data[len(header):])
+	except (EOFError, ValueError, TypeError):
+		LOGGER.info('ignoring corrupted script cache %r', cachefile)
+		return None
+
+
+def _writeCache(cachefile, header, code):
+	tmpfile = None
+	try:
+		fd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(cachefile))
+		with os.fdopen(fd, 'wb') as fobj:
+			fobj.write(header)
+			fobj.write(marshal.dumps(code))
+		os.rename(tmpfile, cachefile)
+	except (IOError, OSError):
+		LOGGER.warning('cannot write script cache %r', cachefile, exc_info=True)
+		if tmpfile and os.path.exists(tmpfile):
+			os.unlink(tmpfile)
+
+
+def compileFile(path):
+	"""Compile the Python file at `path`, without using the cache"""
+	with open(path) as fd:
+		src = fd.read()
+	return compile(src, path, 'exec')
+
+
+def loadCode(path):
+	"""Return the code object of the Python file at `path`
+
+	The code object is taken from the cache if the cache entry is still valid. Else, the file is compiled
+	and the cache entry is written.
+	"""
+	st = os.stat(path)
+	header = _header(path, st)
+
+	try:
+		cachefile = _cacheFile(path)
+	except (IOError, OSError):
+		LOGGER.warning('cannot create script cache directory', exc_info=True)
+		return compileFile(path)
+
+	with profiling.span('cache', 'read cached code %s' % path):
+		code = _readCache(cachefile, header)
+	if code is not None:
+		return code
+
+	with profiling.span('cache', 'compile %s' % path):
+		code = compileFile(path)
+	_writeCache(cachefile, header, code)
+	return code
@@ -1,6 +1,10 @@
 # this project is licensed under the WTFPLv2, see COPYING.txt for details
 
-__all__ = ('PropDict',)
+from bisect import bisect_left, bisect_right
+
+
+__all__ = ('PropDict', 'IntervalSet')
+
 
 class PropDict(dict):
 	def __getattr__(self, k):
@@ -15,3 +19,139 @@ class PropDict(dict):
 
 	def __delattr__(self, k):
 		del self[k]
+
+
+class IntervalSet(object):
+	"""Set of integers, stored as sorted disjoint intervals
+
+	Intervals are half-open: `(start, end)` contains `start` but not `end`. Adjacent and overlapping
+	intervals are merged.
+
+	Example::
+
+		>>> s = IntervalSet()
+		>>> s.add(0, 10)
+		>>> s.add(20, 30)
+		>>> s.gaps(5, 25)
+		[(10, 20)]
+	"""
+
+	def __init__(self):
+		self.starts = []
+		self.ends = []
+
+	def __iter__(self):
+		return iter(zip(self.starts, self.ends))
+
+	def __len__(self):
+		return len(self.starts)
+
+	def __bool__(self):
+		return bool(self.starts)
+
+	__nonzero__ = __bool__
+
+	def __repr__(self):
+		return 'IntervalSet(%r)' % list(self)
+
+	def clear(self):
+		self.starts = []
+		self.ends = []
+
+	def add(self, start, end):
+		"""Add interval `(start, end)`"""
+		if start >= end:
+			return
+
+		# intervals touching [start, end] are merged with it
+		first = bisect_left(self.ends, start)
+		last = bisect_right(self.starts, end)
+		if first < last:
+			start = min(start, self.starts[first])
+			end = max(end, self.ends[last - 1])
+		self.starts[first:last] = [start]
+		self.ends[first:last] = [end]
+
+	def remove(self, start, end):
+		"""Remove interval `(start, end)`"""
+		if start >= end:
+			return
+
+		first = bisect_right(self.ends, start)
+		last = bisect_left(self.starts, end)
+		if first >= last:
+			return
+
+		starts, ends = [], []
+		if self.starts[first] < start:
+			starts.append(self.starts[first])
+			ends.append(start)
+		if self.ends[last - 1] > end:
+			starts.append(end)
+			ends.append(self.ends[last - 1])
+		self.starts[first:last] = starts
+		self.ends[first:last] = ends
+
+	def contains(self, value):
+		"""Return True if `value` is in an interval"""
+		i = bisect_right(self.starts, value) - 1
+		return i >= 0 and value < self.ends[i]
+
+	def covers(self, start, end):
+		"""Return True if interval `(start, end)` is entirely in the set"""
+		if start >= end:
+			return True
+		i = bisect_right(self.starts, start) - 1
+		return i >= 0 and end <= self.ends[i]
+
+	def gaps(self, start, end):
+		"""Return the list of intervals between `start` and `end` which are not in the set"""
+		gaps = []
+		i = max(0, bisect_right(self.starts, start) - 1)
+		pos = start
+		while pos < end and i < len(self.starts):
+			if self.ends[i] <= pos:
+				i += 1
+				continue
+			if self.starts[i] >= end:
+				break
+			if self.starts[i] > pos:
+				gaps.append((pos, self.starts[i]))
+			pos = self.ends[i]
+			i += 1
+		if pos < end:
+			gaps.append((pos, end))
+		return gaps
+
+	def total(self):
+		"""Return the number of integers in the set"""
+		return sum(end - start for start, end in self)
+
+	def shift(self, position, delta):
+		"""Shift values to account for `delta` values inserted (or removed if negative) at `position`
+
+		If `delta` is positive, values from `position` are increased by `delta`, and an interval containing
+		`position` is split, the inserted values are not in the set.
+		If `delta` is negative, values from `position` to `position - delta` are removed from the set, and
+		values after are decreased.
+		"""
+		if delta < 0:
+			self.remove(position, position - delta)
+
+		i = bisect_left(self.ends, position + 1)
+		if delta > 0 and i < len(self.starts) and self.starts[i] < position:
+			# split the interval containing position
+			self.starts.insert(i + 1, position)
+			self.ends.insert(i + 1, self.ends[i])
+			self.ends[i] = position
+			i += 1
+
+		for j in range(i, len(self.starts)):
+			self.starts[j] += delta
+			self.ends[j] += delta
+
+		if delta < 0 and 0 < i < len(self.starts) and self.ends[i - 1] == self.starts[i]:
+			# intervals around the removed values are now adjacent
+			self.ends[i - 1] = self.ends[i]
+			del self.starts[i]
+			del self.ends[i]
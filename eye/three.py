@@ -11,8 +11,12 @@ this module to keep compatibility with both versions of Python. The
 
 `range` is also exported, mapping to `xrange` on Python 2. A drop-in implementation of `execfile`
 for Python 3 is exported too.
+
+`isascii` replaces the `bytes.isascii` and `str.isascii` methods, which are only available since
+Python 3.7.
 """
 
+import re
 import sys
 
 # pylint: disable=redefined-builtin
@@ -32,4 +36,19 @@ else:
 		exec(code, globals)  # pylint: disable=exec-used
 
 
-__all__ = ('bytes', 'str', 'execfile', 'range')
+if hasattr(str, 'isascii'):
+	def isascii(data):
+		"""Return True if `data`, a `bytes` or `str`, only contains ASCII characters"""
+		return data.isascii()
+else:
+	NON_ASCII_BYTES = re.compile(b'[\x80-\xff]')
+	NON_ASCII_TEXT = re.compile(u'[^\x00-\x7f]')
+
+	def isascii(data):
+		"""Return True if `data`, a `bytes` or `str`, only contains ASCII characters"""
+		if isinstance(data, str):
+			return not NON_ASCII_TEXT.search(data)
+		return not NON_ASCII_BYTES.search(data)
+
+
+__all__ = ('bytes', 'str', 'execfile', 'range', 'isascii')
@@ -23,15 +23,20 @@ Module contents
 ---------------
 """
 
+import codecs
 import unicodedata
+import mmap
 import os
 import re
 import contextlib
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import namedtuple
 from weakref import ref
 from logging import getLogger
 
-from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtCore import Qt, QEvent, QObject, QTimer, QElapsedTimer
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
 from PyQt5.Qsci import QsciScintilla, QsciStyledText
@@ -44,16 +49,48 @@ from .helpers import CentralWidgetMixin, acceptIf
 from ..qt import Slot, Signal, override
 from .. import structs
 from .. import io
+from .. import profiling
+from .. import bigfile
+from .. import charset
+from .. import linediff
+from .. import textsearch
+from ..utils import exceptionLogging
 
 
 __all__ = (
 	'Editor', 'Marker', 'Indicator', 'Margin', 'BaseEditor', 'QsciScintilla', 'SciModification',
-	'zoomOnWheel'
+	'SearchHighlighter', 'zoomOnWheel'
 )
 
 
 LOGGER = getLogger(__name__)
 
+# maximum time spent loading chunks before returning to the event loop
+LOAD_BATCH_MS = 20
+
+NEWLINE_BYTES = re.compile(br'\n')
+
+# approximate size of the pieces trimmed at once when saving
+SAVE_CHUNK_SIZE = 1 << 20
+
+# maximum number of files written at once
+SAVE_WORKERS = 4
+
+# maximum time spent highlighting search matches before returning to the event loop
+SEARCH_BATCH_MS = 10
+
+# approximate size of the pieces of text searched at once when highlighting search matches
+SEARCH_CHUNK_SIZE = 1 << 18
+
+# delay before counting search matches again after the text was modified
+COUNT_DELAY_MS = 300
+
+# number of candidate offsets tested at once when counting search matches
+CANDIDATES_CHUNK_SIZE = 1 << 14
+
+# testing if a search matches at a candidate offset costs about as much as searching this number of bytes
+CANDIDATE_COST_BYTES = 256
+
 
 class HasWeakEditorMixin(object):
 	def __init__(self, editor=None, **kwargs):
@@ -378,6 +415,45 @@ class Indicator(HasWeakEditorMixin):
 		endl, endc = self.editor.lineIndexFromPosition(end)
 		self.putAt(startl, startc, endl, endc, value)
 
+	def putRanges(self, ranges, value=1):
+		"""Add the indicator to many ranges of characters (byte offset based)
+
+		This is much faster than calling :any:`putAtOffset` for each range: offsets are passed to Scintilla
+		without conversion, and a single :any:`Editor.sciModified` is emitted for all the ranges, instead
+		of one per range.
+
+		:param ranges: iterable of `(start, end)` tuples, `start` inclusive and `end` exclusive, for
+		               example matches of a :any:`eye.textsearch.SearchPattern`
+		:param value: in the ranges, indicator will have this value
+		:returns: the number of ranges
+		"""
+		editor = self.editor
+		send = editor.SendScintilla
+		fill = editor.SCI_INDICATORFILLRANGE
+
+		send(editor.SCI_SETINDICATORCURRENT, self.id)
+		send(editor.SCI_SETINDICATORVALUE, value)
+		mask = send(editor.SCI_GETMODEVENTMASK)
+		send(editor.SCI_SETMODEVENTMASK, 0)
+		count = 0
+		first = last = 0
+		try:
+			for start, end in ranges:
+				send(fill, start, end - start)
+				if not count:
+					first = start
+				last = end
+				count += 1
+		finally:
+			send(editor.SCI_SETMODEVENTMASK, mask)
+
+		if count and mask & editor.SC_MOD_CHANGEINDICATOR:
+			line = send(editor.SCI_LINEFROMPOSITION, first)
+			editor.sciModified.emit(SciModification(
+				first, editor.SC_MOD_CHANGEINDICATOR, None, last - first, 0, line, 0, 0, 0, 0
+			))
+		return count
+
 	def removeAt(self, lineFrom, indexFrom, lineTo, indexTo):
 		"""Remove the indicator from a range of characters (line-index based)
 
@@ -1117,6 +1193,697 @@ class BaseEditor(QsciScintilla):
 	"""
 
 
+class FileLoader(QObject, HasWeakEditorMixin):
+	"""Load a file in an editor by chunks, across multiple event loop iterations
+
+	The file is memory-mapped and appended to the editor chunk by chunk, so the UI stays responsive and
+	the part already loaded can be viewed and searched. The editor is read-only while loading.
+	When loading is complete, :any:`Editor.fileOpened` is emitted.
+
+	Instances are created by :any:`Editor.openFile` for big files, see :any:`Editor.setChunkedLoadThreshold`.
+	"""
+
+	def __init__(self, editor, path, **kwargs):
+		super(FileLoader, self).__init__(**kwargs)
+		self.editor = editor
+		self.path = path
+
+		self.fd = open(path, 'rb')
+		self.size = os.fstat(self.fd.fileno()).st_size
+		self.map = mmap.mmap(self.fd.fileno(), self.size, access=mmap.ACCESS_READ) if self.size else b''
+		self.offset = 0
+
+		# candidate encodings, sniffed when loading starts
+		self.encodings = None
+		self.decoder = None
+		self.newline = editor._newlineString().encode('utf-8')
+		# bytes withheld from the editor in case they are the final newline
+		self.pending = b''
+
+		self.readOnly = editor.isReadOnly()
+		self.collectUndo = editor.SendScintilla(editor.SCI_GETUNDOCOLLECTION)
+
+		self.timer = QTimer(self)
+		self.timer.timeout.connect(self._loadBatch)
+
+	def start(self):
+		"""Start loading, return False if no candidate encoding can decode the start of the file"""
+		editor = self.editor
+		editor.SendScintilla(editor.SCI_SETUNDOCOLLECTION, False)
+		self.encodings = editor._iterEncodings(self.map[:charset.SNIFF_SIZE])
+		if not self._nextEncoding():
+			LOGGER.error('no candidate encoding can decode %r', self.path)
+			self._stop()
+			return False
+
+		editor.setReadOnly(False)
+		editor.SendScintilla(editor.SCI_ALLOCATE, self.size + 1)
+		editor.setReadOnly(True)
+		self.timer.start()
+		return True
+
+	def _nextEncoding(self):
+		# restart from the beginning of the file with the next candidate encoding
+		for encoding, bomLength in self.encodings:
+			break
+		else:
+			return False
+
+		editor = self.editor
+		editor._setDetectedEncoding(encoding, bomLength)
+		self.decoder = charset.StreamDecoder(encoding, bomLength)
+		self.offset = 0
+		self.pending = b''
+
+		editor.setReadOnly(False)
+		editor.SendScintilla(editor.SCI_CLEARALL)
+		editor.setReadOnly(True)
+		return True
+
+	def isRunning(self):
+		return self.timer.isActive()
+
+	@Slot()
+	def _loadBatch(self):
+		start_time = QElapsedTimer()
+		start_time.start()
+
+		try:
+			while not start_time.hasExpired(LOAD_BATCH_MS):
+				if not self._loadChunk():
+					self._finish()
+					return
+		except UnicodeDecodeError as exc:
+			LOGGER.info('%r is not in %r at offset %d: %s', self.path, self.decoder.encoding, self.offset, exc)
+			if not self._nextEncoding():
+				LOGGER.error('no candidate encoding can decode %r', self.path)
+				self.cancel()
+		except Exception:
+			LOGGER.error('cannot load file %r', self.path, exc_info=True)
+			self.cancel()
+
+	def _loadChunk(self):
+		editor = self.editor
+		end = min(self.offset + editor.loading.chunk_size, self.size)
+		final = (end == self.size)
+		chunk = self.map[self.offset:end]
+		chunk = self.decoder.decode(chunk, final)
+		self.offset = end
+
+		chunk = self.pending + chunk
+		if final:
+			if editor.saving.final_newline and chunk.endswith(self.newline):
+				chunk = chunk[:-len(self.newline)]
+			self.pending = b''
+		else:
+			self.pending = chunk[-len(self.newline):]
+			chunk = chunk[:-len(self.newline)]
+
+		editor.setReadOnly(False)
+		editor.SendScintilla(editor.SCI_APPENDTEXT, len(chunk), chunk)
+		editor.setReadOnly(True)
+
+		editor.fileLoadProgress.emit(self.offset, self.size)
+		return not final
+
+	def _finish(self):
+		self._stop()
+
+		editor = self.editor
+		editor.setModified(False)
+		editor.fileOpened.emit(self.path)
+
+	def _stop(self):
+		self.timer.stop()
+		if self.size:
+			self.map.close()
+		self.fd.close()
+
+		editor = self.editor
+		editor.SendScintilla(editor.SCI_SETUNDOCOLLECTION, self.collectUndo)
+		editor.SendScintilla(editor.SCI_EMPTYUNDOBUFFER)
+		editor.setReadOnly(self.readOnly)
+		editor._loader = None
+		self.setParent(None)
+
+	def cancel(self):
+		"""Stop loading, the part already loaded stays in the editor"""
+		if self.isRunning():
+			LOGGER.info('loading of %r was interrupted at %d/%d', self.path, self.offset, self.size)
+			self._stop()
+
+
+def excInfo(exc):
+	return (type(exc), exc, getattr(exc, '__traceback__', None))
+
+
+def iterSaveChunks(data, encoding, trim, newline, bom=False):
+	"""Yield the file data to write for editor text `data`
+
+	:param data: the editor text in UTF-8
+	:type data: bytes-like
+	:param encoding: encoding of the file
+	:param trim: whether to remove trailing whitespace
+	:param newline: newline to append, or None
+	:param bom: whether to write a byte order mark first
+
+	If `encoding` is UTF-8, `data` is not copied, except the pieces where whitespace is trimmed.
+	"""
+	if bom:
+		yield u'\ufeff'.encode(encoding)
+
+	if codecs.lookup(encoding).name != 'utf-8':
+		text = bytes(data).decode('utf-8')
+		if trim:
+			text = re.sub(r'[ \t]+$', '', text, flags=re.MULTILINE)
+		if newline is not None:
+			text += newline
+		yield text.encode(encoding)
+		return
+
+	view = memoryview(data)
+	if trim:
+		# pieces are cut after a newline, so lines are never split
+		pos = 0
+		while pos < len(view):
+			mtc = NEWLINE_BYTES.search(view, pos + SAVE_CHUNK_SIZE)
+			end = mtc.end() if mtc else len(view)
+			lines = view[pos:end].tobytes().split(b'\n')
+			yield b'\n'.join([line.rstrip(b' \t') for line in lines])
+			pos = end
+	else:
+		yield view
+
+	if newline is not None:
+		yield newline.encode('utf-8')
+
+
+class SaveJob(object):
+	"""Writing of an editor text to a file, see :any:`Editor.startSave`
+
+	:meth:`run` can be called in any thread, :meth:`finish` must be called in the GUI thread.
+	"""
+
+	def __init__(self, editor, path, data, callbacks=()):
+		self.editor = editor
+		self.path = path
+		self.newFile = not editor.path
+		self.data = data
+		self.encoding = editor.saving.encoding
+		self.bom = editor.saving.bom
+		self.trim = editor._trimsWhitespace()
+		self.newline = editor._newlineString() if editor.saving.final_newline else None
+		self.fsync = editor.saving.fsync
+		self.changeCount = editor._changeCount
+		self.callbacks = list(callbacks)
+
+		self.future = None
+		self.error = None
+		self.done = False
+
+	def run(self):
+		try:
+			chunks = iterSaveChunks(self.data, self.encoding, self.trim, self.newline, self.bom)
+			io.writeChunksToFile(self.path, chunks, self.fsync)
+		except Exception as exc:
+			self.error = exc
+		finally:
+			self.data = None
+
+	def finish(self):
+		if self.done:
+			return
+		self.done = True
+
+		editor = self.editor
+		if sip.isdeleted(editor):
+			if self.error is not None:
+				LOGGER.error('cannot write file %r', self.path, exc_info=excInfo(self.error))
+		else:
+			editor._finishSave(self)
+
+		for cb in self.callbacks:
+			with exceptionLogging(reraise=False, logger=LOGGER):
+				cb(editor, self.path, self.error)
+
+
+class FileSaver(QObject):
+	"""Run :any:`SaveJob` objects in a pool of worker threads and finish them in the GUI thread
+
+	At most :any:`SAVE_WORKERS` files are written at once.
+	"""
+
+	jobDone = Signal(object)
+
+	def __init__(self, parent=None):
+		super(FileSaver, self).__init__(parent)
+		self.pool = None
+		self.jobDone.connect(self._onJobDone, Qt.QueuedConnection)
+
+	def submit(self, job):
+		if self.pool is None:
+			from concurrent import futures
+
+			self.pool = futures.ThreadPoolExecutor(max_workers=SAVE_WORKERS)
+
+		job.future = self.pool.submit(job.run)
+		# called in the worker thread
+		job.future.add_done_callback(lambda fut: self.jobDone.emit(job))
+
+	@Slot(object)
+	def _onJobDone(self, job):
+		job.finish()
+
+
+SAVER = FileSaver()
+
+
+def _listMatchStarts(pattern, data, cancelled, candidates=None):
+	# search whole lines by chunks, like SearchHighlighter, and give other threads a chance between chunks
+	starts = array('q')
+	if candidates is not None and len(candidates) * CANDIDATE_COST_BYTES < len(data):
+		for pos in range(0, len(candidates), CANDIDATES_CHUNK_SIZE):
+			if cancelled.is_set():
+				return None
+			chunk = candidates[pos:pos + CANDIDATES_CHUNK_SIZE]
+			starts.extend(start for start, _ in pattern.matchAt(data, chunk))
+		return starts
+
+	pos = 0
+	while pos < len(data):
+		if cancelled.is_set():
+			return None
+
+		if pattern.spansLines:
+			end = textsearch.paragraphEnd(data, min(len(data), pos + SEARCH_CHUNK_SIZE))
+		else:
+			end = data.find(b'\n', pos + SEARCH_CHUNK_SIZE) + 1 or len(data)
+		end = max(end, min(len(data), pos + SEARCH_CHUNK_SIZE))
+		starts.extend(start for start, _ in pattern.finditer(data, pos, end))
+		pos = end
+	return starts
+
+
+class MatchCounter(QObject):
+	"""Count matches of search patterns in a worker thread, for :any:`SearchHighlighter`
+
+	The text is copied, so it can be modified while matches are counted.
+	"""
+
+	jobDone = Signal(object)
+
+	def __init__(self, parent=None):
+		super(MatchCounter, self).__init__(parent)
+		self.pool = None
+		self.jobDone.connect(self._onJobDone, Qt.QueuedConnection)
+
+	def submit(self, highlighter, pattern, data, candidates=None):
+		"""Count matches of `pattern` in `data`, and pass them to `highlighter` in the GUI thread
+
+		If `candidates` is not None, only matches starting at those offsets are counted.
+
+		:returns: an event to set to cancel the count
+		:rtype: threading.Event
+		"""
+		if self.pool is None:
+			from concurrent import futures
+
+			self.pool = futures.ThreadPoolExecutor(max_workers=1)
+
+		cancelled = threading.Event()
+		target = ref(highlighter)
+		future = self.pool.submit(_listMatchStarts, pattern, data, cancelled, candidates)
+		# called in the worker thread
+		future.add_done_callback(lambda fut: self.jobDone.emit((target, cancelled, fut)))
+		return cancelled
+
+	@Slot(object)
+	def _onJobDone(self, job):
+		target, cancelled, future = job
+		highlighter = target()
+		if cancelled.is_set() or highlighter is None or sip.isdeleted(highlighter):
+			return
+
+		with exceptionLogging(reraise=False, logger=LOGGER):
+			highlighter._setMatchStarts(cancelled, future.result())
+
+
+COUNTER = MatchCounter()
+
+
+class SearchHighlighter(QObject, HasWeakEditorMixin):
+	"""Highlight the matches of a search pattern with an indicator, visible lines first
+
+	When started, the lines visible on screen are searched immediately, then the rest of the text is
+	searched by batches of whole lines, when the event loop is idle, starting after the visible lines.
+	Lines newly exposed by scrolling are searched before they are painted. Searched lines are tracked, so
+	each line is searched once.
+
+	When the text is modified, the modified lines are searched again, like lines not searched yet: visible
+	ones immediately, others in idle batches. Modifications are coalesced: the lines modified by a burst of
+	notifications (for example a paste or a replace-all) are merged in a single damaged range, and applied
+	to the searched lines only when searching next. If the pattern may match across lines, lines are
+	searched by whole paragraphs, so a modified line is searched again with its paragraph.
+
+	Meanwhile, matches are counted in a worker thread on a copy of the text, see :any:`matchStatus`.
+	"""
+
+	started = Signal()
+
+	"""started()
+
+	Emitted when a new search is started.
+	"""
+
+	found = Signal(int, int)
+
+	"""found(int, int)
+
+	Emitted for each match highlighted, with its start and end offsets.
+	"""
+
+	finished = Signal(int)
+
+	"""finished(int)
+
+	Emitted when all lines have been searched, with the number of matches, or -1 if they're not counted yet.
+	"""
+
+	countChanged = Signal(int)
+
+	"""countChanged(int)
+
+	Emitted when the matches have been counted, with the number of matches, or with -1 when the count
+	becomes unknown because the text was modified. The count is updated after :any:`COUNT_DELAY_MS`.
+	"""
+
+	def __init__(self, editor, indicator, **kwargs):
+		super(SearchHighlighter, self).__init__(**kwargs)
+		self.editor = editor
+		self.indicator = indicator
+
+		self.pattern = None
+		"""The :any:`eye.textsearch.SearchPattern` highlighted, None if stopped"""
+
+		self.searched = structs.IntervalSet()
+		"""Set of the lines searched, see :any:`eye.structs.IntervalSet`"""
+
+		# first line searched by the next idle batch
+		self.nextLine = 0
+
+		# offsets where matches may start, None if the whole text must be searched
+		self.candidates = None
+
+		# lines modified since the last search, as (first, last, linesAdded), see _onModified
+		self.damage = None
+
+		self.timer = QTimer(self)
+		self.timer.timeout.connect(self._searchBatch)
+
+		# start offsets of all matches, None when unknown
+		self.matchStarts = None
+		self.countCancel = None
+		self.countTimer = QTimer(self)
+		self.countTimer.setSingleShot(True)
+		self.countTimer.timeout.connect(self._startCount)
+
+		editor.SCN_UPDATEUI.connect(self._onUpdateUI)
+		editor.sciModified.connect(self._onModified)
+		editor.textChanged.connect(self._onTextChanged)
+
+	def start(self, pattern, candidates=None, exact=False):
+		"""Clear previous highlights and highlight matches of `pattern`
+
+		If the offsets where matches may start are already known, for example because `pattern` is a
+		refinement of a previous pattern, only those offsets are tested where they're sparse, instead of
+		searching the text.
+
+		:type pattern: eye.textsearch.SearchPattern
+		:param candidates: if not None, a sorted `array` of the offsets where matches may start
+		:param exact: if True, `candidates` are exactly the starts of the matches, so they're not counted
+		"""
+		self.stop()
+		self.pattern = pattern
+		self.candidates = candidates
+		self.searched.clear()
+		self.damage = None
+		self.indicator.clear()
+		self.started.emit()
+
+		first, last = self.visibleLines()
+		self.searchLines(first, last)
+		self.nextLine = last
+		self.timer.start()
+
+		if candidates is not None and exact:
+			self.matchStarts = candidates
+			self.countChanged.emit(len(candidates))
+		else:
+			if self.matchStarts is not None:
+				self.matchStarts = None
+				self.countChanged.emit(-1)
+			# copying the text takes time, do it after the visible matches are painted
+			self.countTimer.start(0)
+
+	def stop(self):
+		"""Stop searching, matches already highlighted are kept"""
+		self.timer.stop()
+		self.countTimer.stop()
+		self._cancelCount()
+		self.pattern = None
+
+	def clear(self):
+		"""Stop searching and remove highlights"""
+		self.stop()
+		self.candidates = None
+		self.searched.clear()
+		self.damage = None
+		self.indicator.clear()
+
+	def isComplete(self):
+		"""Return True if all lines have been searched"""
+		self._applyDamage()
+		return self.searched.covers(0, self.editor.lines())
+
+	def visibleLines(self):
+		"""Return the range of lines visible on screen, as a `(first, last)` tuple, last being excluded"""
+		editor = self.editor
+		firstVisible = editor.SendScintilla(editor.SCI_GETFIRSTVISIBLELINE)
+		lastVisible = firstVisible + editor.SendScintilla(editor.SCI_LINESONSCREEN)
+		# visible lines differ from document lines when lines are wrapped or folded
+		first = editor.SendScintilla(editor.SCI_DOCLINEFROMVISIBLE, firstVisible)
+		last = editor.SendScintilla(editor.SCI_DOCLINEFROMVISIBLE, lastVisible) + 1
+		return first, min(last, editor.lines())
+
+	def _lineOffset(self, lineno):
+		if lineno >= self.editor.lines():
+			return self.editor.bytesLength()
+		return self.editor.SendScintilla(self.editor.SCI_POSITIONFROMLINE, lineno)
+
+	def _lineFromOffset(self, offset):
+		if offset >= self.editor.bytesLength():
+			return self.editor.lines()
+		return self.editor.SendScintilla(self.editor.SCI_LINEFROMPOSITION, offset)
+
+	def _chunkEnd(self, first, last):
+		# end of a chunk of whole lines, of about SEARCH_CHUNK_SIZE bytes
+		editor = self.editor
+		start = self._lineOffset(first)
+		return min(last, editor.SendScintilla(editor.SCI_LINEFROMPOSITION, start + SEARCH_CHUNK_SIZE) + 1)
+
+	def _chunkStart(self, first, last):
+		editor = self.editor
+		end = self._lineOffset(last)
+		return max(first, editor.SendScintilla(editor.SCI_LINEFROMPOSITION, max(0, end - SEARCH_CHUNK_SIZE)))
+
+	def searchLines(self, first, last):
+		"""Search lines from `first` (inclusive) to `last` (exclusive), return the number of matches
+
+		Matches previously highlighted in those lines are removed. If the pattern may match across lines,
+		the range is extended to whole paragraphs.
+		"""
+		self._applyDamage()
+		start = self._lineOffset(first)
+		end = self._lineOffset(last)
+		view = self.editor.bytesView()
+		if self.pattern.spansLines:
+			start = textsearch.paragraphStart(view, start)
+			end = textsearch.paragraphEnd(view, end)
+			first, last = self._lineFromOffset(start), self._lineFromOffset(end)
+
+		self.searched.add(first, last)
+		if start >= end:
+			return 0
+
+		self.indicator.removeAtOffset(start, end)
+		spans = None
+		if self.candidates is not None:
+			low = bisect_left(self.candidates, start)
+			high = bisect_left(self.candidates, end)
+			if (high - low) * CANDIDATE_COST_BYTES < end - start:
+				spans = self.pattern.matchAt(view, self.candidates[low:high], end)
+		if spans is None:
+			spans = self.pattern.finditer(view, start, end)
+		if not self.receivers(self.found):
+			return self.indicator.putRanges(spans)
+
+		spans = list(spans)
+		self.indicator.putRanges(spans)
+		for mstart, mend in spans:
+			self.found.emit(mstart, mend)
+		return len(spans)
+
+	def searchNearest(self, offset, forward=True):
+		"""Search lines from `offset` until a match is found, wrapping around
+
+		After this call, the match nearest to `offset` in direction `forward` is highlighted, if any, so it
+		can be looked up in the indicator.
+		"""
+		if self.pattern is None:
+			return
+
+		self._applyDamage()
+		lines = self.editor.lines()
+		line = self.editor.SendScintilla(self.editor.SCI_LINEFROMPOSITION, offset)
+		if forward:
+			gaps = self.searched.gaps(line, lines) + self.searched.gaps(0, line)
+		else:
+			gaps = self.searched.gaps(0, line + 1)[::-1] + self.searched.gaps(line + 1, lines)[::-1]
+
+		for first, last in gaps:
+			while first < last:
+				if forward:
+					end = self._chunkEnd(first, last)
+					matched = self.searchLines(first, end)
+					first = end
+				else:
+					start = self._chunkStart(first, last)
+					matched = self.searchLines(start, last)
+					last = start
+				if matched:
+					return
+
+	@Slot()
+	def _searchBatch(self):
+		if self.editor is None:
+			self.stop()
+			return
+
+		elapsed = QElapsedTimer()
+		elapsed.start()
+
+		self._applyDamage()
+		lines = self.editor.lines()
+		while not elapsed.hasExpired(SEARCH_BATCH_MS):
+			# search after the visible lines first, then wrap around
+			gaps = self.searched.gaps(self.nextLine, lines) or self.searched.gaps(0, self.nextLine)
+			if not gaps:
+				self.timer.stop()
+				self.finished.emit(self.matchCount())
+				return
+
+			first, last = gaps[0]
+			self.nextLine = self._chunkEnd(first, last)
+			self.searchLines(first, self.nextLine)
+
+	@Slot(int)
+	def _onUpdateUI(self, updated):
+		if self.pattern is None:
+			return
+
+		self._applyDamage()
+		first, last = self.visibleLines()
+		for gapFirst, gapLast in self.searched.gaps(first, last):
+			self.searchLines(gapFirst, gapLast)
+
+	@Slot(SciModification)
+	def _onModified(self, modif):
+		editor = self.editor
+		if not modif.modificationType & (editor.SC_MOD_INSERTTEXT | editor.SC_MOD_DELETETEXT):
+			return
+		elif self.pattern is None and not self.searched:
+			return
+
+		# lines from first to last (excluded) were modified, they were lines first to last - linesAdded
+		# before the burst of modifications
+		added = modif.linesAdded
+		line = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, modif.position)
+		end = line + max(0, added) + 1
+		if self.damage is None:
+			self.damage = (line, end, added)
+		else:
+			first, last, total = self.damage
+			if last > line:
+				last = max(line + 1, last + added)
+			self.damage = (min(first, line), max(last, end), total + added)
+
+		if self.pattern is not None and not self.timer.isActive():
+			self.timer.start()
+
+	def _applyDamage(self):
+		# mark the modified lines as not searched, and shift the lines after them
+		if self.damage is None:
+			return
+
+		first, last, added = self.damage
+		self.damage = None
+		self.searched.remove(first, last - added)
+		self.searched.shift(first, added)
+
+	@Slot()
+	def _onTextChanged(self):
+		if self.pattern is None:
+			return
+
+		self._cancelCount()
+		# offsets changed
+		self.candidates = None
+		if self.matchStarts is not None:
+			self.matchStarts = None
+			self.countChanged.emit(-1)
+		self.countTimer.start(COUNT_DELAY_MS)
+
+	def _cancelCount(self):
+		if self.countCancel is not None:
+			self.countCancel.set()
+			self.countCancel = None
+
+	@Slot()
+	def _startCount(self):
+		self._cancelCount()
+		self.matchStarts = None
+		if self.pattern is None or self.editor is None:
+			return
+
+		self.countCancel = COUNTER.submit(
+			self, self.pattern, self.editor.bytesView().tobytes(), self.candidates
+		)
+
+	def _setMatchStarts(self, cancelled, starts):
+		if cancelled is not self.countCancel or starts is None:
+			return
+
+		self.countCancel = None
+		self.matchStarts = starts
+		self.countChanged.emit(len(starts))
+
+	def matchCount(self):
+		"""Return the number of matches in the text, or -1 if they're not counted yet"""
+		if self.matchStarts is None:
+			return -1
+		return len(self.matchStarts)
+
+	def matchStatus(self, offset):
+		"""Return the position of `offset` among matches, for an "N of M" display
+
+		:returns: a tuple `(n, total)`, where `n` is the number of matches starting at or before `offset`,
+		          or None if matches are not counted yet
+		"""
+		if self.matchStarts is None:
+			return None
+		return bisect_right(self.matchStarts, offset), len(self.matchStarts)
+
+
 class Editor(BaseEditor, CentralWidgetMixin):
 	"""Editor widget class
 
@@ -1136,6 +1903,13 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		super(Editor, self).__init__(**kwargs)
 
 		self.path = ''
+
+		self.bigfile = structs.PropDict()
+		self.bigfile.size_threshold = bigfile.SIZE_THRESHOLD
+		self.bigfile.line_length_threshold = bigfile.LINE_LENGTH_THRESHOLD
+		self.bigfile.active = False
+		self.bigfile.degraded = []
+
 		self.modificationChanged.connect(self.setWindowModified)
 		self.modificationChanged.connect(self._updateTitle)
 		self._updateTitle()
@@ -1144,9 +1918,26 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		self.saving.trim_whitespace = False
 		self.saving.final_newline = True
 		self.saving.encoding = 'utf-8'
+		self.saving.bom = False
+		self.saving.asynchronous = True
+		self.saving.fsync = io.FSYNC_NONE
 		self.setUtf8(True)
 		# the editor is in utf-8 internally, encoding is done when saving
 
+		self._saveJob = None
+		# callbacks of the save to do when the current one completes
+		self._pendingSave = None
+		# compared to know if the text changed during an asynchronous save
+		self._changeCount = 0
+		self.textChanged.connect(self._countChange)
+
+		self.loading = structs.PropDict()
+		self.loading.chunked_threshold = 64 << 20
+		self.loading.chunk_size = 1 << 20
+		self.loading.encoding = 'utf-8'
+		self.loading.fallback_encodings = list(charset.FALLBACK_ENCODINGS)
+		self._loader = None
+
 		self.search = structs.PropDict()
 		self.search.incremental = True
 		self.search.highlight = False
@@ -1154,6 +1945,7 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		self.search.caseSensitive = False
 		self.search.wrap = True
 		self.search.whole = False
+		self._searchHighlighter = None
 
 		self._lexer = None
 
@@ -1169,8 +1961,14 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		if self.isModified():
 			t = '%s*' % t
 
+		tip = self.path or '<untitled>'
+		if self.bigfile.active:
+			t = '%s [big]' % t
+			features = ', '.join(feature.description for feature in bigfile.degradedFeatures(self))
+			tip = '%s\nBig file mode, disabled: %s' % (tip, features or 'nothing')
+
 		self.setWindowTitle(t)
-		self.setToolTip(self.path or '<untitled>')
+		self.setToolTip(tip)
 
 	## file management
 	def _getFilename(self):
@@ -1178,37 +1976,121 @@ class Editor(BaseEditor, CentralWidgetMixin):
 			return ''
 		return os.path.basename(self.path)
 
+	def _savePath(self):
+		if self.isLoading():
+			LOGGER.warning('cannot save %r while it is being loaded', self.path)
+			return None
+
+		path = self.path
+		if not path:
+			path, qfilter = QFileDialog.getSaveFileName(self, self.tr('Save file'), os.path.expanduser('~'))
+			if not path:
+				return None
+		return path
+
 	@Slot()
 	def saveFile(self):
 		"""Save edited file
 
 		If no file path is set, a file dialog is shown to ask the user where to save content.
+
+		If asynchronous saving is enabled (see :any:`setAsynchronousSave`), the file is saved with
+		:any:`startSave` and this method returns True if saving was started. Else, the file is written
+		before returning, and True is returned if it succeeded.
 		"""
-		path = self.path
+		if self.saving.asynchronous:
+			return self.startSave()
+		return self._saveNow()
 
-		newFile = not path
-		if newFile:
-			path, qfilter = QFileDialog.getSaveFileName(self, self.tr('Save file'), os.path.expanduser('~'))
-			if not path:
-				return False
-			path = path
+	def _saveNow(self):
+		self.waitSaved()
+
+		path = self._savePath()
+		if path is None:
+			return False
 
-		data = self._writeText(self.text())
 		self.fileAboutToBeSaved.emit(path)
-		try:
-			io.writeBytesToFile(path, data)
-		except IOError:
-			LOGGER.error('cannot write file %r', path, exc_info=True)
+		job = SaveJob(self, path, self.bytesView())
+		with profiling.span('save', 'write %s' % path):
+			job.run()
+		job.finish()
+		return job.error is None
+
+	def startSave(self, callback=None):
+		"""Start saving the file in a worker thread
+
+		A snapshot of the text is taken, then the file is written in a worker thread, so a slow filesystem
+		doesn't freeze the UI. When writing is complete, :any:`fileSaved` (or :any:`fileSavedAs` if the
+		editor had no path) is emitted, or :any:`fileSaveFailed` if writing failed. The editor is marked
+		unmodified only if it wasn't modified since the snapshot.
+
+		If a save of this editor is already in progress, another save is done after it completes.
+
+		:param callback: if not None, called in the GUI thread when the file is written, with the editor,
+		                 the path and None, or the exception if saving failed
+		:returns: True if saving was started, False if it was cancelled by the user or impossible
+		"""
+		callbacks = [callback] if callback is not None else []
+
+		if self._saveJob is not None:
+			if self._pendingSave is None:
+				self._pendingSave = []
+			self._pendingSave.extend(callbacks)
+			return True
+
+		path = self._savePath()
+		if path is None:
 			return False
 
-		self.path = path
-		self.setModified(False)
-		if newFile:
-			self.fileSavedAs.emit(path)
+		self._submitSave(path, callbacks)
+		return True
+
+	def _submitSave(self, path, callbacks):
+		self.fileAboutToBeSaved.emit(path)
+		with profiling.span('save', 'snapshot %s' % path):
+			data = self.bytesView().tobytes()
+		self._saveJob = SaveJob(self, path, data, callbacks)
+		SAVER.submit(self._saveJob)
+
+	def _finishSave(self, job):
+		if self._saveJob is job:
+			self._saveJob = None
+
+		if job.error is not None:
+			LOGGER.error('cannot write file %r', job.path, exc_info=excInfo(job.error))
+			self.fileSaveFailed.emit(job.path, str(job.error))
+		else:
+			self.path = job.path
+			if self._changeCount == job.changeCount:
+				self.setModified(False)
+			if job.newFile:
+				self.fileSavedAs.emit(job.path)
+			else:
+				self.fileSaved.emit(job.path)
+
+		pending, self._pendingSave = self._pendingSave, None
+		if pending is None:
+			return
+		if self.path:
+			self._submitSave(self.path, pending)
 		else:
-			self.fileSaved.emit(path)
+			for cb in pending:
+				cb(self, job.path, job.error)
 
-		return True
+	def isSaving(self):
+		"""Return True if the file is being saved in a worker thread, see :any:`startSave`"""
+		return self._saveJob is not None
+
+	def waitSaved(self):
+		"""Block until the saves started by :any:`startSave` are complete"""
+		while self._saveJob is not None:
+			job = self._saveJob
+			job.future.exception()
+			job.finish()
+
+	@Slot()
+	def _countChange(self):
+		self._changeCount += 1
 
 	def closeFile(self):
 		"""Prepare for closing file and return `True` if modification state is clean
@@ -1218,6 +2100,7 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		"""
 		ret = True
 
+		self.waitSaved()
 		if self.isModified():
 			file = self.windowTitle()
 
@@ -1227,7 +2110,7 @@ class Editor(BaseEditor, CentralWidgetMixin):
 			elif answer == QMessageBox.Cancel:
 				ret = False
 			elif answer == QMessageBox.Save:
-				ret = self.saveFile()
+				ret = self._saveNow()
 		return ret
 
 	def _newlineString(self):
@@ -1239,47 +2122,147 @@ class Editor(BaseEditor, CentralWidgetMixin):
 
 		return modes.get(self.eolMode(), '\n')
 
-	def _readText(self, data):
-		text = data.decode(self.saving.encoding)
-		if self.saving.final_newline and text.endswith(self._newlineString()):
-			text = text[:-1]
-		return text
+	def _iterEncodings(self, data):
+		return charset.iterEncodings(data, self.loading.encoding, self.loading.fallback_encodings)
+
+	def _setDetectedEncoding(self, encoding, bomLength):
+		sameEncoding = codecs.lookup(encoding).name == codecs.lookup(self.loading.encoding).name
+		if not sameEncoding:
+			LOGGER.info('%r is decoded as %r instead of %r', self.path, encoding, self.loading.encoding)
+		self.saving.encoding = encoding
+		# a BOM requested before opening, for example by the project configuration, is kept if the
+		# requested encoding is used
+		self.saving.bom = bool(bomLength) or (self.saving.bom and sameEncoding)
 
-	def _removeTrailingWhitespace(self, text):
-		return re.sub(r'[ \t]+$', '', text, flags=re.MULTILINE)
+	def _decodeFileData(self, data):
+		"""Detect the encoding of file content `data` and return the text to put in the editor
 
-	def _writeText(self, text):
-		if self.saving.trim_whitespace:
-			text = self._removeTrailingWhitespace(text)
-		if self.saving.final_newline:
-			text += self._newlineString()
-		return text.encode(self.saving.encoding)
+		The detected encoding is recorded for saving, see :any:`encoding`.
+		UTF-8 `data` is not decoded, it's returned as is, since Scintilla is in UTF-8 internally.
+
+		:returns: a tuple `(text, length)`, where only the first `length` bytes of UTF-8 `text` should be
+		          put in the editor, the rest is the final newline
+		:raises ValueError: if no candidate encoding can decode `data`
+		"""
+		for encoding, bomLength in self._iterEncodings(data):
+			try:
+				text = charset.StreamDecoder(encoding, bomLength).decode(data, True)
+			except UnicodeDecodeError as exc:
+				LOGGER.info('%r is not in %r: %s', self.path, encoding, exc)
+				continue
+
+			self._setDetectedEncoding(encoding, bomLength)
+			length = len(text)
+			newline = self._newlineString().encode('ascii')
+			if self.saving.final_newline and text.endswith(newline):
+				length -= len(newline)
+			return text, length
+
+		raise ValueError('no candidate encoding can decode %r' % self.path)
+
+	def _setBytesText(self, data, length):
+		"""Set the editor content from the first `length` bytes of UTF-8 `data`
+
+		Like :any:`setText`, this clears the undo history. No `str` copy of `data` is made.
+		"""
+		ro = self.isReadOnly()
+		self.setReadOnly(False)
+		collectUndo = self.SendScintilla(self.SCI_GETUNDOCOLLECTION)
+		# avoid a copy of the text in the undo history and buffer reallocations
+		self.SendScintilla(self.SCI_SETUNDOCOLLECTION, False)
+		self.SendScintilla(self.SCI_CLEARALL)
+		self.SendScintilla(self.SCI_ALLOCATE, length + 1)
+		self.SendScintilla(self.SCI_APPENDTEXT, length, data)
+		self.SendScintilla(self.SCI_SETUNDOCOLLECTION, collectUndo)
+		self.SendScintilla(self.SCI_EMPTYUNDOBUFFER)
+		self.setReadOnly(ro)
+
+	def _trimsWhitespace(self):
+		return self.saving.trim_whitespace and not bigfile.isDegraded(self, 'trim_whitespace')
 
 	def openFile(self, path):
+		"""Open file at `path` in this editor
+
+		If the file is bigger than the chunked load threshold (see :any:`setChunkedLoadThreshold`), the file is
+		loaded progressively and this method returns before loading is complete. :any:`fileOpened` is emitted
+		when loading is complete in both cases.
+		"""
 		if not self.closeFile():
 			return False
 
+		self.cancelLoading()
+
 		path = os.path.abspath(path)
 		self.path = path
 
 		try:
-			data = io.readBytesFromFile(path)
+			size = os.path.getsize(path)
+		except OSError:
+			size = None
+
+		threshold = self.loading.chunked_threshold
+		if size is not None and threshold is not None and size >= threshold:
+			self._checkBigFile(size)
+			return self._openFileChunked(path)
+
+		try:
+			with profiling.span('open', 'read %s' % path):
+				data = io.readBytesFromFile(path)
 		except IOError:
 			LOGGER.error('cannot read file %r', path, exc_info=True)
 			return False
+		self.saving.bom = False
 		self.fileAboutToBeOpened.emit(path)
 
-		text = self._readText(data)
-		self.setText(text)
+		with profiling.span('open', 'check big file %s' % path):
+			self._checkBigFile(len(data), data)
+
+		try:
+			with profiling.span('open', 'decode %s' % path):
+				text, length = self._decodeFileData(data)
+		except ValueError:
+			LOGGER.error('cannot decode file %r', path, exc_info=True)
+			return False
+		del data
+
+		with profiling.span('open', 'setText %s' % path):
+			self._setBytesText(text, length)
+		del text
 		self.setModified(False)
-		self.fileOpened.emit(path)
+		with profiling.span('open', 'fileOpened handlers %s' % path):
+			self.fileOpened.emit(path)
 		return True
 
+	def _openFileChunked(self, path):
+		try:
+			loader = FileLoader(self, path, parent=self)
+		except (IOError, OSError, ValueError):
+			LOGGER.error('cannot read file %r', path, exc_info=True)
+			return False
+
+		self.saving.bom = False
+		self.fileAboutToBeOpened.emit(path)
+		self._loader = loader
+		return loader.start()
+
+	def isLoading(self):
+		"""Return True if a file is being loaded by chunks"""
+		return self._loader is not None
+
+	def cancelLoading(self):
+		"""Interrupt loading of a file by chunks, if any
+
+		The part of the file already loaded stays in the editor, and :any:`fileOpened` is not emitted.
+		"""
+		if self._loader is not None:
+			self._loader.cancel()
+
 	def openDocument(self, other):
 		if not self.closeFile():
 			return False
 
 		self.path = other.path
+		self.setBigFileMode(other.isBigFileMode())
 		self.setDocument(other.document())
 		self.modificationChanged.emit(self.isModified())
 		return True
@@ -1291,22 +2274,39 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		Reload file from disk and replace editor contents with updated text.
 		If the user made modifications to the editor contents without saving them, calling this
 		method will will lose them. However, the replacement can be undone by the user.
+
+		Only the lines which differ are replaced (see :doc:`eye.linediff`), so markers, indicators and
+		annotations on other lines are kept.
 		"""
-		oldPos = self.getCursorPosition()
+		if self.isLoading():
+			return False
 
 		try:
 			data = io.readBytesFromFile(self.path)
 		except IOError:
 			LOGGER.error('cannot reload file %r', self.path, exc_info=True)
 			return False
-		text = self._readText(data)
+		self._checkBigFile(len(data), data)
 
-		with self.undoGroup():
-			# XXX setText would clear the history
-			self.clear()
-			self.insert(text)
+		try:
+			text, length = self._decodeFileData(data)
+		except ValueError:
+			LOGGER.error('cannot decode file %r', self.path, exc_info=True)
+			return False
+		del data
+		new = text[:length] if length < len(text) else text
+		del text
+
+		with profiling.span('reload', 'diff %s' % self.path):
+			hunks = linediff.diffLines(self.bytesView(), new)
+
+		if hunks:
+			with self.undoGroup():
+				# XXX setText would clear the history
+				for start, end, replacement in hunks:
+					self.setTargetRange(start, end)
+					self.replaceTarget(len(replacement), replacement)
 		self.setModified(False)
-		self.setCursorPosition(*oldPos)
 		return True
 
 	## various props
@@ -1351,18 +2351,147 @@ class Editor(BaseEditor, CentralWidgetMixin):
 	def setEncoding(self, s):
 		"""Set the file data encoding for loading/saving
 
-		When loading file contents from disk or saving file to disk, this encoding will be used.
+		When loading file contents from disk, this encoding is tried first, unless the file starts with a
+		byte order mark. If it can't decode the file, the fallback encodings are tried (see
+		:any:`setFallbackEncodings` and :doc:`eye.charset`), and the encoding which could decode the file
+		replaces this one for saving.
+		When saving file to disk, this encoding will be used.
 		This does not change the internal encoding used by the editor widget, which is UTF-8.
 
 		This does not cause the file to be re-saved.
 		"""
 		u''.encode(s) # ensure it's usable
+		self.loading.encoding = s
 		self.saving.encoding = s
 
 	def encoding(self):
-		"""Return the encoding to use for loading/saving"""
+		"""Return the encoding to use for loading/saving
+
+		After a file is opened, it's the encoding detected for the file.
+		"""
 		return self.saving.encoding
 
+	def setFallbackEncodings(self, encodings):
+		"""Set the encodings to try when loading a file the configured encoding can't decode
+
+		Encodings are tried in order, see :doc:`eye.charset`. If `encodings` is empty, files which can't
+		be decoded with the encoding set by :any:`setEncoding` fail to open.
+		"""
+		for encoding in encodings:
+			u''.encode(encoding) # ensure it's usable
+		self.loading.fallback_encodings = list(encodings)
+
+	def fallbackEncodings(self):
+		"""Return the encodings to try when the configured encoding can't decode a file"""
+		return list(self.loading.fallback_encodings)
+
+	def setUseBom(self, b):
+		"""Set whether a byte order mark should be written at the start of the file when saving
+
+		This is set automatically when a file is opened, depending on whether it starts with a BOM. If set by
+		a handler of :any:`fileAboutToBeOpened`, a BOM is also written for files which had none, unless they
+		were decoded with another encoding than the one set.
+
+		This does not cause the file to be re-saved.
+		"""
+		self.saving.bom = b
+
+	def useBom(self):
+		"""Return True if a byte order mark is written when saving
+
+		See :any:`setUseBom`.
+		"""
+		return self.saving.bom
+
+	def setAsynchronousSave(self, b):
+		"""Set whether :any:`saveFile` writes the file in a worker thread
+
+		See :any:`startSave`. Enabled by default.
+		"""
+		self.saving.asynchronous = b
+
+	def asynchronousSave(self):
+		"""Return True if :any:`saveFile` writes the file in a worker thread"""
+		return self.saving.asynchronous
+
+	def setFsyncPolicy(self, policy):
+		"""Set how saved files are synced to disk
+
+		:param policy: one of :any:`eye.io.FSYNC_NONE` (the default), :any:`eye.io.FSYNC_FILE` or
+		               :any:`eye.io.FSYNC_DIR`
+		"""
+		if policy not in (io.FSYNC_NONE, io.FSYNC_FILE, io.FSYNC_DIR):
+			raise ValueError('unknown fsync policy %r' % policy)
+		self.saving.fsync = policy
+
+	def fsyncPolicy(self):
+		"""Return how saved files are synced to disk, see :any:`setFsyncPolicy`"""
+		return self.saving.fsync
+
+	def setChunkedLoadThreshold(self, size):
+		"""Set the file size from which files are loaded progressively
+
+		Files of at least `size` bytes are loaded by chunks, across multiple event loop iterations, so
+		the UI is not frozen while loading them. :any:`fileLoadProgress` is emitted after each chunk.
+		If `size` is None, files are always loaded at once.
+		"""
+		self.loading.chunked_threshold = size
+
+	def chunkedLoadThreshold(self):
+		"""Return the file size from which files are loaded progressively
+
+		See :any:`setChunkedLoadThreshold`.
+		"""
+		return self.loading.chunked_threshold
+
+	def setBigFileThresholds(self, size=None, lineLength=None):
+		"""Set the thresholds from which an opened file switches the editor to big file mode
+
+		In big file mode, expensive features are degraded, see :doc:`eye.bigfile`. The mode is chosen when
+		a file is opened or reloaded, if the file has at least `size` bytes or has a line of more than
+		`lineLength` bytes. A None value disables the corresponding check.
+		"""
+		self.bigfile.size_threshold = size
+		self.bigfile.line_length_threshold = lineLength
+
+	def bigFileThresholds(self):
+		"""Return a `(size, lineLength)` tuple of the big file mode thresholds
+
+		See :any:`setBigFileThresholds`.
+		"""
+		return (self.bigfile.size_threshold, self.bigfile.line_length_threshold)
+
+	def setBigFileMode(self, active):
+		"""Enter (if `active` is True) or leave big file mode
+
+		This is done automatically when opening a file, but can be used to force the mode.
+		"""
+		active = bool(active)
+		if active == self.bigfile.active:
+			return
+
+		LOGGER.info('%s big file mode for %r', 'entering' if active else 'leaving', self.path)
+		bigfile.applyPolicy(self, active)
+		self._updateTitle()
+		self.bigFileModeChanged.emit(active)
+
+	def isBigFileMode(self):
+		"""Return True if the editor is in big file mode"""
+		return self.bigfile.active
+
+	def _checkBigFile(self, size, data=None):
+		big = False
+
+		threshold = self.bigfile.size_threshold
+		if threshold is not None and size >= threshold:
+			big = True
+
+		threshold = self.bigfile.line_length_threshold
+		if not big and threshold is not None and data is not None:
+			big = bigfile.hasLongLine(data, threshold)
+
+		self.setBigFileMode(big)
+
 	## misc
 	@contextlib.contextmanager
 	def undoGroup(self, undoOnError=False):
@@ -1454,6 +2583,19 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		"""Return the length of the text in bytes"""
 		return self.length()
 
+	def bytesView(self):
+		"""Return a read-only `memoryview` of the whole text in UTF-8, without copying it
+
+		The view points directly in the Scintilla buffer. It must not be used after the text is modified,
+		since the buffer may then be moved or freed.
+		"""
+		length = self.length()
+		if not length:
+			return memoryview(b'')
+		# unlike SCI_GETCHARACTERPOINTER, this doesn't reallocate the buffer to add a final NUL
+		ptr = self.SendScintilla(self.SCI_GETRANGEPOINTER, 0, length)
+		return memoryview(sip.voidptr(ptr, length, False))
+
 	def textLength(self):
 		"""Return the length of the text in Unicode codepoints"""
 		return len(self.text())
@@ -1466,24 +2608,42 @@ class Editor(BaseEditor, CentralWidgetMixin):
 		else:
 			return cs
 
-	def _searchOptionsToRe(self):
-		expr = self.search.expr if self.search.isRe else re.escape(self.search.expr)
-		if self.search.whole:
-			expr = '\b%s\b' % expr
-		caseSensitive = self._smartCase(expr, self.search.caseSensitive)
-		flags = 0 if caseSensitive else re.I
-		return re.compile(expr, flags)
+	def _searchPattern(self):
+		caseSensitive = self._smartCase(self.search.expr, self.search.caseSensitive)
+		return textsearch.compileSearch(self.search.expr, self.search.isRe, caseSensitive, self.search.whole)
+
+	def _searchHighlightIndicator(self):
+		indicator = self.indicators.get('searchHighlight')
+		if indicator is None:
+			indicator = self.createIndicator('searchHighlight')
+		return indicator
+
+	def searchHighlighter(self):
+		"""Return the :any:`SearchHighlighter` highlighting matches of :any:`find`"""
+		if self._searchHighlighter is None:
+			self._searchHighlighter = SearchHighlighter(self, self._searchHighlightIndicator(), parent=self)
+		return self._searchHighlighter
+
+	def _highlightSearch(self, pattern):
+		if bigfile.isDegraded(self, 'search_highlight'):
+			return
 
-	def _highlightSearch(self):
-		txt = self.text()
-		reobj = self._searchOptionsToRe()
-		for mtc in reobj.finditer(txt):
-			self.indicators['searchHighlight'].putAtOffset(mtc.start(), mtc.end())
+		self.searchHighlighter().start(pattern)
 
 	def clearSearchHighlight(self):
-		self.indicators['searchHighlight'].removeAtOffset(0, self.bytesLength())
+		if self._searchHighlighter is not None:
+			self._searchHighlighter.stop()
+		self._searchHighlightIndicator().clear()
 
 	def find(self, expr, caseSensitive=None, isRe=None, whole=None, wrap=None):
+		"""Search `expr` forward from the selection start, and select the match
+
+		Search options are stored in the `search` property dict, for :any:`findForward` and
+		:any:`findBackward`. The search is done with :doc:`eye.textsearch`, so regular expressions use the
+		Python syntax. If `search.highlight` is True, all matches are highlighted.
+
+		:returns: True if a match was found
+		"""
 		if self.search.highlight:
 			self.clearSearchHighlight()
 
@@ -1498,32 +2658,73 @@ class Editor(BaseEditor, CentralWidgetMixin):
 			self.search.wrap = wrap
 		self.search.forward = True
 
-		caseSensitive = self._smartCase(expr, self.search.caseSensitive)
+		if not expr:
+			return False
+		try:
+			pattern = self._searchPattern()
+		except re.error:
+			LOGGER.info('invalid regex %r', expr, exc_info=True)
+			return False
 
 		if self.search.highlight:
-			self._highlightSearch()
+			self._highlightSearch(pattern)
+
+		start, _ = self._selectionOffsets()
+		return self._findFrom(pattern, start, True)
+
+	def _selectionOffsets(self):
+		anchor = self.SendScintilla(self.SCI_GETANCHOR)
+		caret = self.SendScintilla(self.SCI_GETCURRENTPOS)
+		return min(anchor, caret), max(anchor, caret)
+
+	def _findFrom(self, pattern, offset, forward):
+		view = self.bytesView()
+		if forward:
+			span = pattern.first(view, offset)
+			if span is None and self.search.wrap:
+				span = pattern.first(view, 0, offset)
+		else:
+			span = pattern.last(view, 0, offset)
+			if span is None and self.search.wrap:
+				span = pattern.last(view, offset)
+		del view
 
-		lfrom, ifrom, lto, ito = self.getSelection()
-		self.setCursorPosition(*min([(lfrom, ifrom), (lto, ito)]))
+		if span is None:
+			return False
 
-		return self.findFirst(self.search.expr, self.search.isRe, caseSensitive, self.search.whole, self.search.wrap, True)
+		start, end = span
+		self.ensureLineVisible(self.SendScintilla(self.SCI_LINEFROMPOSITION, start))
+		self.SendScintilla(self.SCI_SETSEL, start, end)
+		return True
 
 	def _findInDirection(self, forward):
-		if self.search.get('forward') == forward:
-			return self.findNext()
-		else:
-			self.search.forward = forward
-			caseSensitive = self._smartCase(self.search.expr, self.search.caseSensitive)
-			b = self.findFirst(self.search.expr, self.search.isRe, caseSensitive, self.search.whole, self.search.wrap, self.search.forward)
-			if b and not forward:
-				# weird behavior when switching from forward to backward
-				return self.findNext()
-			return b
+		if not self.search.get('expr'):
+			return False
+		try:
+			pattern = self._searchPattern()
+		except re.error:
+			LOGGER.info('invalid regex %r', self.search.expr, exc_info=True)
+			return False
+
+		self.search.forward = forward
+		start, end = self._selectionOffsets()
+		if not forward:
+			return self._findFrom(pattern, start, False)
+
+		if start == end and pattern.first(self.bytesView(), start, end) == (start, end):
+			# don't find again the empty match at the cursor
+			if end == self.bytesLength():
+				end = 0
+			else:
+				end = self.SendScintilla(self.SCI_POSITIONAFTER, end)
+		return self._findFrom(pattern, end, True)
 
 	def findForward(self):
+		"""Select the next match of the last :any:`find` after the selection"""
 		return self._findInDirection(True)
 
 	def findBackward(self):
+		"""Select the previous match of the last :any:`find` before the selection"""
 		return self._findInDirection(False)
 
 	def wordAtCursor(self):
@@ -1582,6 +2783,13 @@ class Editor(BaseEditor, CentralWidgetMixin):
 
 	"""Signal fileSavedAs(str)"""
 
+	fileSaveFailed = Signal(str, str)
+
+	"""Signal fileSaveFailed(str, str)
+
+	Emitted when writing a file failed, with the path and the error message.
+	"""
+
 	fileAboutToBeOpened = Signal(str)
 
 	"""Signal fileAboutToBeOpened(str)"""
@@ -1590,6 +2798,29 @@ class Editor(BaseEditor, CentralWidgetMixin):
 
 	"""Signal fileOpened(str)"""
 
+	fileClosed = Signal(str)
+
+	"""Signal fileClosed(str)
+
+	Emitted when the editor is closed, after :any:`closeFile` accepted it: when the widget is closed, or
+	when its tab is closed. Unsaved modifications, if any, are discarded. Opening another file in the editor
+	doesn't emit this signal.
+	"""
+
+	fileLoadProgress = Signal(int, int)
+
+	"""Signal fileLoadProgress(int, int)
+
+	Emitted while a file is loaded progressively, with the number of bytes loaded and the file size.
+	"""
+
+	bigFileModeChanged = Signal(bool)
+
+	"""Signal bigFileModeChanged(bool)
+
+	Emitted when the editor enters or leaves big file mode, see :any:`setBigFileMode`.
+	"""
+
 	lexerChanged = Signal(object)
 
 	"""Signal lexerChanged(object)"""
@@ -1606,12 +2837,48 @@ class Editor(BaseEditor, CentralWidgetMixin):
 	@override
 	def closeEvent(self, ev):
 		acceptIf(ev, self.closeFile())
+		if ev.isAccepted():
+			self.cancelLoading()
+			self.fileClosed.emit(self.path)
 
 
 def iterlen(iterable):
 	return sum(1 for _ in iterable)
 
 
+def _degradeWrap(ed):
+	ed.bigfile.wrap_mode = ed.wrapMode()
+	ed.setWrapMode(ed.WrapNone)
+
+
+def _restoreWrap(ed):
+	ed.setWrapMode(ed.bigfile.pop('wrap_mode', ed.WrapNone))
+
+
+def _degradeUndo(ed):
+	# Scintilla only tracks the modified state while it collects undo actions, so the collection stays on
+	# and the history is emptied after the modifications instead
+	timer = ed.bigfile.undo_timer = QTimer(ed)
+	timer.setSingleShot(True)
+	timer.timeout.connect(ed.emptyUndoBuffer)
+	ed.textChanged.connect(timer.start)
+	ed.emptyUndoBuffer()
+
+
+def _restoreUndo(ed):
+	timer = ed.bigfile.pop('undo_timer', None)
+	if timer is not None:
+		ed.textChanged.disconnect(timer.start)
+		timer.stop()
+		timer.deleteLater()
+
+
+bigfile.registerFeature('search_highlight', 'search highlight')
+bigfile.registerFeature('trim_whitespace', 'trailing whitespace removal')
+bigfile.registerFeature('wrap', 'line wrapping', _degradeWrap, _restoreWrap)
+bigfile.registerFeature('undo', 'undo', _degradeUndo, _restoreUndo, sensitive=False)
+
+
 @registerEventFilter('editor', [QEvent.Wheel])
 @disabled
 def zoomOnWheel(ed, ev):
@@ -18,6 +18,7 @@ from six import StringIO
 
 from ..three import bytes
 from ..app import qApp
+from ..connector import profilingTable
 from ..utils import exceptionLogging
 from ..qt import Signal, Slot
 from .helpers import WidgetMixin
@@ -152,7 +153,8 @@ class EvalConsole(QWidget, WidgetMixin):
 
 	The `editor` variable is automatically set to the last focused editor widget in the current window.
 	The `window` variable is set to current window. The `eye` module is imported, and so are the submodules
-	already imported by the configuration files.
+	already imported by the configuration files. The `listener_stats()` function prints the listeners
+	timing statistics (see :any:`eye.connector.enableProfiling`).
 
 	During execution of a line, stdout and stderr are captured and are output to this widget console.
 	Do not execute statemements taking a lot of time as it would freeze the UI.
@@ -209,6 +211,7 @@ class EvalConsole(QWidget, WidgetMixin):
 		self.namespace['window'] = qApp().lastWindow
 		self.namespace['editor'] = self.namespace['window'].currentBuffer()
 		self.namespace['import_all_qt'] = self.import_all_qt
+		self.namespace['listener_stats'] = print_listener_stats
 		self.namespace.update(NAMESPACE)
 
 	def protectNamespace(self):
@@ -225,6 +228,10 @@ class EvalConsole(QWidget, WidgetMixin):
 		return False
 
 
+def print_listener_stats():
+	print(profilingTable())
+
+
 def capture_output(cb, *args, **kwargs):
 	sio = StringIO()
 	old = sys.stdout, sys.stderr
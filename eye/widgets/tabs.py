@@ -172,6 +172,7 @@ class TabWidget(DropAreaMixin, QTabWidget, WidgetMixin, BandMixin):
 		idx = self._idxContainerOf(ed)
 
 		self.removeTab(idx)
+		self._notifyClosed(ed)
 		return True
 
 	def addWidget(self, widget):
@@ -264,6 +265,13 @@ class TabWidget(DropAreaMixin, QTabWidget, WidgetMixin, BandMixin):
 		if not widget.closeFile():
 			return
 		self.removeTab(idx)
+		self._notifyClosed(widget)
+
+	def _notifyClosed(self, widget):
+		# closing the tab closes the editor, though the widget isn't closed
+		closed = getattr(widget, 'fileClosed', None)
+		if closed is not None:
+			closed.emit(widget.path)
 
 	@Slot(int)
 	def _currentChanged(self, idx):
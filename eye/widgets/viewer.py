@@ -0,0 +1,755 @@
+# this project is licensed under the WTFPLv2, see COPYING.txt for details
+
+"""Read-only viewer widget for huge files
+
+Files of several gigabytes can't reasonably be loaded in an :any:`eye.widgets.editor.Editor`. The
+:any:`FileViewer` widget memory-maps the file instead, and only gives Scintilla a window of
+:any:`WINDOW_BYTES` around the displayed lines. When scrolling gets near an edge of the window, the
+window is moved. The vertical scrollbar spans the whole file.
+
+A sparse index of line offsets (see :any:`LineIndex`) is built in a background thread, so line numbers
+are displayed and :any:`FileViewer.goto1` jumps to a line. Searching (see :any:`FileViewer.find`) runs
+over the memory-mapped file by chunks, across multiple event loop iterations.
+
+The viewer can be placed in tabs like an editor. It's chosen automatically by
+:any:`eye.helpers.buffers.openEditor` (and thus by the `openEditor` intent, used by the location list)
+for files bigger than :any:`SIZE_THRESHOLD`.
+
+By default, instances of :any:`FileViewer` have the "viewer" category set (see :doc:`eye.connector`),
+not the "editor" category, as they don't support editing.
+
+.. note:: The file must not be truncated while it's viewed, since accessing memory-mapped pages
+          beyond the end of the file crashes the process on most platforms.
+"""
+
+from bisect import bisect_left
+from logging import getLogger
+import mmap
+import os
+import threading
+
+from PyQt5.QtCore import Qt, QTimer, QElapsedTimer
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QScrollBar
+from PyQt5.Qsci import QsciScintilla
+
+from .. import structs
+from .. import textsearch
+from ..qt import Signal, Slot, override
+from .editor import BaseEditor
+from .helpers import CentralWidgetMixin
+
+
+__all__ = ('FileViewer', 'LineIndex', 'shouldUseViewer')
+
+
+LOGGER = getLogger(__name__)
+
+SIZE_THRESHOLD = 512 << 20
+
+"""Files of at least this size are opened in a :any:`FileViewer` by :any:`eye.helpers.buffers.openEditor`"""
+
+BLOCK_SIZE = 1 << 16
+
+"""Number of bytes covered by each entry of a :any:`LineIndex`"""
+
+BUILD_CHUNK_SIZE = 1 << 20
+
+"""Number of bytes read at once when building a :any:`LineIndex` in the background"""
+
+INDEX_WORKERS = 2
+
+"""Number of indexes built at once"""
+
+WINDOW_BYTES = 4 << 20
+
+"""Approximate number of bytes of the file given to Scintilla at once"""
+
+MAX_LINE_LENGTH = 1 << 20
+
+"""Lines longer than this are cut when they cross an edge of the window"""
+
+SEARCH_CHUNK_SIZE = 1 << 20
+
+"""Number of bytes searched at once, matches can't span multiple chunks"""
+
+SEARCH_BATCH_MS = 20
+
+"""Maximum time spent searching in an event loop iteration"""
+
+
+def shouldUseViewer(path):
+	"""Return True if file at `path` should be opened in a :any:`FileViewer` instead of an editor"""
+	try:
+		return os.path.getsize(path) >= SIZE_THRESHOLD
+	except (IOError, OSError):
+		return False
+
+
+class LineIndex(object):
+	"""Sparse index of the line offsets of a buffer
+
+	The buffer is split in blocks of :any:`BLOCK_SIZE` bytes, and the index stores the number of newlines
+	before each block. Finding the offset of a line (or the line of an offset) then only requires scanning
+	one block.
+
+	The index is built incrementally: :any:`build` can run in a background thread, while methods needing
+	a part not indexed yet index it synchronously.
+	"""
+
+	def __init__(self, path, data):
+		self.path = path
+		self.data = data
+		self.size = len(data)
+		# counts[i] is the number of newlines in data[:i * BLOCK_SIZE]
+		self.counts = [0]
+		self.lock = threading.Lock()
+		self.cancelled = False
+
+	def indexedSize(self):
+		"""Return the number of bytes from the start of the buffer which are indexed"""
+		return min(self.size, (len(self.counts) - 1) * BLOCK_SIZE)
+
+	def isComplete(self):
+		return self.indexedSize() >= self.size
+
+	def progress(self):
+		"""Return the indexed proportion of the buffer, between 0 and 1"""
+		if not self.size:
+			return 1.
+		return self.indexedSize() / float(self.size)
+
+	def _add(self, blockCounts):
+		total = self.counts[-1]
+		for count in blockCounts:
+			total += count
+			self.counts.append(total)
+
+	def build(self):
+		"""Index the whole buffer, can be called in a background thread
+
+		The file is read with regular reads, which don't hold the GIL, rather than through the memory map.
+		"""
+		buf = bytearray(BUILD_CHUNK_SIZE)
+		with open(self.path, 'rb') as fd:
+			while not self.cancelled:
+				with self.lock:
+					start = self.indexedSize()
+				if start >= self.size:
+					break
+
+				fd.seek(start)
+				read = fd.readinto(buf)
+				read = min(read, self.size - start)
+				if read <= 0:
+					LOGGER.warning('%r is shorter than expected, index is incomplete', self.path)
+					break
+
+				blockCounts = [buf.count(b'\n', pos, min(pos + BLOCK_SIZE, read)) for pos in range(0, read, BLOCK_SIZE)]
+				if read % BLOCK_SIZE and start + read < self.size:
+					# short read in the middle of a block, it will be read again
+					blockCounts.pop()
+
+				with self.lock:
+					# the index may have been extended by _extendTo in the meantime
+					if self.indexedSize() == start:
+						self._add(blockCounts)
+
+	def cancel(self):
+		"""Stop :any:`build`"""
+		self.cancelled = True
+
+	def _extendTo(self, offset):
+		# index blocks until offset, synchronously, with the lock held
+		data = self.data
+		blockCounts = []
+		pos = self.indexedSize()
+		while pos < min(offset, self.size):
+			blockCounts.append(data[pos:pos + BLOCK_SIZE].count(b'\n'))
+			pos += BLOCK_SIZE
+		self._add(blockCounts)
+
+	def isLineIndexed(self, line):
+		"""Return True if the offset of `line` (starting from 0) can be found without indexing more"""
+		with self.lock:
+			return self.isComplete() or self.counts[-1] >= line
+
+	def lineCount(self):
+		"""Return the number of lines, or None if the index isn't complete"""
+		if not self.isComplete():
+			return None
+		return self.counts[-1] + 1
+
+	def estimatedLineCount(self):
+		"""Return the number of lines, estimated from the indexed part if the index isn't complete"""
+		indexed = self.indexedSize()
+		if indexed >= self.size:
+			return self.counts[-1] + 1
+		elif not indexed:
+			return self.size // 80 + 1
+		return self.counts[-1] * self.size // indexed + 1
+
+	def lineFromOffset(self, offset):
+		"""Return the line number (starting from 0) containing `offset`"""
+		offset = max(0, min(offset, self.size))
+		with self.lock:
+			if self.indexedSize() < offset:
+				self._extendTo(offset)
+			block = offset // BLOCK_SIZE
+			base = self.counts[block]
+		return base + self.data[block * BLOCK_SIZE:offset].count(b'\n')
+
+	def offsetFromLine(self, line):
+		"""Return the offset of the start of `line` (starting from 0)
+
+		If the buffer has fewer lines, the offset of the last line is returned.
+		"""
+		if line <= 0:
+			return 0
+
+		with self.lock:
+			while not self.isComplete() and self.counts[-1] < line:
+				self._extendTo(self.indexedSize() + BUILD_CHUNK_SIZE)
+			line = min(line, self.counts[-1])
+			if line <= 0:
+				return 0
+			# counts[block] < line <= counts[block + 1]
+			block = bisect_left(self.counts, line) - 1
+			base = self.counts[block]
+
+		pos = block * BLOCK_SIZE - 1
+		for _ in range(line - base):
+			pos = self.data.find(b'\n', pos + 1)
+		return pos + 1
+
+
+class FileViewer(BaseEditor, CentralWidgetMixin):
+	"""Read-only viewer widget for huge files
+
+	Only a part of the file is loaded in the Scintilla widget, so Scintilla lines and positions are
+	relative to the start of that window. Methods of this class take and return absolute line numbers and
+	offsets in the file, unless noted otherwise.
+
+	.. seealso:: :any:`eye.widgets.viewer`
+	"""
+
+	SmartCaseSensitive = object()
+
+	def __init__(self, **kwargs):
+		super(FileViewer, self).__init__(**kwargs)
+
+		self.path = ''
+		self.data = b''
+		self.size = 0
+		self.index = LineIndex('', self.data)
+		self._indexFuture = None
+		# (line, col) of a goto1 waiting for the index to reach the line
+		self._pendingGoto = None
+
+		# byte offsets of the part of the file loaded in Scintilla
+		self.winStart = 0
+		self.winEnd = 0
+		# line number of winStart, None if not known yet
+		self.winLine = 0
+
+		self.search = structs.PropDict()
+		self.search.isRe = False
+		self.search.caseSensitive = False
+		self.search.wrap = True
+		self.search.whole = False
+		self._searchState = None
+		self.searchTimer = QTimer(self)
+		self.searchTimer.timeout.connect(self._searchBatch)
+
+		self.setUtf8(True)
+		self.setReadOnly(True)
+		self.SendScintilla(self.SCI_SETUNDOCOLLECTION, False)
+		# nothing listens to modifications, and QScintilla handles them slowly
+		self.SendScintilla(self.SCI_SETMODEVENTMASK, 0)
+
+		self.setMarginType(0, QsciScintilla.TextMarginRightJustified)
+
+		# Scintilla's scrollbar would only span the window, this one spans the file
+		self.SendScintilla(self.SCI_SETVSCROLLBAR, False)
+		self.fileBar = QScrollBar(Qt.Vertical, self)
+		self.fileBar.valueChanged.connect(self._fileBarMoved)
+		self.setViewportMargins(0, 0, self.fileBar.sizeHint().width(), 0)
+		self._barScale = 1
+
+		self.SCN_UPDATEUI.connect(self._onUpdateUI)
+
+		self.indexTimer = QTimer(self)
+		self.indexTimer.setInterval(500)
+		self.indexTimer.timeout.connect(self._checkIndex)
+
+		self.setWindowIcon(QIcon())
+		self._updateTitle()
+
+		self.addCategory('viewer')
+
+	def __repr__(self):
+		return '<FileViewer path=%r>' % self.path
+
+	def _updateTitle(self):
+		t = '%s [view]' % (os.path.basename(self.path) or '<untitled>')
+
+		tip = self.path or '<untitled>'
+		count = self.index.lineCount()
+		if count is None:
+			tip = '%s\nRead-only view, indexing lines: %d%%' % (tip, self.index.progress() * 100)
+		else:
+			tip = '%s\nRead-only view, %d lines' % (tip, count)
+
+		self.setWindowTitle(t)
+		self.setToolTip(tip)
+
+	## file management
+	def openFile(self, path):
+		"""Open file at `path` for viewing
+
+		The file is memory-mapped and its line index is built in the background.
+
+		:returns: True if the file could be opened
+		"""
+		path = os.path.abspath(path)
+		self.fileAboutToBeOpened.emit(path)
+
+		try:
+			with open(path, 'rb') as fd:
+				size = os.fstat(fd.fileno()).st_size
+				data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+		except (IOError, OSError, ValueError) as exc:
+			LOGGER.error('cannot open %r: %s', path, exc)
+			return False
+
+		self._closeData()
+		self.path = path
+		self.data = data
+		self.size = len(data)
+		self.index = LineIndex(path, data)
+
+		self._indexFuture = INDEXER.submit(self.index.build)
+		self.indexTimer.start()
+
+		# scrollbar values are ints
+		self._barScale = max(1, -(-self.size // 0x7fffffff))
+		self.fileBar.blockSignals(True)
+		self.fileBar.setRange(0, self.size // self._barScale)
+		self.fileBar.blockSignals(False)
+
+		self._loadWindow(0)
+		self._updateMargin()
+		self._updateTitle()
+		self.fileOpened.emit(path)
+		return True
+
+	def closeFile(self):
+		"""Stop viewing the file
+
+		As the file can't be modified, this method always returns True.
+		"""
+		self._closeData()
+		self.path = ''
+		self._updateTitle()
+		return True
+
+	def _closeData(self):
+		self._stopSearch()
+		self.index.cancel()
+		self.indexTimer.stop()
+		self._indexFuture = None
+		self._pendingGoto = None
+
+		self.setReadOnly(False)
+		self.SendScintilla(self.SCI_CLEARALL)
+		self.setReadOnly(True)
+		self.winStart = self.winEnd = 0
+		self.winLine = 0
+
+		if isinstance(self.data, mmap.mmap):
+			self.data.close()
+		self.data = b''
+		self.size = 0
+		self.index = LineIndex('', self.data)
+
+	@Slot()
+	def _checkIndex(self):
+		if self.winLine is None and self.index.indexedSize() >= self.winStart:
+			self.winLine = self.index.lineFromOffset(self.winStart)
+		self._updateMargin()
+		self._updateTitle()
+
+		if self._pendingGoto is not None and self.index.isLineIndexed(self._pendingGoto[0] - 1):
+			line, col = self._pendingGoto
+			self._pendingGoto = None
+			self._jumpToLine(line, col)
+
+		if self.index.isComplete():
+			self.indexTimer.stop()
+			self.indexFinished.emit()
+
+	## window management
+	def _charStart(self, offset):
+		# move offset forward out of a multi-byte UTF-8 sequence
+		while offset < self.size and (self.data[offset] & 0xC0) == 0x80:
+			offset += 1
+		return offset
+
+	def _lineStart(self, offset):
+		# offset of the first line start at or after offset
+		if offset <= 0:
+			return 0
+		elif offset >= self.size:
+			return self.size
+
+		nl = self.data.find(b'\n', offset - 1, offset - 1 + MAX_LINE_LENGTH)
+		if nl >= 0:
+			return nl + 1
+		elif offset - 1 + MAX_LINE_LENGTH >= self.size:
+			return self.size
+		return self._charStart(offset)
+
+	def _lineStartBefore(self, offset):
+		# offset of the start of the line containing offset
+		if offset <= 0:
+			return 0
+
+		nl = self.data.rfind(b'\n', max(0, offset - MAX_LINE_LENGTH), offset)
+		if nl < 0 and offset > MAX_LINE_LENGTH:
+			return self._charStart(offset - MAX_LINE_LENGTH)
+		return nl + 1
+
+	def _loadWindow(self, anchor):
+		# load the part of the file around anchor offset, which should be a line start
+		start = self._lineStart(anchor - WINDOW_BYTES // 2)
+		start = min(start, anchor)
+		end = self._lineStart(start + WINDOW_BYTES)
+		end = max(end, min(self.size, anchor + 1))
+		if (start, end) == (self.winStart, self.winEnd) and self.length() == end - start:
+			return
+
+		cursor = self.cursorOffset()
+		anchorSel = self.winStart + self.SendScintilla(self.SCI_GETANCHOR)
+
+		chunk = self.data[start:end]
+		self.setReadOnly(False)
+		self.SendScintilla(self.SCI_CLEARALL)
+		self.SendScintilla(self.SCI_APPENDTEXT, len(chunk), chunk)
+		self.setReadOnly(True)
+
+		self.winStart, self.winEnd = start, end
+		if self.index.indexedSize() >= start:
+			self.winLine = self.index.lineFromOffset(start)
+		else:
+			self.winLine = None
+
+		if start <= cursor <= end and start <= anchorSel <= end:
+			self.SendScintilla(self.SCI_SETSEL, anchorSel - start, cursor - start)
+		else:
+			self.SendScintilla(self.SCI_GOTOPOS, anchor - start)
+
+	def _localLine(self, offset):
+		return self.SendScintilla(self.SCI_LINEFROMPOSITION, offset - self.winStart)
+
+	def _visibleRange(self):
+		# local line numbers of the first and after the last visible lines
+		first = self.SendScintilla(self.SCI_GETFIRSTVISIBLELINE)
+		last = min(self.lines(), first + self.SendScintilla(self.SCI_LINESONSCREEN) + 1)
+		return first, last
+
+	def _lineOffset(self, localLine):
+		return self.winStart + self.SendScintilla(self.SCI_POSITIONFROMLINE, localLine)
+
+	def _scrollToOffset(self, offset, center=False):
+		offset = self._lineStart(offset)
+		if not self.winStart <= offset < self.winEnd:
+			self._loadWindow(offset)
+
+		line = self._localLine(offset)
+		if center:
+			line = max(0, line - self.SendScintilla(self.SCI_LINESONSCREEN) // 2)
+		self.SendScintilla(self.SCI_SETFIRSTVISIBLELINE, line)
+
+	@Slot(int)
+	def _onUpdateUI(self, updated):
+		first, last = self._visibleRange()
+		firstOffset = self._lineOffset(first)
+		lastOffset = self._lineOffset(last)
+
+		edge = WINDOW_BYTES // 8
+		if ((self.winStart > 0 and firstOffset - self.winStart < edge)
+			or (self.winEnd < self.size and self.winEnd - lastOffset < edge)):
+			self._loadWindow(firstOffset)
+			self.SendScintilla(self.SCI_SETFIRSTVISIBLELINE, self._localLine(firstOffset))
+			return
+
+		self._syncFileBar(firstOffset, lastOffset)
+		self._updateMargin()
+
+	def _syncFileBar(self, firstOffset, lastOffset):
+		self.fileBar.blockSignals(True)
+		try:
+			self.fileBar.setPageStep(max(1, (lastOffset - firstOffset) // self._barScale))
+			self.fileBar.setSingleStep(max(1, self.fileBar.pageStep() // 16))
+			self.fileBar.setValue(firstOffset // self._barScale)
+		finally:
+			self.fileBar.blockSignals(False)
+
+	@Slot(int)
+	def _fileBarMoved(self, value):
+		self._scrollToOffset(value * self._barScale)
+
+	def _updateMargin(self):
+		if self.winLine is None:
+			self.setMarginWidth(0, 0)
+			return
+
+		digits = len(str(self.index.estimatedLineCount()))
+		self.setMarginWidth(0, '9' * (digits + 1))
+
+		first, last = self._visibleRange()
+		for line in range(first, last):
+			self.setMarginText(line, str(self.winLine + line + 1), QsciScintilla.STYLE_LINENUMBER)
+
+	@override
+	def resizeEvent(self, ev):
+		super(FileViewer, self).resizeEvent(ev)
+
+		rect = self.contentsRect()
+		width = self.fileBar.sizeHint().width()
+		height = self.viewport().height()
+		self.fileBar.setGeometry(rect.right() - width + 1, rect.top(), width, height)
+
+	@override
+	def keyPressEvent(self, ev):
+		if ev.modifiers() == Qt.ControlModifier and ev.key() == Qt.Key_Home:
+			self.gotoOffset(0)
+		elif ev.modifiers() == Qt.ControlModifier and ev.key() == Qt.Key_End:
+			self.gotoOffset(self.size)
+		else:
+			super(FileViewer, self).keyPressEvent(ev)
+
+	## positions
+	def bytesLength(self):
+		"""Return the size of the file"""
+		return self.size
+
+	def cursorOffset(self):
+		"""Return the cursor position as an offset in the file"""
+		return self.winStart + self.SendScintilla(self.SCI_GETCURRENTPOS)
+
+	def getCursorPosition(self):
+		"""Return the cursor line-index in the file, starting from 0
+
+		Unlike `QsciScintilla.getCursorPosition`, the line number is absolute in the file.
+		"""
+		line, col = super(FileViewer, self).getCursorPosition()
+		return self.index.lineFromOffset(self.winStart) + line, col
+
+	def gotoOffset(self, offset, end=None):
+		"""Place the cursor at `offset` in the file, or select from `offset` to `end`"""
+		offset = max(0, min(offset, self.size))
+		end = offset if end is None else end
+
+		if not (self.winStart <= offset and end <= self.winEnd):
+			self._loadWindow(self._lineStartBefore(offset))
+		end = min(end, self.winEnd)
+		self.SendScintilla(self.SCI_SETSEL, offset - self.winStart, end - self.winStart)
+		self.SendScintilla(self.SCI_SCROLLCARET)
+
+	@Slot()
+	def goto1(self, line, col=None):
+		"""Place the cursor at `line` and `col`, starting from 1
+
+		If the line index built in the background doesn't reach `line` yet, the cursor is placed when it
+		does. :any:`positionJumped` is emitted when the cursor is placed.
+		"""
+		col = col or 1
+		if self.index.isLineIndexed(line - 1):
+			self._pendingGoto = None
+			self._jumpToLine(line, col)
+		else:
+			self._pendingGoto = (line, col)
+
+	def _jumpToLine(self, line, col):
+		offset = self.index.offsetFromLine(line - 1)
+		self._scrollToOffset(offset, center=True)
+
+		local = self._localLine(offset)
+		self.setCursorPosition(local, col - 1)
+		self.positionJumped.emit(line - 1, col - 1)
+
+	## search
+	@classmethod
+	def _smartCase(cls, txt, cs):
+		if cs is cls.SmartCaseSensitive:
+			return (txt.lower() != txt)
+		else:
+			return cs
+
+	def _searchPattern(self):
+		caseSensitive = self._smartCase(self.search.expr, self.search.caseSensitive)
+		return textsearch.compileSearch(self.search.expr, self.search.isRe, caseSensitive, self.search.whole)
+
+	def find(self, expr, caseSensitive=None, isRe=None, whole=None, wrap=None):
+		"""Search `expr` forward from the cursor
+
+		Unlike :any:`eye.widgets.editor.Editor.find`, the search is not done immediately but across
+		multiple event loop iterations. :any:`found` is emitted and the match is selected if it's found,
+		then :any:`searchFinished` is emitted.
+
+		The search is done on the bytes of the file with :doc:`eye.textsearch`, so a match can't span
+		multiple lines.
+		"""
+		self.search.expr = expr
+		if caseSensitive is not None:
+			self.search.caseSensitive = caseSensitive
+		if isRe is not None:
+			self.search.isRe = isRe
+		if whole is not None:
+			self.search.whole = whole
+		if wrap is not None:
+			self.search.wrap = wrap
+
+		start = min(self.cursorOffset(), self.winStart + self.SendScintilla(self.SCI_GETANCHOR))
+		self._startSearch(start, True)
+
+	def findForward(self):
+		"""Search the next match of the last :any:`find`, after the cursor"""
+		self._startSearch(self.cursorOffset(), True)
+
+	def findBackward(self):
+		"""Search the previous match of the last :any:`find`, before the cursor"""
+		start = min(self.cursorOffset(), self.winStart + self.SendScintilla(self.SCI_GETANCHOR))
+		self._startSearch(start, False)
+
+	def isSearching(self):
+		return self._searchState is not None
+
+	def _startSearch(self, start, forward):
+		self._stopSearch()
+		if not self.search.get('expr'):
+			return
+
+		state = structs.PropDict()
+		state.pattern = self._searchPattern()
+		state.forward = forward
+		# range to search: [pos, stop) forward, or [stop, pos) backward
+		state.pos = start
+		state.stop = self.size if forward else 0
+		state.wrapped = not self.search.wrap
+		state.origin = start
+		self._searchState = state
+
+		self._searchBatch()
+		if self._searchState is not None:
+			self.searchTimer.start()
+
+	def _stopSearch(self):
+		self.searchTimer.stop()
+		self._searchState = None
+
+	def _searchChunk(self, state):
+		# search one chunk, return (start, end) of the match, or None
+		if state.forward:
+			end = min(state.stop, self._lineStart(state.pos + SEARCH_CHUNK_SIZE))
+			for span in state.pattern.finditer(self.data, state.pos, end):
+				# don't find again an empty match at the cursor
+				if span[1] > state.origin or state.wrapped:
+					state.pos = end
+					return span
+			state.pos = end
+		else:
+			start = max(state.stop, self._lineStartBefore(state.pos - SEARCH_CHUNK_SIZE))
+			last = None
+			for last in state.pattern.finditer(self.data, start, state.pos):
+				pass
+			state.pos = start
+			return last
+
+	@Slot()
+	def _searchBatch(self):
+		state = self._searchState
+		if state is None:
+			return
+
+		timer = QElapsedTimer()
+		timer.start()
+		while not timer.hasExpired(SEARCH_BATCH_MS):
+			span = self._searchChunk(state)
+			if span is not None:
+				self._stopSearch()
+				self.gotoOffset(*span)
+				self.found.emit(*span)
+				self.searchFinished.emit(True)
+				if self.winLine is not None:
+					# else the line is unknown until the index reaches the match
+					self.positionJumped.emit(*self.getCursorPosition())
+				return
+
+			if state.pos == state.stop:
+				if state.wrapped:
+					self._stopSearch()
+					self.searchFinished.emit(False)
+					return
+				# search the rest of the file, from the other end
+				state.wrapped = True
+				state.pos = 0 if state.forward else self.size
+				state.stop = state.origin
+
+	## signals
+	fileAboutToBeOpened = Signal(str)
+
+	"""Signal fileAboutToBeOpened(str)"""
+
+	fileOpened = Signal(str)
+
+	"""Signal fileOpened(str)"""
+
+	# 64-bit arguments, lines and offsets in big files don't fit in a C int
+	positionJumped = Signal('qint64', 'qint64')
+
+	"""Signal positionJumped(int, int)
+
+	Emitted when the cursor jumped to a line (see :any:`goto1`) or to a search match, with the line and
+	column of the cursor, starting from 0.
+	"""
+
+	indexFinished = Signal()
+
+	"""Signal indexFinished()
+
+	Emitted when the line index of the file is complete.
+	"""
+
+	found = Signal('qint64', 'qint64')
+
+	"""Signal found(int, int)
+
+	Emitted when a search found a match, with the start and end offsets of the match in the file.
+	"""
+
+	searchFinished = Signal(bool)
+
+	"""Signal searchFinished(bool)
+
+	Emitted when a search is finished, with True if a match was found.
+	"""
+
+
+class IndexPool(object):
+	"""Pool of threads building :any:`LineIndex` objects, created lazily"""
+
+	def __init__(self):
+		self.pool = None
+
+	def submit(self, fn):
+		if self.pool is None:
+			from concurrent import futures
+
+			self.pool = futures.ThreadPoolExecutor(max_workers=INDEX_WORKERS)
+
+		return self.pool.submit(fn)
+
+
+INDEXER = IndexPool()
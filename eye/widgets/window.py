@@ -13,6 +13,7 @@ from ..qt import Signal, Slot
 from .. import consts
 from .helpers import CategoryMixin, acceptIf, parentTabWidget
 from .editor import Editor
+from .viewer import FileViewer
 from .tabs import TabWidget
 from .splitter import SplitManager
 from .droparea import DropAreaMixin
@@ -60,6 +61,13 @@ class Window(QMainWindow, CategoryMixin, DropAreaMixin):
 
 	"""Class of the widget to create when a new tab is opened."""
 
+	ViewerClass = FileViewer
+
+	"""Class of the widget to create when a file too big for an editor is opened.
+
+	See :any:`eye.helpers.buffers.openEditor`.
+	"""
+
 	fileDropped = Signal(str)
 
 	focusedBuffer = Signal(QWidget)
@@ -172,6 +180,13 @@ class Window(QMainWindow, CategoryMixin, DropAreaMixin):
 		"""Save current buffer."""
 		self.currentBuffer().saveFile()
 
+	@Slot()
+	def bufferSaveAll(self):
+		"""Save all modified buffers, see :any:`eye.helpers.buffers.saveModifiedEditors`."""
+		from ..helpers.buffers import saveModifiedEditors
+
+		saveModifiedEditors()
+
 	def _bufferNewSplit(self, orientation, widget=None):
 		if widget is None:
 			widget = self.currentBuffer()
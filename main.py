@@ -2,7 +2,7 @@
 # this project is licensed under the WTFPLv2, see COPYING.txt for details
 
 import sys
-import eye.app
+import eye.launcher
 
 if __name__ == '__main__':
-	sys.exit(eye.app.main())
+	sys.exit(eye.launcher.main())
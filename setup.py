@@ -54,7 +54,7 @@ if __name__ == '__main__':
 		],
 		entry_points={
 			'console_scripts': [
-				'eye=eye.app:main'
+				'eye=eye.launcher:main'
 			]
 		}
 	)